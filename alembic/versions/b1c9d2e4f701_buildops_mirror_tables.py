@@ -0,0 +1,58 @@
+"""buildops mirror tables
+
+Revision ID: b1c9d2e4f701
+Revises: 74363508ce70
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1c9d2e4f701'
+down_revision: Union[str, Sequence[str], None] = '74363508ce70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+MIRROR_TABLES = ("buildops_invoices", "buildops_customers", "buildops_properties")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name in MIRROR_TABLES:
+        op.create_table(name,
+        sa.Column('id', sa.String(length=64), nullable=False),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('source_updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('synced_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(f'idx_{name}_source_updated_at', name, ['source_updated_at'], unique=False)
+
+    # build_invoice_pdf_data_from_number resolves invoice numbers against the mirror
+    op.execute(
+        "create index if not exists idx_buildops_invoices_invoice_number "
+        "on public.buildops_invoices ((payload->>'invoiceNumber'))"
+    )
+
+    op.create_table('buildops_sync_state',
+    sa.Column('entity', sa.String(length=32), nullable=False),
+    sa.Column('watermark', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_run_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('entity')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('buildops_sync_state')
+    op.execute("drop index if exists public.idx_buildops_invoices_invoice_number")
+    for name in reversed(MIRROR_TABLES):
+        op.drop_index(f'idx_{name}_source_updated_at', table_name=name)
+        op.drop_table(name)
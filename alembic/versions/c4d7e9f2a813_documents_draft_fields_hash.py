@@ -0,0 +1,27 @@
+"""documents draft fields hash
+
+Revision ID: c4d7e9f2a813
+Revises: b1c9d2e4f701
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d7e9f2a813'
+down_revision: Union[str, Sequence[str], None] = 'b1c9d2e4f701'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('draft_fields_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents', 'draft_fields_hash')
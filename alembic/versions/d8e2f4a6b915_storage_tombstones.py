@@ -0,0 +1,41 @@
+"""storage tombstones
+
+Revision ID: d8e2f4a6b915
+Revises: c4d7e9f2a813
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e2f4a6b915'
+down_revision: Union[str, Sequence[str], None] = 'c4d7e9f2a813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('storage_tombstones',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('s3_key', sa.Text(), nullable=False),
+    sa.Column('reason', sa.String(length=32), nullable=False),
+    sa.Column('document_id', postgresql.UUID(as_uuid=True), nullable=True),
+    sa.Column('delete_after', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('s3_key')
+    )
+    op.create_index('idx_storage_tombstones_delete_after', 'storage_tombstones', ['delete_after'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_storage_tombstones_delete_after', table_name='storage_tombstones')
+    op.drop_table('storage_tombstones')
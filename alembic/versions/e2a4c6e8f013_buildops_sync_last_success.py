@@ -0,0 +1,29 @@
+"""buildops sync last success
+
+Revision ID: e2a4c6e8f013
+Revises: d8e2f4a6b915
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a4c6e8f013'
+down_revision: Union[str, Sequence[str], None] = 'd8e2f4a6b915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('buildops_sync_state', sa.Column('last_success_at', sa.DateTime(timezone=True), nullable=True))
+    # Runs recorded so far without an error were successful
+    op.execute("update public.buildops_sync_state set last_success_at = last_run_at where last_error is null")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('buildops_sync_state', 'last_success_at')
@@ -6,6 +6,7 @@ import json
 import re
 
 from fastapi import APIRouter, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import text
 
 from app.db import SessionLocal
@@ -77,6 +78,12 @@ async def brevo_webhook(request: Request):
     if not doc_id:
         return {"ok": True, "ignored": True}
 
+    # DB insert off the event loop
+    await run_in_threadpool(_record_event, payload, doc_id)
+    return {"ok": True}
+
+
+def _record_event(payload: dict, doc_id: str) -> None:
     event = _normalize_event(payload.get("event"))
     recipient_email = str(payload.get("email") or "").strip().lower() or None
 
@@ -120,5 +127,3 @@ async def brevo_webhook(request: Request):
             },
         )
         db.commit()
-
-    return {"ok": True}
\ No newline at end of file
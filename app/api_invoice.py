@@ -4,17 +4,20 @@ from __future__ import annotations
 
 import json
 import os
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
 from datetime import datetime, timezone
+from pathlib import Path
 from typing import Optional, List
 from uuid import uuid4
 
-from fastapi import APIRouter, Body, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Body, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from sqlalchemy import text
 
 from app.db import SessionLocal
-from app.storage.s3_storage import get_storage
-from app.buildops_client import BuildOpsClient
+from app.storage.backend import get_storage
+from app.buildops_async_client import get_async_buildops_client
 from app.email.smtp_sender import send_email_brevo_smtp
 from app.email.template_router import (
     email_kind_for,
@@ -22,20 +25,45 @@ from app.email.template_router import (
     render_html,
     build_subject,
 )
-from app.services.payment_link import get_invoice_payment_link
+from app.services.document_fields import merge_document_json
+from app.services.final_store import put_final
+from app.services.object_gc import tombstone, tombstone_now
+from app.services.payment_link import (
+    PAYMENT_LINK_KEYS,
+    cached_payment_link_state,
+    get_invoice_payment_link,
+    payment_link_fields,
+)
 from app.services.additional_documents import (
     list_additional_documents,
     build_additional_document_links,
 )
+from app.services.fingerprint import file_version, render_hash
+from app.services.pdf_optimize import prepare_final
 from app.services.snowflake import resolve_invoice_recipient_suggestion
-from app.styling.invoice.build_data import build_invoice_pdf_data_from_number
-from app.styling.invoice.renderer import render_invoice_styled_draft
+from app.styling.invoice.build_data import build_invoice_pdf_data_from_number_async
+from app.styling.invoice.renderer import DEFAULT_LOGO, RENDERER_VERSION, render_invoice_styled_draft
 
 router = APIRouter(tags=["invoice"])
 
 
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+# How long a build waits for the Snowflake recipient lookup before answering
+# with recipient_pending and finishing it in the background
+RECIPIENT_INLINE_TIMEOUT_SECONDS = _env_float("INVOICE_RECIPIENT_INLINE_TIMEOUT_SECONDS", 2.0)
+_recipient_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="invoice-recipients")
+
+
 class BuildInvoiceIn(BaseModel):
     invoice_number: str
+    # Re-render even if the BuildOps data hasn't changed since the last draft
+    force: bool = False
 
 
 class SendInvoiceEmailIn(BaseModel):
@@ -52,6 +80,8 @@ class SendInvoiceEmailIn(BaseModel):
 
 class GetPaymentLinkIn(BaseModel):
     force_over_limit: bool = False
+    # Ignore the cached link and ask WordPress for a new one
+    refresh: bool = False
 
 
 def _parse_money(v) -> float:
@@ -108,13 +138,6 @@ def _styled_draft_key_for(doc_id: str) -> str:
     return f"styled_draft/invoices/{doc_id}.pdf"
 
 
-def _final_key_for(doc_id: str) -> str:
-    now = datetime.now(timezone.utc)
-    d = now.date().isoformat()
-    stamp = now.strftime("%Y%m%d%H%M%S")
-    return f"final/invoices/{d}/{doc_id}-{stamp}.pdf"
-
-
 def _property_address_text(fields: dict) -> str | None:
     lines = fields.get("property_address_lines") or []
     joined = "\n".join([str(x).strip() for x in lines if str(x).strip()])
@@ -270,6 +293,7 @@ def _get_invoice_recipient_resolution(fields: dict) -> dict:
                 "message": "Snowflake lookup failed. Using Bill Client Email as fallback.",
                 "property_result": {},
                 "customer_result": {},
+                "lookup_failed": True,
             }
 
         return {
@@ -283,32 +307,151 @@ def _get_invoice_recipient_resolution(fields: dict) -> dict:
             "message": "Unable to retrieve billing contacts from Snowflake. Please manually enter the email address to send the invoice to.",
             "property_result": {},
             "customer_result": {},
+            "lookup_failed": True,
         }
 
 
-def _apply_recipient_fields(fields: dict) -> dict:
-    rec = _get_invoice_recipient_resolution(fields)
+def _recipient_lookup_key(fields: dict) -> dict:
+    """
+    What a stored resolution was computed from; if any of these change it's re-queried.
+    """
+    return {
+        "property_id": _safe_get_property_id(fields),
+        "customer_id": _safe_get_customer_id(fields),
+        "fallback_email": _normalize_email(fields.get("billClient_email") or fields.get("client_email")),
+    }
+
 
-    fields["property_id"] = rec.get("property_id")
-    fields["customer_id"] = rec.get("customer_id")
+def _stored_recipient_resolution(fields: dict) -> dict | None:
+    stored = fields.get("recipient_resolution")
+    if not isinstance(stored, dict) or not stored.get("resolved_at"):
+        return None
+    if stored.get("lookup_key") != _recipient_lookup_key(fields):
+        return None
+    return stored
 
-    fields["invoice_recipient_to"] = rec.get("to") or ""
-    fields["invoice_recipient_cc"] = rec.get("cc") or []
-    fields["invoice_recipient_all_emails"] = rec.get("all_emails") or []
 
-    fields["property_rep_to"] = rec.get("to") or ""
-    fields["property_rep_cc"] = rec.get("cc") or []
-    fields["property_rep_all_emails"] = rec.get("all_emails") or []
+def _recipient_fields(rec: dict) -> dict:
+    return {
+        "property_id": rec.get("property_id"),
+        "customer_id": rec.get("customer_id"),
+        "invoice_recipient_to": rec.get("to") or "",
+        "invoice_recipient_cc": rec.get("cc") or [],
+        "invoice_recipient_all_emails": rec.get("all_emails") or [],
+        "property_rep_to": rec.get("to") or "",
+        "property_rep_cc": rec.get("cc") or [],
+        "property_rep_all_emails": rec.get("all_emails") or [],
+        "recipient_source": rec.get("source") or "",
+        "recipient_message": rec.get("message") or "",
+        "recipient_items": rec.get("items") or [],
+        "property_recipient_result": rec.get("property_result") or {},
+        "customer_recipient_result": rec.get("customer_result") or {},
+    }
 
-    fields["recipient_source"] = rec.get("source") or ""
-    fields["recipient_message"] = rec.get("message") or ""
-    fields["recipient_items"] = rec.get("items") or []
-    fields["property_recipient_result"] = rec.get("property_result") or {}
-    fields["customer_recipient_result"] = rec.get("customer_result") or {}
 
+RECIPIENT_FIELD_KEYS = tuple(_recipient_fields({}))
+
+
+def _apply_recipient_fields(fields: dict, *, refresh: bool = False) -> dict:
+    """
+    Fill the recipient fields, reusing the resolution stored on the document
+    when it was computed for the same property/customer. Snowflake is only
+    queried when there is nothing usable stored, or on refresh=True.
+    """
+    rec = None if refresh else _stored_recipient_resolution(fields)
+
+    if rec is None:
+        rec = _get_invoice_recipient_resolution(fields)
+        if not rec.get("lookup_failed"):
+            resolved_at = datetime.now(timezone.utc).isoformat()
+            fields["recipient_resolution"] = {
+                **rec,
+                "lookup_key": _recipient_lookup_key(fields),
+                "resolved_at": resolved_at,
+            }
+            fields["recipient_resolved_at"] = resolved_at
+
+    fields.update(_recipient_fields(rec))
     return rec
 
 
+def _resolve_recipients_for_doc(doc_id: str, refresh: bool = False) -> dict | None:
+    """
+    Resolve and persist recipients for a doc. Runs as a background task right
+    after a draft is built, so save/send normally find it already stored.
+    """
+    with SessionLocal() as db:
+        row = db.execute(
+            text("SELECT extracted_fields, user_overrides FROM public.documents WHERE id = :id"),
+            {"id": doc_id},
+        ).mappings().first()
+        if not row:
+            return None
+
+        fields = _best_fields(dict(row))
+        if not refresh and _stored_recipient_resolution(fields):
+            return fields
+
+        try:
+            _apply_recipient_fields(fields, refresh=True)
+        except Exception as e:
+            print(f"[invoice recipients] resolution failed for doc {doc_id}: {e}")
+            return None
+
+        merge_document_json(db, doc_id, _recipient_patch(fields))
+        db.commit()
+        return fields
+
+
+def _recipient_patch(fields: dict) -> dict:
+    patch = {k: fields.get(k) for k in RECIPIENT_FIELD_KEYS}
+    if fields.get("recipient_resolution"):
+        patch["recipient_resolution"] = fields["recipient_resolution"]
+        patch["recipient_resolved_at"] = fields.get("recipient_resolved_at")
+    return patch
+
+
+def _lookup_recipients(fields: dict) -> dict:
+    _apply_recipient_fields(fields, refresh=True)
+    return fields
+
+
+def _resolve_recipients_inline(fields: dict) -> tuple[bool, Future]:
+    """
+    Run the recipient lookup on a copy of `fields`, waiting up to
+    RECIPIENT_INLINE_TIMEOUT_SECONDS. If it finishes, the result is merged
+    into `fields` and True is returned; otherwise it keeps running and the
+    caller queues _save_recipients_when_done with the future.
+    """
+    future = _recipient_pool.submit(_lookup_recipients, dict(fields))
+    try:
+        resolved = future.result(timeout=RECIPIENT_INLINE_TIMEOUT_SECONDS)
+    except FutureTimeout:
+        return False, future
+    except Exception as e:
+        print(f"[invoice recipients] inline resolution failed: {e}")
+        return False, future
+
+    fields.update(_recipient_patch(resolved))
+    return True, future
+
+
+def _save_recipients_when_done(doc_id: str, future: Future) -> None:
+    """
+    Background task: store the result of a lookup that outlived the build
+    request (or redo it via _resolve_recipients_for_doc if it failed).
+    """
+    try:
+        resolved = future.result()
+    except Exception:
+        _resolve_recipients_for_doc(doc_id)
+        return
+
+    with SessionLocal() as db:
+        merge_document_json(db, doc_id, _recipient_patch(resolved))
+        db.commit()
+
+
 def _find_existing_active_invoice(db, buildops_invoice_id: str | None, invoice_number: str | None):
     if buildops_invoice_id:
         row = db.execute(
@@ -352,9 +495,67 @@ def _find_existing_active_invoice(db, buildops_invoice_id: str | None, invoice_n
     return None
 
 
+def _invoice_logo_path() -> str | None:
+    return os.getenv("MAINLINE_LOGO_PATH") or os.getenv("INVOICE_LOGO_PATH")
+
+
+def _invoice_render_hash(normalized: dict, logo_path: str | None) -> str:
+    """
+    What the draft was rendered from: mapper output, logo file and renderer
+    version. A renderer or logo change makes existing drafts non-reusable.
+    """
+    return render_hash(
+        normalized,
+        template=file_version(Path(logo_path or DEFAULT_LOGO)),
+        renderer_version=RENDERER_VERSION,
+    )
+
+
+def _reusable_draft(old_row: dict | None, source_fingerprint: str) -> dict | None:
+    """
+    The existing draft can be handed back as-is when it was built from the
+    same BuildOps data and nobody has edited or finalized it since.
+    """
+    if not old_row:
+        return None
+    if (old_row.get("status") or "").upper() != "DRAFT":
+        return None
+    if old_row.get("user_overrides") or not old_row.get("styled_draft_s3_key"):
+        return None
+
+    ex = old_row.get("extracted_fields") or {}
+    if not isinstance(ex, dict) or ex.get("source_fingerprint") != source_fingerprint:
+        return None
+    return old_row
+
+
+def _refresh_payment_link(doc_id: str, buildops_invoice_id: str) -> None:
+    """
+    Background task: re-issue a stale payment link without holding up the request.
+    """
+    try:
+        payment_url = get_invoice_payment_link(buildops_invoice_id)
+    except Exception as e:
+        print(f"[payment link] background refresh failed for doc {doc_id}: {e}")
+        return
+
+    with SessionLocal() as db:
+        merge_document_json(db, doc_id, payment_link_fields(payment_url))
+        db.commit()
+
+
+def _fetch_payment_link(db, doc_id: str, buildops_invoice_id: str, fields: dict) -> str:
+    payment_url = get_invoice_payment_link(buildops_invoice_id)
+    link = payment_link_fields(payment_url)
+    merge_document_json(db, doc_id, link)
+    fields.update(link)
+    return payment_url
+
+
 @router.post("/api/invoices/{doc_id}/payment-link")
 def create_invoice_payment_link(
     doc_id: str,
+    background_tasks: BackgroundTasks,
     body: GetPaymentLinkIn = Body(default=GetPaymentLinkIn()),
 ):
     with SessionLocal() as db:
@@ -394,58 +595,121 @@ def create_invoice_payment_link(
         if not buildops_invoice_id:
             raise HTTPException(status_code=400, detail="Missing BuildOps invoice id")
 
-        try:
-            payment_url = get_invoice_payment_link(buildops_invoice_id)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to get payment link: {e}")
-
-        merged_fields = dict(fields)
-        merged_fields["payment_url"] = payment_url
+        state = "missing" if body.refresh else cached_payment_link_state(fields)
 
-        db.execute(
-            text(
-                """
-                UPDATE public.documents
-                SET
-                    user_overrides = CAST(:fields AS jsonb),
-                    updated_at = now(),
-                    error = null
-                WHERE id = :id
-                """
-            ),
-            {"id": doc_id, "fields": json.dumps(merged_fields)},
-        )
-        db.commit()
+        if state in ("missing", "expired"):
+            try:
+                payment_url = _fetch_payment_link(db, doc_id, buildops_invoice_id, fields)
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Failed to get payment link: {e}")
+            db.commit()
+        else:
+            payment_url = fields["payment_url"]
+            if state == "stale":
+                background_tasks.add_task(_refresh_payment_link, doc_id, buildops_invoice_id)
 
         return {
             "ok": True,
             "doc_id": doc_id,
             "payment_url": payment_url,
+            "payment_url_created_at": fields.get("payment_url_created_at"),
+            "payment_url_expires_at": fields.get("payment_url_expires_at"),
+            "cached": state in ("fresh", "stale"),
             "total_amount": total_amount,
             "forced": bool(body.force_over_limit and total_amount > 5000),
         }
 
 
+def _build_response(
+    doc_id: str,
+    invoice_number: str,
+    draft_key: str,
+    url: str,
+    fields: dict,
+    *,
+    unchanged: bool,
+    recipient_pending: bool = False,
+) -> dict:
+    return {
+        "ok": True,
+        "doc_id": doc_id,
+        "invoice_number": invoice_number,
+        "styled_draft_s3_key": draft_key,
+        "url": url,
+        "unchanged": unchanged,
+        "payment_url": fields.get("payment_url"),
+        "property_id": fields.get("property_id"),
+        "customer_id": fields.get("customer_id"),
+        "invoice_recipient_to": fields.get("invoice_recipient_to"),
+        "invoice_recipient_cc": fields.get("invoice_recipient_cc") or [],
+        "property_rep_to": fields.get("property_rep_to"),
+        "property_rep_cc": fields.get("property_rep_cc") or [],
+        "recipient_source": fields.get("recipient_source"),
+        "recipient_message": fields.get("recipient_message"),
+        # Recipients are still being looked up; poll /api/invoices/{doc_id}/recipients/refresh
+        "recipient_pending": recipient_pending,
+    }
+
+
 @router.post("/api/invoices/build")
-def build_invoice_from_number(body: BuildInvoiceIn):
+async def build_invoice_from_number(body: BuildInvoiceIn, background_tasks: BackgroundTasks):
     inv_num = (body.invoice_number or "").strip()
     if not inv_num:
         raise HTTPException(status_code=400, detail="invoice_number required")
 
-    bo = BuildOpsClient()
-    normalized = build_invoice_pdf_data_from_number(bo, inv_num)
-    normalized["hide_labor"] = bool(normalized.get("hide_labor", False))
-    normalized["hide_parts"] = bool(normalized.get("hide_parts", False))
+    # BuildOps/Snowflake lookups run concurrently on the loop; DB, render and upload on a worker thread
+    normalized = await build_invoice_pdf_data_from_number_async(get_async_buildops_client(), inv_num)
+    return await run_in_threadpool(_store_invoice_build, body, inv_num, normalized, background_tasks)
 
-    recipient_info = _apply_recipient_fields(normalized)
+
+def _store_invoice_build(body: BuildInvoiceIn, inv_num: str, normalized: dict, background_tasks: BackgroundTasks) -> dict:
+    # Fingerprint the mapper output before we layer recipients etc. on top
+    logo_path = _invoice_logo_path()
+    source_fingerprint = _invoice_render_hash(normalized, logo_path)
 
     normalized_invoice_number = (normalized.get("invoice_number") or inv_num or "").strip()
     buildops_invoice_id = _safe_get_buildops_invoice_id(normalized)
 
-    doc_id = str(uuid4())
     storage = get_storage()
 
-    logo_path = os.getenv("MAINLINE_LOGO_PATH") or os.getenv("INVOICE_LOGO_PATH")
+    if not body.force:
+        with SessionLocal() as db:
+            existing = _reusable_draft(
+                _find_existing_active_invoice(db, buildops_invoice_id, normalized_invoice_number),
+                source_fingerprint,
+            )
+
+        if existing:
+            fields = _best_fields(existing)
+            recipient_pending = False
+            if not _stored_recipient_resolution(fields):
+                resolved, future = _resolve_recipients_inline(fields)
+                recipient_pending = not resolved
+                background_tasks.add_task(_save_recipients_when_done, str(existing["id"]), future)
+
+            draft_key = existing["styled_draft_s3_key"]
+            url = storage.presign_get_url(
+                key=draft_key,
+                expires_seconds=3600,
+                download_filename=f"INVOICE_{normalized_invoice_number}.pdf",
+                inline=True,
+            )
+            return _build_response(
+                str(existing["id"]),
+                normalized_invoice_number,
+                draft_key,
+                url,
+                fields,
+                unchanged=True,
+                recipient_pending=recipient_pending,
+            )
+
+    normalized["hide_labor"] = bool(normalized.get("hide_labor", False))
+    normalized["hide_parts"] = bool(normalized.get("hide_parts", False))
+    normalized["source_fingerprint"] = source_fingerprint
+
+    doc_id = str(uuid4())
+
     pdf_bytes = render_invoice_styled_draft(normalized, logo_path=logo_path)
 
     draft_key = _styled_draft_key_for(doc_id)
@@ -457,6 +721,27 @@ def build_invoice_from_number(body: BuildInvoiceIn):
     with SessionLocal() as db:
         old_row = _find_existing_active_invoice(db, buildops_invoice_id, normalized_invoice_number)
 
+        if old_row:
+            # Same BuildOps invoice -> the issued payment link is still valid
+            old_fields = _best_fields(old_row)
+            if cached_payment_link_state(old_fields) in ("fresh", "stale"):
+                normalized.update({k: old_fields.get(k) for k in PAYMENT_LINK_KEYS})
+
+            # Recipients resolved for the same property/customer carry over too
+            normalized["recipient_resolution"] = old_fields.get("recipient_resolution")
+            if _stored_recipient_resolution(normalized):
+                _apply_recipient_fields(normalized)
+            else:
+                normalized.pop("recipient_resolution", None)
+
+        # Snowflake recipient lookup: inline if it's quick, otherwise after the response
+        recipient_pending = False
+        if not _stored_recipient_resolution(normalized):
+            resolved, future = _resolve_recipients_inline(normalized)
+            if not resolved:
+                recipient_pending = True
+                background_tasks.add_task(_save_recipients_when_done, doc_id, future)
+
         db.execute(
             text(
                 """
@@ -525,21 +810,38 @@ def build_invoice_from_number(body: BuildInvoiceIn):
         inline=True,
     )
 
+    return _build_response(
+        doc_id,
+        normalized_invoice_number,
+        draft_key,
+        url,
+        normalized,
+        unchanged=False,
+        recipient_pending=recipient_pending,
+    )
+
+
+@router.post("/api/invoices/{doc_id}/recipients/refresh")
+def refresh_invoice_recipients(doc_id: str):
+    """
+    Re-query Snowflake for the invoice recipients and store the result.
+    """
+    fields = _resolve_recipients_for_doc(doc_id, refresh=True)
+    if fields is None:
+        raise HTTPException(status_code=404, detail="Not found or recipient lookup failed")
+
     return {
         "ok": True,
         "doc_id": doc_id,
-        "invoice_number": normalized_invoice_number,
-        "styled_draft_s3_key": draft_key,
-        "url": url,
-        "payment_url": normalized.get("payment_url"),
-        "property_id": normalized.get("property_id"),
-        "customer_id": normalized.get("customer_id"),
-        "invoice_recipient_to": normalized.get("invoice_recipient_to"),
-        "invoice_recipient_cc": normalized.get("invoice_recipient_cc") or [],
-        "property_rep_to": normalized.get("property_rep_to"),
-        "property_rep_cc": normalized.get("property_rep_cc") or [],
-        "recipient_source": normalized.get("recipient_source"),
-        "recipient_message": normalized.get("recipient_message"),
+        "recipient_resolved_at": fields.get("recipient_resolved_at"),
+        "property_id": fields.get("property_id"),
+        "customer_id": fields.get("customer_id"),
+        "invoice_recipient_to": fields.get("invoice_recipient_to"),
+        "invoice_recipient_cc": fields.get("invoice_recipient_cc") or [],
+        "invoice_recipient_all_emails": fields.get("invoice_recipient_all_emails") or [],
+        "recipient_source": fields.get("recipient_source"),
+        "recipient_message": fields.get("recipient_message"),
+        "recipient_items": fields.get("recipient_items") or [],
     }
 
 
@@ -552,7 +854,6 @@ def save_final_invoice(doc_id: str, body: dict = Body(...)):
     fields["hide_labor"] = bool(fields.get("hide_labor", False))
     fields["hide_parts"] = bool(fields.get("hide_parts", False))
 
-    _apply_recipient_fields(fields)
     new_status = _status_on_save_final(fields)
     fields["show_paid_stamp"] = _is_paid_invoice(fields)
 
@@ -560,7 +861,7 @@ def save_final_invoice(doc_id: str, body: dict = Body(...)):
         doc = db.execute(
             text(
                 """
-                SELECT id, doc_type, customer_email, status, final_s3_key
+                SELECT id, doc_type, customer_email, status, final_s3_key, extracted_fields, user_overrides
                 FROM public.documents
                 WHERE id = :id
                 """
@@ -586,12 +887,14 @@ def save_final_invoice(doc_id: str, body: dict = Body(...)):
 
         old_final_key = doc.get("final_s3_key")
 
-    storage = get_storage()
-    logo_path = os.getenv("MAINLINE_LOGO_PATH") or os.getenv("INVOICE_LOGO_PATH")
-    final_bytes = render_invoice_styled_draft(fields, logo_path=logo_path)
+    # The editor may not round-trip the stored resolution; fall back to the row's copy
+    if "recipient_resolution" not in fields:
+        fields["recipient_resolution"] = _best_fields(dict(doc)).get("recipient_resolution")
+    _apply_recipient_fields(fields, refresh=bool(body.get("refresh_recipients")))
 
-    fk = _final_key_for(doc_id)
-    storage.upload_pdf_bytes(fk, final_bytes)
+    storage = get_storage()
+    final_bytes = prepare_final(render_invoice_styled_draft(fields, logo_path=_invoice_logo_path()), "INVOICE", label=doc_id)
+    fk, uploaded_new_final = put_final(storage, final_bytes, doc_id=doc_id, doc_type="INVOICE")
 
     bill_name = (fields.get("billClient_name") or "").strip() or None
     prop_addr = _property_address_text(fields)
@@ -622,20 +925,14 @@ def save_final_invoice(doc_id: str, body: dict = Body(...)):
                     "fields": json.dumps(fields),
                 },
             )
+            if old_final_key and old_final_key != fk:
+                tombstone(db, old_final_key, "superseded_final", doc_id)
             db.commit()
     except Exception:
-        try:
-            storage.delete_object(fk)
-        except Exception:
-            pass
+        if uploaded_new_final:
+            tombstone_now(fk, "failed_final", doc_id)
         raise
 
-    if old_final_key and old_final_key != fk:
-        try:
-            storage.delete_object(old_final_key)
-        except Exception:
-            pass
-
     return {
         "ok": True,
         "doc_id": doc_id,
@@ -654,7 +951,7 @@ def save_final_invoice(doc_id: str, body: dict = Body(...)):
 
 
 @router.post("/api/documents/{doc_id}/invoice/send")
-def send_final_invoice_email(doc_id: str, body: SendInvoiceEmailIn):
+def send_final_invoice_email(doc_id: str, body: SendInvoiceEmailIn, background_tasks: BackgroundTasks):
     storage = get_storage()
 
     with SessionLocal() as db:
@@ -690,6 +987,21 @@ def send_final_invoice_email(doc_id: str, body: SendInvoiceEmailIn):
         property_address = row.get("property_address") or _property_address_text(fields)
         payment_url = fields.get("payment_url")
 
+        # Only a link that was already issued is used here; creating one goes through
+        # the payment-link endpoint (which has the over-limit confirmation).
+        link_state = cached_payment_link_state(fields)
+        buildops_invoice_id = _safe_get_buildops_invoice_id(fields)
+        if link_state == "expired" and buildops_invoice_id:
+            try:
+                payment_url = _fetch_payment_link(db, doc_id, buildops_invoice_id, fields)
+            except Exception as e:
+                print(f"[payment link] refresh failed for doc {doc_id}, sending without link: {e}")
+                payment_url = None
+        elif link_state == "expired":
+            payment_url = None
+        elif link_state == "stale" and buildops_invoice_id:
+            background_tasks.add_task(_refresh_payment_link, doc_id, buildops_invoice_id)
+
         default_to = _normalize_email(
             fields.get("invoice_recipient_to")
             or fields.get("property_rep_to")
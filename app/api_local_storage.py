@@ -0,0 +1,48 @@
+# app/api_local_storage.py
+
+from __future__ import annotations
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from app.storage.backend import get_storage, storage_backend
+from app.storage.local_storage import URL_PREFIX, LocalStorage, verify_url_params
+
+router = APIRouter(prefix=URL_PREFIX, tags=["local-storage"])
+
+
+@router.get("/{key:path}")
+def get_local_object(
+    key: str,
+    expires: int = Query(0),
+    disposition: str = Query(""),
+    signature: str = Query(""),
+):
+    """
+    Serves LocalStorage objects for its presigned and public URLs.
+    Only active with STORAGE_BACKEND=local.
+    """
+    if storage_backend() != "local":
+        raise HTTPException(status_code=404, detail="Not found")
+
+    storage = get_storage()
+    assert isinstance(storage, LocalStorage)
+
+    # final/ is public, like the CloudFront distribution; the rest needs a valid signature
+    if not key.startswith("final/") and not verify_url_params(key, expires, disposition, signature):
+        raise HTTPException(status_code=403, detail="Invalid or expired signature")
+
+    try:
+        path = storage.object_path(key)
+    except (FileNotFoundError, ValueError):
+        raise HTTPException(status_code=404, detail="Not found")
+
+    head = storage.head_object(key)
+    headers = {}
+    disp = disposition or head.get("ContentDisposition")
+    if disp:
+        headers["Content-Disposition"] = disp
+    if head.get("CacheControl"):
+        headers["Cache-Control"] = head["CacheControl"]
+    media_type = "application/pdf" if disposition else head["ContentType"]
+    return FileResponse(path, media_type=media_type, headers=headers)
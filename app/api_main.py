@@ -4,24 +4,27 @@ from __future__ import annotations
 import os
 import json
 
-from datetime import datetime, timezone
 from pathlib import Path
 from typing import Literal, List, Optional
 
-from fastapi import Body, FastAPI, HTTPException, Query, UploadFile, File, Form
-from fastapi.responses import RedirectResponse
+from fastapi import BackgroundTasks, Body, FastAPI, HTTPException, Query, Request, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, EmailStr
 from sqlalchemy import text
 
 from app.db import SessionLocal
-from app.email.smtp_sender import send_email_brevo_smtp
+from app.email.smtp_sender import close_smtp_pools, send_email_brevo_smtp
 from app.email.template_router import build_subject, email_kind_for, render_html, template_for_kind
 from app.security.quote_response_token import make_token, verify_token
 from app.services.document_fields import get_fields, set_final
-from app.services.keys import final_key_for
-from app.services.pdf_stamp import stamp_pdf
-from app.services.styling_service import ensure_draft, _mark_older_quote_rows_replaced
+from app.services.final_store import promote_draft, put_final
+from app.services.object_gc import start_in_background as start_object_gc, tombstone, tombstone_now
+from app.buildops_sync import start_in_background as start_buildops_sync
+from app.services.pdf_optimize import PdfSizeBudgetExceeded, prepare_final
+from app.services.pdf_stamp import STAMP_ENGINES, stamp_pdf
+from app.services.styling_service import ensure_draft, service_quote_render_hash, _mark_older_quote_rows_replaced
 from app.services.service_quote_editor import json_to_service_quote, normalize_service_quote_fields
 from app.services.additional_documents import (
     list_additional_documents,
@@ -32,22 +35,54 @@ from app.services.additional_documents import (
 )
 
 from app.api_proposal import _normalize_proposal_fields
-from app.services.proposal_service import build_proposal_document
-from app.storage.s3_storage import get_storage
+from app.services.proposal_service import build_proposal_final, proposal_render_hash
+from app.storage.async_storage import get_async_storage, shutdown_async_storage
+from app.storage.backend import get_storage, s3_cache_stats
 from app.styling.service_quote.renderer import render_service_quote
-from app.api_invoice import router as invoice_router
+from app.styling.proposal.fragment_cache import preload_in_background
+from app.api_invoice import _refresh_payment_link, router as invoice_router
 from app.api_proposal import router as proposal_router
 from app.api_brevo_webhook import router as brevo_webhook_router
-from app.services.payment_link import get_invoice_payment_link
+from app.api_local_storage import router as local_storage_router
+from app.services.payment_link import cached_payment_link_state
 
-from app.buildops_client import BuildOpsClient
+from app.buildops_async_client import close_async_buildops_client, get_async_buildops_client
 from app.services.snowflake import resolve_service_quote_contacts
 
 app = FastAPI(title="PDF Polish API")
 
+
+@app.exception_handler(PdfSizeBudgetExceeded)
+def _pdf_size_budget_exceeded(request: Request, exc: PdfSizeBudgetExceeded):
+    return JSONResponse(status_code=413, content={"detail": str(exc)})
+
+
 app.include_router(invoice_router)
 app.include_router(proposal_router)
 app.include_router(brevo_webhook_router)
+app.include_router(local_storage_router)
+
+@app.on_event("startup")
+def _warm_caches():
+    preload_in_background()
+    start_object_gc()
+    start_buildops_sync()
+
+
+@app.on_event("shutdown")
+def _stop_storage_executor():
+    shutdown_async_storage()
+
+
+@app.on_event("shutdown")
+def _close_smtp_connections():
+    close_smtp_pools()
+
+
+@app.on_event("shutdown")
+async def _close_buildops_client():
+    await close_async_buildops_client()
+
 
 app.add_middleware(
     CORSMiddleware,
@@ -71,7 +106,7 @@ def root():
 
 @app.get("/api/health")
 def health():
-    return {"ok": True}
+    return {"ok": True, "s3_cache": s3_cache_stats()}
 
 
 def _is_replace_blocked_doc(doc_type: str | None) -> bool:
@@ -412,6 +447,9 @@ def finalize_document(
     force: bool = False,
 ):
     stamp_text = (body.get("text") or "This is final").strip() or "This is final"
+    stamp_engine = (body.get("engine") or "").strip().lower() or None
+    if stamp_engine and stamp_engine not in STAMP_ENGINES:
+        raise HTTPException(status_code=400, detail=f"Unknown stamp engine: {stamp_engine}")
     storage = get_storage()
 
     with SessionLocal() as db:
@@ -447,9 +485,6 @@ def finalize_document(
             raise HTTPException(status_code=400, detail="Document missing original_s3_key")
 
         source_key = draft_key or original_key
-        version = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S%f")
-        versioned_doc_id = f"{doc_id}-{version}"
-        final_key_path = final_key_for(original_key, versioned_doc_id, rowd["doc_type"])
 
         db.execute(
             text(
@@ -467,9 +502,10 @@ def finalize_document(
 
         try:
             src_bytes = storage.download_bytes(source_key)
-            final_bytes = stamp_pdf(src_bytes, stamp_text)
-            storage.upload_pdf_bytes(final_key_path, final_bytes)
-            uploaded_new_final = True
+            final_bytes = stamp_pdf(src_bytes, stamp_text, engine=stamp_engine)
+            final_key, uploaded_new_final = put_final(
+                storage, final_bytes, doc_id=doc_id, doc_type=rowd["doc_type"]
+            )
 
             db.execute(
                 text(
@@ -482,26 +518,19 @@ def finalize_document(
                     WHERE id=:id
                     """
                 ),
-                {"id": doc_id, "k": final_key_path},
+                {"id": doc_id, "k": final_key},
             )
+            if old_final_key and old_final_key != final_key:
+                tombstone(db, old_final_key, "superseded_final", doc_id)
             db.commit()
 
-            if old_final_key and old_final_key != final_key_path:
-                try:
-                    storage.delete_object(old_final_key)
-                except Exception:
-                    pass
-
-            return {"ok": True, "final_s3_key": final_key_path, "source_used": source_key}
+            return {"ok": True, "final_s3_key": final_key, "source_used": source_key}
 
         except Exception as e:
             db.rollback()
 
             if uploaded_new_final:
-                try:
-                    storage.delete_object(final_key_path)
-                except Exception:
-                    pass
+                tombstone_now(final_key, "failed_final", doc_id)
 
             db.execute(
                 text(
@@ -659,7 +688,7 @@ def save_final_proposal(doc_id: str, body: dict = Body(...)):
         row = db.execute(
             text(
                 """
-                SELECT id, doc_type, status, final_s3_key
+                SELECT id, doc_type, status, final_s3_key, styled_draft_s3_key, draft_fields_hash, draft_sha256
                 FROM public.documents
                 WHERE id = :id
                 """
@@ -685,14 +714,30 @@ def save_final_proposal(doc_id: str, body: dict = Body(...)):
     storage = get_storage()
 
     try:
-        final_pdf_bytes = build_proposal_document(fields)
-
-        now = datetime.now(timezone.utc)
-        d = now.date().isoformat()
-        stamp = now.strftime("%Y%m%d%H%M%S")
-        final_key = f"final/proposals/{d}/{doc_id}-{stamp}.pdf"
-
-        storage.upload_pdf_bytes(final_key, final_pdf_bytes)
+        # Unchanged since the draft was built -> promote the draft, no re-render
+        draft_key = rowd.get("styled_draft_s3_key")
+        reused_draft = bool(
+            draft_key
+            and rowd.get("draft_sha256")
+            and rowd.get("draft_fields_hash")
+            and rowd["draft_fields_hash"] == proposal_render_hash(fields)
+        )
+        if reused_draft:
+            final_key, _ = promote_draft(
+                storage,
+                draft_key,
+                draft_sha256=rowd["draft_sha256"],
+                doc_id=doc_id,
+                doc_type="PROJECT_QUOTE",
+                label=doc_id,
+            )
+        else:
+            final_key, _ = put_final(
+                storage,
+                build_proposal_final(fields, label=doc_id),
+                doc_id=doc_id,
+                doc_type="PROJECT_QUOTE",
+            )
 
         proposal_number = str(fields.get("proposal_number") or "").strip() or None
         customer_name = str(fields.get("customer_name") or "").strip() or None
@@ -749,14 +794,10 @@ def save_final_proposal(doc_id: str, body: dict = Body(...)):
                     },
                 )
 
+            if old_final_key and old_final_key != final_key:
+                tombstone(db, old_final_key, "superseded_final", doc_id)
             db.commit()
 
-        if old_final_key and old_final_key != final_key:
-            try:
-                storage.delete_object(old_final_key)
-            except Exception:
-                pass
-
         return {
             "ok": True,
             "doc_id": doc_id,
@@ -766,8 +807,11 @@ def save_final_proposal(doc_id: str, body: dict = Body(...)):
             "final_s3_key": final_key,
             "customer_email": customer_email,
             "customer_address": customer_address,
+            "reused_draft": reused_draft,
         }
 
+    except PdfSizeBudgetExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Proposal save-final failed: {e}")
     
@@ -782,7 +826,13 @@ def save_final(doc_id: str, body: dict = Body(...)):
 
     with SessionLocal() as db:
         row = db.execute(
-            text("SELECT id, doc_type, status, original_s3_key, final_s3_key FROM public.documents WHERE id=:id"),
+            text(
+                """
+                SELECT id, doc_type, status, original_s3_key, final_s3_key, styled_draft_s3_key, draft_fields_hash, draft_sha256
+                FROM public.documents
+                WHERE id=:id
+                """
+            ),
             {"id": doc_id},
         ).mappings().first()
 
@@ -817,6 +867,7 @@ def save_final(doc_id: str, body: dict = Body(...)):
         db.commit()
 
         fk = None
+        uploaded_new_final = False
 
         try:
             set_final(db, target_doc_id, fields)
@@ -855,13 +906,26 @@ def save_final(doc_id: str, body: dict = Body(...)):
                 os.getenv("SERVICE_QUOTE_TEMPLATE_PDF") or "templates/Mainline-Service-Quote.pdf"
             )
 
-            final_bytes = render_service_quote(template_path, data)
-
-            version = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S%f")
-            versioned_doc_id = f"{target_doc_id}-{version}"
-
-            fk = final_key_for(original_key, versioned_doc_id, doc_type=doc_type)
-            storage.upload_pdf_bytes(fk, final_bytes)
+            # Unchanged since the draft was styled -> promote the draft instead of re-rendering
+            draft_key = rowd.get("styled_draft_s3_key")
+            reused_draft = bool(
+                draft_key
+                and rowd.get("draft_sha256")
+                and rowd.get("draft_fields_hash")
+                and rowd["draft_fields_hash"] == service_quote_render_hash(data, template_path)
+            )
+            if reused_draft:
+                fk, uploaded_new_final = promote_draft(
+                    storage,
+                    draft_key,
+                    draft_sha256=rowd["draft_sha256"],
+                    doc_id=target_doc_id,
+                    doc_type=doc_type,
+                    label=target_doc_id,
+                )
+            else:
+                final_bytes = prepare_final(render_service_quote(template_path, data), doc_type, label=target_doc_id)
+                fk, uploaded_new_final = put_final(storage, final_bytes, doc_id=target_doc_id, doc_type=doc_type)
 
             db.execute(
                 text(
@@ -880,13 +944,9 @@ def save_final(doc_id: str, body: dict = Body(...)):
             if quote_num:
                 _mark_older_quote_rows_replaced(db, quote_num, keep_id=target_doc_id)
 
-            db.commit()
-
             if old_final_key and old_final_key != fk:
-                try:
-                    storage.delete_object(old_final_key)
-                except Exception:
-                    pass
+                tombstone(db, old_final_key, "superseded_final", target_doc_id)
+            db.commit()
 
             return {
                 "ok": True,
@@ -894,16 +954,14 @@ def save_final(doc_id: str, body: dict = Body(...)):
                 "final_s3_key": fk,
                 "customer_email": client_email,
                 "reused_existing": False,
+                "reused_draft": reused_draft,
             }
 
         except Exception as e:
             db.rollback()
 
-            if fk:
-                try:
-                    storage.delete_object(fk)
-                except Exception:
-                    pass
+            if uploaded_new_final:
+                tombstone_now(fk, "failed_final", target_doc_id)
 
             db.execute(
                 text(
@@ -1084,8 +1142,7 @@ def api_download_additional_document(doc_id: str, additional_doc_id: str):
 
     return RedirectResponse(url)
 
-@app.get("/api/documents/{doc_id}/service-quote-contact-suggestion")
-def service_quote_contact_suggestion(doc_id: str):
+def _service_quote_contact_inputs(doc_id: str) -> dict:
     with SessionLocal() as db:
         docrow = db.execute(
             text(
@@ -1125,6 +1182,19 @@ def service_quote_contact_suggestion(doc_id: str):
         )
         original_phone = str(fields.get("client_phone") or "").strip()
 
+    return {
+        "quote_number": quote_number,
+        "original_name": original_name,
+        "original_email": original_email,
+        "original_phone": original_phone,
+    }
+
+
+@app.get("/api/documents/{doc_id}/service-quote-contact-suggestion")
+async def service_quote_contact_suggestion(doc_id: str):
+    inputs = await run_in_threadpool(_service_quote_contact_inputs, doc_id)
+    quote_number = inputs["quote_number"]
+
     property_id = ""
     customer_id = ""
     buildops_quote_id = ""
@@ -1132,19 +1202,20 @@ def service_quote_contact_suggestion(doc_id: str):
 
     if quote_number:
         try:
-            ids = BuildOpsClient().get_quote_property_customer_ids(quote_number)
+            ids = await get_async_buildops_client().get_quote_property_customer_ids(quote_number)
             buildops_quote_id = ids.get("quote_id") or ""
             property_id = ids.get("property_id") or ""
             customer_id = ids.get("customer_id") or ""
         except Exception as e:
             buildops_error = str(e)
 
-    result = resolve_service_quote_contacts(
+    result = await run_in_threadpool(
+        resolve_service_quote_contacts,
         property_id=property_id,
         customer_id=customer_id,
-        original_name=original_name,
-        original_email=original_email,
-        original_phone=original_phone,
+        original_name=inputs["original_name"],
+        original_email=inputs["original_email"],
+        original_phone=inputs["original_phone"],
     )
 
     return {
@@ -1158,7 +1229,7 @@ def service_quote_contact_suggestion(doc_id: str):
 
 
 @app.post("/api/documents/{doc_id}/send-email")
-def send_email_any(doc_id: str, body: SendEmailIn):
+def send_email_any(doc_id: str, body: SendEmailIn, background_tasks: BackgroundTasks):
     sql = text(
         """
         SELECT
@@ -1269,12 +1340,15 @@ def send_email_any(doc_id: str, body: SendEmailIn):
 
         payment_url = None
         if "INVOICE" in (doc_type or "").upper():
+            # Use the link stored on the document; issuing one is left to a background task
+            link_fields = _as_dict_maybe(rowd.get("user_overrides")) or _as_dict_maybe(rowd.get("extracted_fields"))
+            link_state = cached_payment_link_state(link_fields)
+            if link_state in ("fresh", "stale"):
+                payment_url = link_fields.get("payment_url")
+
             buildops_invoice_id = _get_buildops_invoice_id(rowd)
-            if buildops_invoice_id:
-                try:
-                    payment_url = get_invoice_payment_link(buildops_invoice_id)
-                except Exception:
-                    payment_url = None
+            if link_state != "fresh" and buildops_invoice_id:
+                background_tasks.add_task(_refresh_payment_link, real_doc_id, buildops_invoice_id)
 
         if reviewable:
             doc_word = _doc_word_for_reviewable(rowd)
@@ -1767,7 +1841,7 @@ async def api_upload_additional_document(
     file: UploadFile = File(...),
     display_name: str = Form(...),
 ):
-    storage = get_storage()
+    storage = get_async_storage()
     with SessionLocal() as db:
         item = await create_uploaded_additional_document(
             db=db,
@@ -17,8 +17,8 @@ from app.services.snowflake import (
     get_properties_for_customer,
     get_proposal_by_opportunity_number,
 )
-from app.services.proposal_service import build_proposal_document
-from app.storage.s3_storage import get_storage
+from app.services.proposal_service import proposal_render_hash, upload_proposal_document
+from app.storage.backend import get_storage
 
 router = APIRouter(prefix="/api/proposals", tags=["proposals"])
 logger = logging.getLogger(__name__)
@@ -249,11 +249,9 @@ def api_build_proposal(payload: BuildProposalRequest):
                 detail="Proposal number is required. Please load an opportunity first.",
             )
         
-        pdf_bytes = build_proposal_document(fields)
-
         doc_id = str(uuid4())
         draft_key = _styled_draft_key_for(doc_id)
-        storage.upload_pdf_bytes(draft_key, pdf_bytes)
+        _, draft_sha256 = upload_proposal_document(fields, storage, draft_key)
 
         proposal_number = proposal_number or None
         customer_name = str(fields.get("customer_name") or "").strip() or None
@@ -274,6 +272,8 @@ def api_build_proposal(payload: BuildProposalRequest):
                         quote_number,
                         original_s3_key,
                         styled_draft_s3_key,
+                        draft_fields_hash,
+                        draft_sha256,
                         extracted_fields,
                         created_at,
                         updated_at
@@ -288,6 +288,8 @@ def api_build_proposal(payload: BuildProposalRequest):
                         :quote_number,
                         :original_s3_key,
                         :styled_draft_s3_key,
+                        :draft_fields_hash,
+                        :draft_sha256,
                         CAST(:extracted_fields AS jsonb),
                         now(),
                         now()
@@ -302,6 +304,8 @@ def api_build_proposal(payload: BuildProposalRequest):
                     "quote_number": proposal_number,
                     "original_s3_key": draft_key,
                     "styled_draft_s3_key": draft_key,
+                    "draft_fields_hash": proposal_render_hash(fields),
+                    "draft_sha256": draft_sha256,
                     "extracted_fields": json.dumps(fields),
                 },
             )
@@ -0,0 +1,295 @@
+# app/buildops_async_client.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from app.buildops_client import BASE_URL, _env_required
+from app.services.rate_limit import IDEMPOTENT_METHODS, RequestScheduler, endpoint_key, get_buildops_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBuildOpsClient:
+    """
+    asyncio twin of BuildOpsClient.
+
+    One pooled httpx.AsyncClient per instance; share an instance across
+    coroutines (get_async_buildops_client()) so lookups reuse keep-alive
+    connections. Requests take the same process-wide scheduler slots and
+    token bucket as the sync client, and follow its retry rules.
+    """
+
+    def __init__(
+        self,
+        tenant_id: Optional[str] = None,
+        client_id: Optional[str] = None,
+        client_secret: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout: int = 30,
+        max_connections: int = 20,
+        scheduler: Optional[RequestScheduler] = None,
+        http: Optional[httpx.AsyncClient] = None,
+    ):
+        self.base_url = base_url or BASE_URL
+        self.tenant_id = tenant_id or _env_required("BUILDOPS_TENANT_ID")
+        self.client_id = client_id or _env_required("BUILDOPS_CLIENT_ID")
+        self.client_secret = client_secret or _env_required("BUILDOPS_SECRET_KEY")
+        self.timeout = timeout
+        self.scheduler = scheduler or get_buildops_scheduler()
+
+        self._owns_http = http is None
+        self._http = http or httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+        self._token: Optional[str] = None
+        self._token_ts: float = 0.0
+        self._token_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "AsyncBuildOpsClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._owns_http:
+            await self._http.aclose()
+
+    # ---------------- Transport ----------------
+    @staticmethod
+    def _should_retry_error(method: str, exc: httpx.TransportError) -> bool:
+        # Same rule as RequestScheduler.should_retry_error: a non-idempotent
+        # request is only retried if it never reached the server
+        if method.upper() in IDEMPOTENT_METHODS:
+            return True
+        return isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout))
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        do_req: Callable[[], Awaitable[httpx.Response]],
+    ) -> httpx.Response:
+        endpoint = endpoint_key(path)
+        attempt = 0
+
+        while True:
+            try:
+                async with self.scheduler.async_slot(endpoint):
+                    r = await do_req()
+            except httpx.TransportError as e:
+                if attempt >= self.scheduler.max_retries or not self._should_retry_error(method, e):
+                    raise
+                delay = self.scheduler.backoff_delay(attempt)
+                logger.warning("BuildOps %s %s network error (%s); retrying in %.2fs", method, path, e, delay)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            delay = self.scheduler.on_response(r.status_code, r.headers.get("Retry-After"), attempt)
+            if not self.scheduler.should_retry(method, r.status_code) or attempt >= self.scheduler.max_retries:
+                return r
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _get_token(self) -> str:
+        url = f"{self.base_url}/auth/token"
+        payload = {"clientId": self.client_id, "clientSecret": self.client_secret}
+
+        r = await self._send(
+            "POST",
+            "/auth/token",
+            lambda: self._http.post(url, json=payload, headers={"Content-Type": "application/json"}),
+        )
+        r.raise_for_status()
+        data = r.json()
+
+        token = data.get("token") or data.get("access_token")
+        if not token:
+            raise RuntimeError(f"No token in BuildOps response: {data}")
+
+        self._token = token
+        self._token_ts = time.time()
+        return token
+
+    async def _headers(self) -> Dict[str, str]:
+        if not self._token:
+            async with self._token_lock:
+                if not self._token:
+                    await self._get_token()
+        return {
+            "Accept": "application/json",
+            "tenantId": self.tenant_id,
+            "Authorization": f"Bearer {self._token}",
+        }
+
+    async def _request(self, method: str, path: str, *, json: Any = None, params: Dict[str, Any] | None = None) -> Any:
+        if not path.startswith("/"):
+            path = "/" + path
+        url = f"{self.base_url}{path}"
+
+        async def do_req() -> httpx.Response:
+            return await self._http.request(
+                method,
+                url,
+                headers=await self._headers(),
+                json=json,
+                params=params,
+            )
+
+        r = await self._send(method, path, do_req)
+        if r.status_code == 401:
+            logger.warning("BuildOps 401; refreshing token and retrying once.")
+            stale = self._token
+            async with self._token_lock:
+                # Another coroutine may already have refreshed it.
+                if self._token == stale:
+                    await self._get_token()
+            r = await self._send(method, path, do_req)
+
+        try:
+            r.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            raise RuntimeError(f"BuildOps {method} {path} failed: {e} | {r.text[:500]}") from e
+
+        return r.json() if r.text else None
+
+    async def get(self, path: str, *, params: Dict[str, Any] | None = None) -> Any:
+        return await self._request("GET", path, params=params)
+
+    async def post(self, path: str, *, json: Any = None, params: Dict[str, Any] | None = None) -> Any:
+        return await self._request("POST", path, json=json, params=params)
+
+    # ---------------- Invoices ----------------
+    async def get_invoice_by_id(self, invoice_id: str) -> Dict[str, Any]:
+        return await self.get(f"/invoices/{invoice_id}")
+
+    async def lookup_invoice_id(self, invoice_number: str) -> str:
+        from app.invoice_lookup import get_invoice_id_by_number  # local import avoids cycles
+        return await asyncio.to_thread(get_invoice_id_by_number, str(invoice_number).strip())
+
+    async def get_invoice_by_number(self, invoice_number: str) -> Dict[str, Any]:
+        inv_id = await self.lookup_invoice_id(invoice_number)
+        return await self.get_invoice_by_id(inv_id)
+
+    # ---------------- Quotes ----------------
+    async def get_quotes(
+        self,
+        *,
+        quote_number: str | int | None = None,
+        page: int = 0,
+        page_size: int = 10,
+    ) -> Dict[str, Any]:
+        params: Dict[str, Any] = {
+            "page": page,
+            "page_size": page_size,
+        }
+
+        if quote_number:
+            params["quote_number"] = str(quote_number).strip()
+
+        return await self.get("/quotes", params=params)
+
+    async def get_quote_by_number(self, quote_number: str | int) -> Dict[str, Any] | None:
+        qn = str(quote_number or "").strip()
+        if not qn:
+            return None
+
+        data = await self.get_quotes(quote_number=qn, page=0, page_size=10)
+        items = data.get("items") or []
+
+        for item in items:
+            if str(item.get("quoteNumber") or "").strip() == qn:
+                return item
+
+        return items[0] if items else None
+
+    async def get_quote_property_customer_ids(self, quote_number: str | int) -> Dict[str, str]:
+        quote = await self.get_quote_by_number(quote_number)
+
+        if not quote:
+            return {
+                "quote_id": "",
+                "property_id": "",
+                "customer_id": "",
+            }
+
+        property_id = str(
+            quote.get("propertyId")
+            or quote.get("property_id")
+            or quote.get("property", {}).get("id")
+            or ""
+        ).strip()
+
+        customer_id = str(
+            quote.get("billingCustomerId")
+            or quote.get("customerId")
+            or quote.get("customer_id")
+            or quote.get("billingCustomer", {}).get("id")
+            or quote.get("customer", {}).get("id")
+            or ""
+        ).strip()
+
+        # Fallback: quote has property_id but no customer_id.
+        # Get customer_id from property detail.
+        if property_id and not customer_id:
+            try:
+                prop = await self.get_property_by_id(property_id)
+                customer_id = str(
+                    prop.get("customerId")
+                    or prop.get("customer_id")
+                    or prop.get("customer", {}).get("id")
+                    or ""
+                ).strip()
+            except Exception as e:
+                print("PROPERTY CUSTOMER LOOKUP FAILED:", e)
+
+        return {
+            "quote_id": str(quote.get("id") or "").strip(),
+            "property_id": property_id,
+            "customer_id": customer_id,
+        }
+
+    # ---------------- Properties ----------------
+    async def get_property_by_id(self, property_id: str) -> Dict[str, Any]:
+        return await self.get(f"/properties/{property_id}")
+
+    # ---------------- Customers ----------------
+    async def get_customer_by_id(self, customer_id: str) -> Dict[str, Any]:
+        return await self.get(f"/customers/{customer_id}")
+
+    # ---------------- Jobs ----------------
+    async def get_job_by_id(self, job_id: str) -> Dict[str, Any]:
+        return await self.get(f"/jobs/{job_id}")
+
+
+_async_client: AsyncBuildOpsClient | None = None
+
+
+def get_async_buildops_client() -> AsyncBuildOpsClient:
+    """
+    Process-wide client for async routes, so every request shares one
+    connection pool. Only call from the API's event loop.
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncBuildOpsClient()
+    return _async_client
+
+
+async def close_async_buildops_client() -> None:
+    global _async_client
+    client, _async_client = _async_client, None
+    if client is not None:
+        await client.aclose()
@@ -8,6 +8,8 @@ from typing import Any, Dict, Optional
 
 import requests
 
+from app.services.rate_limit import RequestScheduler, get_buildops_scheduler
+
 logger = logging.getLogger(__name__)
 
 BASE_URL = os.getenv("BUILDOPS_BASE_URL", "https://public-api.live.buildops.com/v1")
@@ -28,12 +30,15 @@ class BuildOpsClient:
         client_secret: Optional[str] = None,
         base_url: Optional[str] = None,
         timeout: int = 30,
+        scheduler: Optional[RequestScheduler] = None,
     ):
         self.base_url = base_url or BASE_URL
         self.tenant_id = tenant_id or _env_required("BUILDOPS_TENANT_ID")
         self.client_id = client_id or _env_required("BUILDOPS_CLIENT_ID")
         self.client_secret = client_secret or _env_required("BUILDOPS_SECRET_KEY")
         self.timeout = timeout
+        # Shared across every client in the process so the BuildOps quota is global.
+        self.scheduler = scheduler or get_buildops_scheduler()
 
         self._token: Optional[str] = None
         self._token_ts: float = 0.0
@@ -42,7 +47,16 @@ class BuildOpsClient:
         url = f"{self.base_url}/auth/token"
         payload = {"clientId": self.client_id, "clientSecret": self.client_secret}
 
-        r = requests.post(url, json=payload, headers={"Content-Type": "application/json"}, timeout=self.timeout)
+        r = self.scheduler.send(
+            "POST",
+            "/auth/token",
+            lambda: requests.post(
+                url,
+                json=payload,
+                headers={"Content-Type": "application/json"},
+                timeout=self.timeout,
+            ),
+        )
         r.raise_for_status()
         data = r.json()
 
@@ -81,11 +95,11 @@ class BuildOpsClient:
                 timeout=self.timeout,
             )
 
-        r = do_req()
+        r = self.scheduler.send(method, path, do_req)
         if r.status_code == 401:
             logger.warning("BuildOps 401; refreshing token and retrying once.")
             self._get_token()
-            r = do_req()
+            r = self.scheduler.send(method, path, do_req)
 
         try:
             r.raise_for_status()
@@ -0,0 +1,169 @@
+# app/buildops_sync.py
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.buildops_client import BuildOpsClient
+from app.services.buildops_mirror import (
+    MIRROR_TABLES,
+    get_watermark,
+    mirror_enabled,
+    record_updated_at,
+    save_sync_state,
+    upsert_records,
+)
+
+# Query param BuildOps uses for "changed since" on list endpoints (epoch seconds).
+UPDATED_SINCE_PARAM = os.getenv("BUILDOPS_SYNC_UPDATED_SINCE_PARAM", "updated_since")
+
+# Re-read a little before the watermark so records sharing the boundary timestamp aren't skipped.
+OVERLAP_SECONDS = int(os.getenv("BUILDOPS_SYNC_OVERLAP_SECONDS", "60"))
+
+# One sync pass at a time across API instances (session-level advisory lock)
+_SYNC_LOCK_ID = 4_720_114
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)) or default)
+    except ValueError:
+        return default
+
+
+def _entities_from_env() -> Optional[List[str]]:
+    raw = os.getenv("BUILDOPS_SYNC_ENTITIES", "")
+    return [e.strip() for e in raw.split(",") if e.strip()] or None
+
+
+def _items(data: Any) -> List[Dict[str, Any]]:
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        return data.get("items") or data.get("data") or []
+    return []
+
+
+def fetch_updated(
+    bo: BuildOpsClient,
+    entity: str,
+    since: Optional[datetime],
+    *,
+    page_size: int = 100,
+    max_pages: int = 10_000,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield pages of records from /{entity} changed since `since` (all records if None).
+    Stops at the first short page.
+    """
+    for page in range(max_pages):
+        params: Dict[str, Any] = {"page": page, "page_size": page_size}
+        if since:
+            params[UPDATED_SINCE_PARAM] = int((since - timedelta(seconds=OVERLAP_SECONDS)).timestamp())
+
+        items = _items(bo.get(f"/{entity}", params=params))
+        if items:
+            yield items
+        if len(items) < page_size:
+            return
+
+
+def sync_entity(bo: BuildOpsClient, db, entity: str, *, page_size: int = 100) -> Tuple[int, Optional[datetime]]:
+    """
+    One incremental pass for an entity. Pages are committed as they land; the
+    watermark only advances once the whole pass has succeeded.
+    """
+    since = get_watermark(db, entity)
+    watermark = since
+    total = 0
+
+    try:
+        for items in fetch_updated(bo, entity, since, page_size=page_size):
+            total += upsert_records(db, entity, items)
+            db.commit()
+
+            for rec in items:
+                dt = record_updated_at(rec)
+                if dt and (watermark is None or dt > watermark):
+                    watermark = dt
+    except Exception as e:
+        db.rollback()
+        save_sync_state(db, entity, watermark=None, error=f"{type(e).__name__}: {e}")
+        db.commit()
+        raise
+
+    save_sync_state(db, entity, watermark=watermark)
+    db.commit()
+    return total, watermark
+
+
+def main(entities: Optional[List[str]] = None, page_size: int = 100) -> int:
+    from app.db import SessionLocal
+
+    bo = BuildOpsClient()
+    db = SessionLocal()
+    failed = 0
+
+    try:
+        for entity in entities or list(MIRROR_TABLES):
+            try:
+                count, watermark = sync_entity(bo, db, entity, page_size=page_size)
+                print(f"Synced {entity}: {count} records (watermark={watermark.isoformat() if watermark else None})")
+            except Exception as e:
+                failed += 1
+                print(f"Sync {entity}: ERROR {type(e).__name__}: {e}", file=sys.stderr)
+        return failed
+    finally:
+        db.close()
+
+
+def run_forever(stop: Optional[threading.Event] = None) -> None:
+    """
+    Run main() every BUILDOPS_SYNC_INTERVAL_SECONDS (default 300), keeping
+    the mirror inside BUILDOPS_MIRROR_MAX_AGE_SECONDS. A pass is skipped
+    while another instance holds the sync lock.
+    """
+    from app.db import SessionLocal
+
+    stop = stop or threading.Event()
+    interval = max(30, _env_int("BUILDOPS_SYNC_INTERVAL_SECONDS", 300))
+    page_size = _env_int("BUILDOPS_SYNC_PAGE_SIZE", 100)
+
+    while not stop.is_set():
+        try:
+            with SessionLocal() as lock_db:
+                got = lock_db.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": _SYNC_LOCK_ID}).scalar()
+                if got:
+                    try:
+                        main(entities=_entities_from_env(), page_size=page_size)
+                    finally:
+                        lock_db.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": _SYNC_LOCK_ID})
+                        lock_db.commit()
+        except Exception as e:
+            print(f"[buildops-sync] pass failed: {type(e).__name__}: {e}")
+        stop.wait(interval)
+
+
+def start_in_background() -> None:
+    """
+    Run run_forever() on a daemon thread while the mirror is on (BUILDOPS_SYNC=0
+    to skip, e.g. when a cron job or `python -m app.buildops_sync --forever` does it).
+    """
+    if not mirror_enabled():
+        return
+    if os.getenv("BUILDOPS_SYNC", "1").strip().lower() in {"0", "false", "no", "off"}:
+        return
+    threading.Thread(target=run_forever, name="buildops-sync", daemon=True).start()
+
+
+if __name__ == "__main__":
+    if "--forever" in sys.argv[1:]:
+        run_forever()
+        sys.exit(0)
+    page_size = _env_int("BUILDOPS_SYNC_PAGE_SIZE", 100)
+    sys.exit(1 if main(entities=_entities_from_env(), page_size=page_size) else 0)
@@ -5,10 +5,14 @@ import os
 import re
 import ssl
 import smtplib
-from dataclasses import dataclass
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from email.message import EmailMessage
 from email.utils import formataddr
-from typing import Iterable, Optional, Sequence, Tuple
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
 
 
 @dataclass
@@ -44,6 +48,217 @@ def _parse_email_from(value: str) -> Tuple[str, str]:
     return ("Mainline Fire Protection", v)
 
 
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)) or default)
+    except ValueError:
+        return default
+
+
+# Failures that mean the session is gone, not that the message was refused
+_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+@dataclass
+class _PooledConnection:
+    smtp: smtplib.SMTP
+    opened_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    sent: int = 0
+    broken: bool = False
+
+
+class SmtpPool:
+    """
+    Authenticated SMTP sessions kept open between sends.
+
+    At most `size` connections exist at once; callers beyond that wait.
+    A connection idle for more than `noop_after` seconds is checked with
+    NOOP before reuse. Connections are closed after `max_messages` sends or
+    `max_age` seconds, and on any error. The next caller then opens a fresh
+    one (EHLO, STARTTLS, login).
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        *,
+        size: int = 4,
+        max_messages: int = 50,
+        max_age: float = 240.0,
+        noop_after: float = 10.0,
+        timeout: float = 30.0,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.max_messages = max_messages
+        self.max_age = max_age
+        self.noop_after = noop_after
+        self.timeout = timeout
+
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle: deque[_PooledConnection] = deque()
+        self.opened = 0
+        self.reused = 0
+
+    # ---------------- Connections ----------------
+    def _open(self) -> _PooledConnection:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            server.ehlo()
+            server.starttls(context=ssl.create_default_context())
+            server.ehlo()
+            server.login(self.user, self.password)
+        except Exception:
+            server.close()
+            raise
+        with self._lock:
+            self.opened += 1
+        return _PooledConnection(server)
+
+    @staticmethod
+    def _close(conn: _PooledConnection) -> None:
+        try:
+            conn.smtp.quit()
+        except Exception:
+            conn.smtp.close()
+
+    def _expired(self, conn: _PooledConnection, now: float) -> bool:
+        return conn.sent >= self.max_messages or now - conn.opened_at >= self.max_age
+
+    def _healthy(self, conn: _PooledConnection, now: float) -> bool:
+        if now - conn.last_used < self.noop_after:
+            return True
+        try:
+            return conn.smtp.noop()[0] == 250
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(conn: _PooledConnection) -> bool:
+        try:
+            return conn.smtp.rset()[0] == 250
+        except _CONNECTION_ERRORS:
+            return False
+
+    def _checkout(self, fresh: bool = False) -> _PooledConnection:
+        if fresh:
+            return self._open()
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                return self._open()
+
+            now = time.monotonic()
+            if not self._expired(conn, now) and self._healthy(conn, now):
+                with self._lock:
+                    self.reused += 1
+                return conn
+            self._close(conn)
+
+    def _checkin(self, conn: _PooledConnection) -> None:
+        conn.last_used = time.monotonic()
+        if conn.broken or self._expired(conn, conn.last_used):
+            self._close(conn)
+            return
+        with self._lock:
+            self._idle.append(conn)
+
+    @contextmanager
+    def connection(self, fresh: bool = False) -> Iterator[_PooledConnection]:
+        self._slots.acquire()
+        try:
+            conn = self._checkout(fresh)
+            try:
+                yield conn
+            except Exception:
+                conn.broken = True
+                raise
+            finally:
+                self._checkin(conn)
+        finally:
+            self._slots.release()
+
+    # ---------------- Sending ----------------
+    def send_message(self, msg: EmailMessage, from_addr: str, to_addrs: Sequence[str]) -> None:
+        """
+        Send on a pooled session. A reused session is first checked with
+        RSET; if the server has dropped it, the send moves to one freshly
+        opened session (at most one retry). Once MAIL FROM has gone out,
+        any error is raised as-is, so a message is never sent twice.
+        """
+        for fresh in (False, True):
+            with self.connection(fresh=fresh) as conn:
+                if conn.sent and not self._reset(conn):
+                    conn.broken = True
+                    print("[smtp] pooled connection lost before sending; retrying on a new one")
+                    continue
+                conn.smtp.send_message(msg, from_addr=from_addr, to_addrs=list(to_addrs))
+                conn.sent += 1
+                return
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            self._close(conn)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"idle": len(self._idle), "opened": self.opened, "reused": self.reused}
+
+
+_pools: Dict[Tuple[str, int, str], SmtpPool] = {}
+_pools_lock = threading.Lock()
+
+
+def smtp_pool_enabled() -> bool:
+    return os.getenv("SMTP_POOL", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def get_smtp_pool(host: str, port: int, user: str, password: str) -> SmtpPool:
+    """
+    Process-wide pool per (host, port, user). Sizing from env:
+    SMTP_POOL_SIZE (4), SMTP_POOL_MAX_MESSAGES (50), SMTP_POOL_MAX_AGE_SECONDS (240),
+    SMTP_POOL_NOOP_AFTER_SECONDS (10).
+    """
+    key = (host, port, user)
+    pool = _pools.get(key)
+    if pool is None or pool.password != password:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None or pool.password != password:
+                if pool is not None:
+                    pool.close()
+                pool = SmtpPool(
+                    host,
+                    port,
+                    user,
+                    password,
+                    size=max(1, _env_int("SMTP_POOL_SIZE", 4)),
+                    max_messages=max(1, _env_int("SMTP_POOL_MAX_MESSAGES", 50)),
+                    max_age=max(1, _env_int("SMTP_POOL_MAX_AGE_SECONDS", 240)),
+                    noop_after=max(0, _env_int("SMTP_POOL_NOOP_AFTER_SECONDS", 10)),
+                )
+                _pools[key] = pool
+    return pool
+
+
+def close_smtp_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
 def send_email_brevo_smtp(
     *,
     to_email: str,
@@ -64,6 +279,7 @@ def send_email_brevo_smtp(
       SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, EMAIL_FROM
     Optional env:
       EMAIL_REPLY_TO
+      SMTP_POOL=0 to open a connection per email instead of using the pool
 
     Per-email overrides:
       from_value, reply_to
@@ -110,13 +326,17 @@ def send_email_brevo_smtp(
             filename=att.filename,
         )
 
+    to_addrs = [to_email] + cc_list + bcc_list
+
+    if smtp_pool_enabled():
+        get_smtp_pool(host, port, user, password).send_message(msg, from_email, to_addrs)
+        return
+
     context = ssl.create_default_context()
     with smtplib.SMTP(host, port, timeout=30) as server:
         server.ehlo()
         server.starttls(context=context)
         server.ehlo()
         server.login(user, password)
-
-        to_addrs = [to_email] + cc_list + bcc_list
         server.send_message(msg, from_addr=from_email, to_addrs=to_addrs)
         
\ No newline at end of file
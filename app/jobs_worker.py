@@ -15,7 +15,7 @@ from sqlalchemy.exc import IntegrityError
 from app.db import SessionLocal
 from app.models import InboundEmail, Document
 from app.gmail_client import GmailClient
-from app.s3_client import S3Client
+from app.storage.backend import get_storage
 
 
 def iso_date_utc(dt: datetime | None) -> str:
@@ -110,7 +110,7 @@ def guess_kind(subject: str | None, filename: str | None) -> str:
 
 def main(max_jobs: int = 10) -> int:
     gmail = GmailClient()
-    s3 = S3Client()
+    s3 = get_storage()
 
     processed = 0
     db = SessionLocal()
@@ -9,6 +9,7 @@ from sqlalchemy import (
     ForeignKey,
     Index,
     BigInteger,
+    Integer,
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -92,6 +93,10 @@ class Document(Base):
 
     original_s3_key: Mapped[str] = mapped_column(Text, nullable=False)
     styled_draft_s3_key: Mapped[str | None] = mapped_column(Text)
+    # Hash of the renderer input the draft was built from (fields + template + renderer version)
+    draft_fields_hash: Mapped[str | None] = mapped_column(String(64))
+    # SHA-256 of the draft object's bytes, recorded at upload so promoting it needs no download
+    draft_sha256: Mapped[str | None] = mapped_column(String(64))
     final_s3_key: Mapped[str | None] = mapped_column(Text)
 
     status: Mapped[str] = mapped_column(String(32), nullable=False, default="NEW")
@@ -235,3 +240,89 @@ class GmailJob(Base):
     __table_args__ = (
         Index("idx_gmail_jobs_status", "status"),
     )
+
+
+# =========================
+# BuildOps mirror (incremental sync)
+# =========================
+
+class BuildOpsInvoice(Base):
+    """
+    Local copy of a BuildOps invoice payload, keyed by BuildOps id.
+    Kept fresh by app/buildops_sync.py; read by invoice builds before hitting the API.
+    """
+    __tablename__ = "buildops_invoices"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+
+    # BuildOps' own last-modified time for the record (drives the sync watermark)
+    source_updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    synced_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, nullable=False)
+
+
+class BuildOpsCustomer(Base):
+    __tablename__ = "buildops_customers"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+
+    source_updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    synced_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, nullable=False)
+
+
+class BuildOpsProperty(Base):
+    __tablename__ = "buildops_properties"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+
+    source_updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    synced_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, nullable=False)
+
+
+class BuildOpsSyncState(Base):
+    """
+    One row per mirrored entity ("invoices", "customers", "properties")
+    holding the updated-at watermark of the last completed sync pass.
+    """
+    __tablename__ = "buildops_sync_state"
+
+    entity: Mapped[str] = mapped_column(String(32), primary_key=True)
+    watermark: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    last_run_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    # Last pass that finished without error; mirror reads trust the entity while this is recent
+    last_success_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    last_error: Mapped[str | None] = mapped_column(Text)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, onupdate=utcnow, nullable=False)
+
+
+# =========================
+# Storage garbage collection
+# =========================
+
+class StorageTombstone(Base):
+    """
+    An S3 key that is no longer referenced (superseded final, orphan found by
+    the sweep). app/services/object_gc.py deletes these in batches once
+    delete_after has passed; rows are removed when the object is gone.
+    """
+    __tablename__ = "storage_tombstones"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+
+    s3_key: Mapped[str] = mapped_column(Text, unique=True, nullable=False)
+
+    # superseded_final | orphan | ...
+    reason: Mapped[str] = mapped_column(String(32), nullable=False)
+    document_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True))
+
+    delete_after: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str | None] = mapped_column(Text)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("idx_storage_tombstones_delete_after", "delete_after"),
+    )
@@ -11,10 +11,12 @@ from uuid import uuid4
 
 import requests
 from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from app.email.smtp_sender import EmailAttachment
+from app.storage.async_storage import AsyncStorage
 
 
 ALLOWED_CONTENT_TYPES = {
@@ -125,12 +127,16 @@ def list_additional_documents(db: Session, doc_id: str) -> list[dict[str, Any]]:
 
 async def create_uploaded_additional_document(
     db: Session,
-    storage,
+    storage: AsyncStorage,
     doc_id: str,
     display_name: str,
     upload_file: UploadFile,
 ) -> dict[str, Any]:
-    _get_document_row(db, doc_id)
+    """
+    The S3 PUT goes through the storage executor and the (sync) DB work
+    through the threadpool, so nothing here blocks the event loop.
+    """
+    await run_in_threadpool(_get_document_row, db, doc_id)
 
     display_name = _clean_display_name(display_name)
 
@@ -153,8 +159,25 @@ async def create_uploaded_additional_document(
         raise HTTPException(status_code=400, detail="File is too large. Max 10 MB.")
 
     storage_key = _build_storage_key(doc_id, original_filename)
-    storage.upload_bytes(key=storage_key, data=data, content_type=content_type)
+    await storage.upload_bytes(key=storage_key, data=data, content_type=content_type)
+
+    return await run_in_threadpool(
+        _insert_uploaded_row,
+        db,
+        {
+            "id": str(uuid4()),
+            "document_id": doc_id,
+            "display_name": display_name,
+            "source_type": "upload",
+            "storage_key": storage_key,
+            "original_filename": original_filename,
+            "content_type": content_type,
+            "file_size": len(data),
+        },
+    )
 
+
+def _insert_uploaded_row(db: Session, params: dict[str, Any]) -> dict[str, Any]:
     row = db.execute(
         text(
             """
@@ -195,16 +218,7 @@ async def create_uploaded_additional_document(
                 updated_at
             """
         ),
-        {
-            "id": str(uuid4()),
-            "document_id": doc_id,
-            "display_name": display_name,
-            "source_type": "upload",
-            "storage_key": storage_key,
-            "original_filename": original_filename,
-            "content_type": content_type,
-            "file_size": len(data),
-        },
+        params,
     ).mappings().first()
 
     db.commit()
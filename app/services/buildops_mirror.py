@@ -0,0 +1,310 @@
+# app/services/buildops_mirror.py
+from __future__ import annotations
+
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+
+# entity name -> mirror table (also the BuildOps list endpoint: /invoices, /customers, /properties)
+MIRROR_TABLES = {
+    "invoices": "buildops_invoices",
+    "customers": "buildops_customers",
+    "properties": "buildops_properties",
+}
+
+# BuildOps isn't consistent about the last-modified key across entities
+UPDATED_AT_KEYS = ("updatedDate", "updatedAt", "lastUpdatedDate", "modifiedDate", "updated_at")
+
+
+def mirror_enabled() -> bool:
+    return os.getenv("BUILDOPS_MIRROR", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def mirror_max_age() -> Optional[timedelta]:
+    """
+    How far the incremental sync may fall behind before the mirror stops
+    being trusted: once an entity's last successful sync run is older than
+    this, its reads go to the live API (0 = always trust the mirror).
+    """
+    try:
+        secs = int(os.getenv("BUILDOPS_MIRROR_MAX_AGE_SECONDS", "900") or 0)
+    except ValueError:
+        secs = 900
+    return timedelta(seconds=secs) if secs > 0 else None
+
+
+def _table(entity: str) -> str:
+    table = MIRROR_TABLES.get(entity)
+    if not table:
+        raise ValueError(f"Unknown BuildOps mirror entity: {entity}")
+    return table
+
+
+def parse_updated_at(value: Any) -> Optional[datetime]:
+    """
+    BuildOps timestamps come back as epoch seconds, epoch millis or ISO strings.
+    """
+    if value is None or value == "":
+        return None
+
+    if isinstance(value, (int, float)):
+        ts = float(value)
+        if ts > 10_000_000_000:  # millis
+            ts /= 1000.0
+        return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+    s = str(value).strip()
+    if s.isdigit():
+        return parse_updated_at(int(s))
+
+    try:
+        dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def record_updated_at(record: Dict[str, Any]) -> Optional[datetime]:
+    for key in UPDATED_AT_KEYS:
+        dt = parse_updated_at(record.get(key))
+        if dt:
+            return dt
+    return None
+
+
+# ---------------- Writes ----------------
+def upsert_records(db: Session, entity: str, records: Iterable[Dict[str, Any]]) -> int:
+    """
+    Insert/refresh mirror rows. A row is only overwritten when the incoming
+    record is at least as new as what we have (so an out-of-order page or a
+    read-through write can't roll a record back).
+    """
+    table = _table(entity)
+    stmt = text(
+        f"""
+        insert into public.{table} (id, payload, source_updated_at, synced_at)
+        values (:id, :payload, :updated_at, now())
+        on conflict (id)
+        do update set payload=excluded.payload,
+                      source_updated_at=excluded.source_updated_at,
+                      synced_at=now()
+        where public.{table}.source_updated_at is null
+           or excluded.source_updated_at is null
+           or excluded.source_updated_at >= public.{table}.source_updated_at
+        """
+    ).bindparams(bindparam("payload", type_=JSONB))
+
+    rows = []
+    for rec in records:
+        rid = str((rec or {}).get("id") or "").strip()
+        if not rid:
+            continue
+        rows.append({"id": rid, "payload": rec, "updated_at": record_updated_at(rec)})
+
+    if rows:
+        db.execute(stmt, rows)
+    return len(rows)
+
+
+# ---------------- Reads ----------------
+# Rows aren't aged individually: unchanged records are never rewritten by the
+# incremental sync, so a row is as current as the entity's last successful run.
+def _fresh_clause(max_age: Optional[timedelta]) -> str:
+    if not max_age:
+        return ""
+    return """
+        and exists (
+            select 1 from public.buildops_sync_state s
+            where s.entity = :entity and s.last_success_at >= :cutoff
+        )
+    """
+
+
+def _cutoff(entity: str, max_age: Optional[timedelta]) -> Dict[str, Any]:
+    return {"entity": entity, "cutoff": datetime.now(timezone.utc) - max_age} if max_age else {}
+
+
+def get_record(
+    db: Session,
+    entity: str,
+    record_id: str,
+    *,
+    max_age: Optional[timedelta] = None,
+) -> Optional[Dict[str, Any]]:
+    table = _table(entity)
+    row = db.execute(
+        text(f"select payload from public.{table} where id=:id {_fresh_clause(max_age)}"),
+        {"id": str(record_id).strip(), **_cutoff(entity, max_age)},
+    ).first()
+    return dict(row[0]) if row and row[0] else None
+
+
+def find_invoice_id_by_number(
+    db: Session,
+    invoice_number: str,
+    *,
+    max_age: Optional[timedelta] = None,
+) -> Optional[str]:
+    row = db.execute(
+        text(
+            f"""
+            select id from public.buildops_invoices
+            where payload->>'invoiceNumber' = :n {_fresh_clause(max_age)}
+            order by source_updated_at desc nulls last
+            limit 1
+            """
+        ),
+        {"n": str(invoice_number).strip(), **_cutoff("invoices", max_age)},
+    ).first()
+    return str(row[0]) if row else None
+
+
+# ---------------- Sync state ----------------
+def get_watermark(db: Session, entity: str) -> Optional[datetime]:
+    row = db.execute(
+        text("select watermark from public.buildops_sync_state where entity=:e"),
+        {"e": entity},
+    ).first()
+    return row[0] if row else None
+
+
+def save_sync_state(
+    db: Session,
+    entity: str,
+    *,
+    watermark: Optional[datetime],
+    error: Optional[str] = None,
+) -> None:
+    # A failed pass keeps the previous watermark so the next run re-covers the gap,
+    # and leaves last_success_at alone so mirror reads notice the sync falling behind.
+    db.execute(
+        text(
+            """
+            insert into public.buildops_sync_state (entity, watermark, last_run_at, last_success_at, last_error, updated_at)
+            values (:e, :w, now(), case when cast(:err as text) is null then now() end, :err, now())
+            on conflict (entity)
+            do update set watermark=coalesce(:w, public.buildops_sync_state.watermark),
+                          last_run_at=now(),
+                          last_success_at=case when cast(:err as text) is null then now()
+                                               else public.buildops_sync_state.last_success_at end,
+                          last_error=:err,
+                          updated_at=now()
+            """
+        ),
+        {"e": entity, "w": watermark, "err": (error or None) and error[:1000]},
+    )
+
+
+# ---------------- Read-through client ----------------
+class MirroredBuildOpsClient:
+    """
+    Wraps a live BuildOpsClient: invoice/customer/property reads come from the
+    Postgres mirror and only misses go to the API (as do all reads of an
+    entity whose sync is more than max_age behind). Whatever the API returns
+    is written back so the next build hits the mirror.
+
+    Anything not mirrored is passed straight through to the live client.
+    """
+
+    def __init__(self, live, db_factory=None, max_age: Optional[timedelta] = None):
+        if db_factory is None:
+            from app.db import SessionLocal  # lazy: app.db needs DATABASE_URL at import
+            db_factory = SessionLocal
+
+        self.live = live
+        self.db_factory = db_factory
+        self.max_age = max_age if max_age is not None else mirror_max_age()
+        self.hits = 0
+        self.misses = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.live, name)
+
+    def _cached(self, entity: str, record_id: str) -> Optional[Dict[str, Any]]:
+        db = self.db_factory()
+        try:
+            return get_record(db, entity, record_id, max_age=self.max_age)
+        except Exception as e:
+            print(f"[buildops mirror] read failed for {entity}/{record_id}: {e}")
+            return None
+        finally:
+            db.close()
+
+    def _store(self, entity: str, record: Dict[str, Any]) -> None:
+        db = self.db_factory()
+        try:
+            upsert_records(db, entity, [record])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"[buildops mirror] write-back failed for {entity}/{record.get('id')}: {e}")
+        finally:
+            db.close()
+
+    def _get(self, entity: str, record_id: str, fetch) -> Dict[str, Any]:
+        cached = self._cached(entity, record_id)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        record = fetch(record_id)
+        if isinstance(record, dict) and record.get("id"):
+            self._store(entity, record)
+        return record
+
+    def find_invoice_id_by_number(self, invoice_number: str) -> Optional[str]:
+        db = self.db_factory()
+        try:
+            return find_invoice_id_by_number(db, invoice_number, max_age=self.max_age)
+        except Exception as e:
+            print(f"[buildops mirror] invoice number lookup failed for {invoice_number}: {e}")
+            return None
+        finally:
+            db.close()
+
+    def get_invoice_by_id(self, invoice_id: str) -> Dict[str, Any]:
+        return self._get("invoices", invoice_id, self.live.get_invoice_by_id)
+
+    def get_customer_by_id(self, customer_id: str) -> Dict[str, Any]:
+        return self._get("customers", customer_id, self.live.get_customer_by_id)
+
+    def get_property_by_id(self, property_id: str) -> Dict[str, Any]:
+        return self._get("properties", property_id, self.live.get_property_by_id)
+
+
+class AsyncMirroredBuildOpsClient(MirroredBuildOpsClient):
+    """
+    MirroredBuildOpsClient for an AsyncBuildOpsClient: the same mirror
+    reads and write-backs (run on worker threads), awaiting the live client
+    only on a miss.
+    """
+
+    async def _get(self, entity: str, record_id: str, fetch) -> Dict[str, Any]:
+        cached = await asyncio.to_thread(self._cached, entity, record_id)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        record = await fetch(record_id)
+        if isinstance(record, dict) and record.get("id"):
+            await asyncio.to_thread(self._store, entity, record)
+        return record
+
+    async def find_invoice_id_by_number(self, invoice_number: str) -> Optional[str]:
+        return await asyncio.to_thread(super().find_invoice_id_by_number, invoice_number)
+
+    async def get_invoice_by_id(self, invoice_id: str) -> Dict[str, Any]:
+        return await self._get("invoices", invoice_id, self.live.get_invoice_by_id)
+
+    async def get_customer_by_id(self, customer_id: str) -> Dict[str, Any]:
+        return await self._get("customers", customer_id, self.live.get_customer_by_id)
+
+    async def get_property_by_id(self, property_id: str) -> Dict[str, Any]:
+        return await self._get("properties", property_id, self.live.get_property_by_id)
@@ -36,4 +36,26 @@ def set_final(db: Session, doc_id: str, final_json: dict) -> None:
         """
     ).bindparams(bindparam("j", type_=JSONB))
 
-    db.execute(stmt, {"id": doc_id, "j": final_json})
\ No newline at end of file
+    db.execute(stmt, {"id": doc_id, "j": final_json})
+
+def merge_document_json(db: Session, doc_id: str, patch: dict) -> None:
+    """
+    Shallow-merge `patch` into documents.extracted_fields, and into
+    user_overrides too when the doc has been edited (that's what reads use).
+    Done in SQL so concurrent writers to other keys aren't clobbered.
+    """
+    stmt = text(
+        """
+        update public.documents
+        set extracted_fields = coalesce(extracted_fields, '{}'::jsonb) || :p,
+            user_overrides = case
+                when user_overrides is not null and user_overrides <> '{}'::jsonb
+                then user_overrides || :p
+                else user_overrides
+            end,
+            updated_at = now()
+        where id = :id
+        """
+    ).bindparams(bindparam("p", type_=JSONB))
+
+    db.execute(stmt, {"id": doc_id, "p": patch})
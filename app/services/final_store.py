@@ -0,0 +1,65 @@
+# app/services/final_store.py
+from __future__ import annotations
+
+import hashlib
+from typing import Optional, Tuple
+
+from app.services.keys import content_final_key
+from app.services.object_gc import revive
+from app.services.pdf_optimize import final_processing_enabled, prepare_final
+
+# Final keys are content-addressed, so their bytes never change
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def put_final(
+    storage,
+    pdf_bytes: Optional[bytes],
+    *,
+    doc_id: str,
+    doc_type: str,
+    copy_from: Optional[str] = None,
+    sha256: Optional[str] = None,
+) -> Tuple[str, bool]:
+    """
+    Store a final PDF under its content hash. Returns (key, uploaded).
+
+    An object already at that key (an identical earlier save) is reused as
+    is. `copy_from` names an existing object (the draft) to copy server-side
+    instead of uploading; with its `sha256` given, pdf_bytes may be None and
+    nothing is downloaded.
+    """
+    key = content_final_key(doc_id, doc_type, sha256 or hashlib.sha256(pdf_bytes).hexdigest())
+
+    # It may be tombstoned from an earlier save; claim it back first
+    revive(key)
+    if storage.exists(key):
+        print(f"[final] {key} already stored, upload skipped")
+        return key, False
+
+    if copy_from:
+        storage.copy_object(copy_from, key, cache_control=IMMUTABLE_CACHE_CONTROL)
+    else:
+        storage.upload_pdf_bytes(key, pdf_bytes, cache_control=IMMUTABLE_CACHE_CONTROL)
+    return key, True
+
+
+def promote_draft(
+    storage,
+    draft_key: str,
+    *,
+    draft_sha256: str,
+    doc_id: str,
+    doc_type: str,
+    label: str = "",
+) -> Tuple[str, bool]:
+    """
+    Store an unchanged draft as the final, without rendering it again.
+    Copied server-side when finals go out as rendered; otherwise the draft
+    bytes go through prepare_final() (optimize/linearize) first.
+    """
+    if not final_processing_enabled(doc_type):
+        return put_final(storage, None, doc_id=doc_id, doc_type=doc_type, copy_from=draft_key, sha256=draft_sha256)
+
+    final_bytes = prepare_final(storage.download_pdf_bytes(draft_key), doc_type, label=label)
+    return put_final(storage, final_bytes, doc_id=doc_id, doc_type=doc_type)
@@ -0,0 +1,56 @@
+# app/services/fingerprint.py
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+
+def canonical_json(obj: Any) -> str:
+    """
+    Stable JSON text for hashing: sorted keys, no whitespace, non-JSON
+    values (dates, Decimals, UUIDs) stringified.
+    """
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def fingerprint(obj: Any) -> str:
+    return hashlib.sha256(canonical_json(obj).encode("utf-8")).hexdigest()
+
+
+def _prune_none(obj: Any) -> Any:
+    # None and a missing key render the same, and the editor drops Nones on round-trip
+    if isinstance(obj, dict):
+        return {k: _prune_none(v) for k, v in obj.items() if v is not None}
+    if isinstance(obj, (list, tuple)):
+        return [_prune_none(v) for v in obj]
+    return obj
+
+
+def file_version(*paths: Path) -> str:
+    """
+    Cheap identity for template files: name, size and mtime of each.
+    """
+    parts = []
+    for p in paths:
+        try:
+            st = p.stat()
+            parts.append(f"{p.name}:{st.st_size}:{st.st_mtime_ns}")
+        except OSError:
+            parts.append(f"{p.name}:missing")
+    return ",".join(parts)
+
+
+def render_hash(payload: Any, *, template: str, renderer_version: str) -> str:
+    """
+    Identifies a rendered PDF by what went into it. Two renders with the same
+    hash produce the same document, so one can stand in for the other.
+    """
+    return fingerprint(
+        {
+            "payload": _prune_none(payload),
+            "template": template,
+            "renderer": renderer_version,
+        }
+    )
@@ -22,24 +22,28 @@ def styled_draft_key(original_key: str, doc_id: str) -> str:
     return f"styled_draft/{day}/{doc_id}.pdf"
 
 
-# --- NEW: namespaced final key ---
-def final_key_for(original_key: str, doc_id: str, doc_type: str) -> str:
+# --- OLD: keep for now (optional) ---
+def final_key(original_key: str, doc_id: str) -> str:
     day = day_from_key(original_key)
+    return f"final/{day}/{doc_id}.pdf"
+
+# --- content-addressed finals ---
+def content_final_key(doc_id: str, doc_type: str, digest: str) -> str:
+    """
+    final/<folder>/<doc_id>/<sha256 of the PDF>.pdf: identical re-saves land
+    on the same key, and a key's bytes never change (safe to cache forever).
+    """
     dt = (doc_type or "").upper()
 
     if "INVOICE" in dt:
         folder = "invoices"
-    elif "SERVICE_QUOTE" in dt or "PROJECT_QUOTE" in dt or "QUOTE" in dt:
+    elif "PROJECT" in dt:
+        folder = "proposals"
+    elif "QUOTE" in dt:
         folder = "quotes"
-    elif "JOB_REPORT" in dt or "JOB" in dt or "REPORT" in dt:
+    elif "JOB" in dt or "REPORT" in dt:
         folder = "job_reports"
     else:
         folder = "other"
 
-    return f"final/{folder}/{day}/{doc_id}.pdf"
-
-
-# --- OLD: keep for now (optional) ---
-def final_key(original_key: str, doc_id: str) -> str:
-    day = day_from_key(original_key)
-    return f"final/{day}/{doc_id}.pdf"
\ No newline at end of file
+    return f"final/{folder}/{doc_id}/{digest}.pdf"
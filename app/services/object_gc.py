@@ -0,0 +1,288 @@
+# app/services/object_gc.py
+"""
+Deferred deletion of storage objects.
+
+Request paths record superseded keys with tombstone() inside their own
+transaction instead of deleting them inline. A background thread (API
+startup) or `python -m app.services.object_gc` then:
+
+  - reaps due tombstones with batched DeleteObjects (1,000 keys per call),
+    skipping any key a document row points at again;
+  - every OBJECT_GC_SWEEP_INTERVAL_SECONDS, lists the derived-object
+    prefixes and tombstones objects no row references (orphans left by
+    failed requests).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import text
+
+from app.db import SessionLocal
+from app.storage.backend import get_storage
+
+# Keys stay around this long after being superseded, so links handed out
+# just before a re-finalize keep working for a while.
+GRACE_SECONDS = 15 * 60
+BATCH_SIZE = 1000
+MAX_ATTEMPTS = 10
+
+# Only objects the app derives; originals and uploads are never swept
+SWEEP_PREFIXES = ("final/", "styled_draft/")
+# Objects younger than this may belong to a request that hasn't committed yet
+SWEEP_MIN_AGE_SECONDS = 24 * 3600
+
+# Arbitrary constant: one sweeper across all API instances and workers
+_SWEEP_LOCK_ID = 4_720_113
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)) or default)
+    except ValueError:
+        return default
+
+
+def tombstone(db, key: Optional[str], reason: str, document_id: Optional[str] = None, *, grace_seconds: Optional[int] = None) -> None:
+    """
+    Schedule `key` for deletion. Call inside the transaction that stops
+    referencing it, so the tombstone commits (or rolls back) with it.
+    """
+    if not key:
+        return
+    grace = GRACE_SECONDS if grace_seconds is None else grace_seconds
+    db.execute(
+        text(
+            """
+            INSERT INTO public.storage_tombstones (s3_key, reason, document_id, delete_after, attempts, created_at)
+            VALUES (:key, :reason, :doc_id, now() + make_interval(secs => :grace), 0, now())
+            ON CONFLICT (s3_key) DO NOTHING
+            """
+        ),
+        {"key": key, "reason": reason, "doc_id": document_id, "grace": grace},
+    )
+
+
+def tombstone_now(key: Optional[str], reason: str, document_id: Optional[str] = None) -> None:
+    """
+    tombstone() in its own transaction, for cleanup after a failed request
+    (the request's transaction has been rolled back). Never raises.
+    """
+    if not key:
+        return
+    try:
+        with SessionLocal() as db:
+            tombstone(db, key, reason, document_id, grace_seconds=0)
+            db.commit()
+    except Exception as e:
+        print(f"[object-gc] could not tombstone {key}: {type(e).__name__}: {e}")
+
+
+def revive(key: str) -> None:
+    """
+    Drop a pending tombstone for `key` before reusing the object. If a
+    reaper holds the row, this waits for it, so a following exists() check
+    sees whether the object survived.
+    """
+    with SessionLocal() as db:
+        db.execute(text("DELETE FROM public.storage_tombstones WHERE s3_key = :key"), {"key": key})
+        db.commit()
+
+
+def _referenced(db, keys: Iterable[str]) -> Set[str]:
+    keys = list(keys)
+    if not keys:
+        return set()
+    rows = db.execute(
+        text(
+            """
+            SELECT k FROM (
+                SELECT original_s3_key AS k FROM public.documents WHERE original_s3_key = ANY(:keys)
+                UNION
+                SELECT styled_draft_s3_key FROM public.documents WHERE styled_draft_s3_key = ANY(:keys)
+                UNION
+                SELECT final_s3_key FROM public.documents WHERE final_s3_key = ANY(:keys)
+                UNION
+                SELECT storage_key FROM public.document_additional_documents WHERE storage_key = ANY(:keys)
+            ) r
+            """
+        ),
+        {"keys": keys},
+    ).scalars().all()
+    return set(rows)
+
+
+def reap_once(db, storage=None, *, batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+    """
+    Delete one batch of due tombstones. Rows are claimed with SKIP LOCKED,
+    so several reapers can run at once.
+    """
+    storage = storage or get_storage()
+    rows = db.execute(
+        text(
+            """
+            SELECT id, s3_key
+            FROM public.storage_tombstones
+            WHERE delete_after <= now() AND attempts < :max_attempts
+            ORDER BY delete_after
+            LIMIT :n
+            FOR UPDATE SKIP LOCKED
+            """
+        ),
+        {"n": batch_size, "max_attempts": MAX_ATTEMPTS},
+    ).mappings().all()
+    if not rows:
+        db.rollback()
+        return {"claimed": 0, "deleted": 0, "kept": 0, "failed": 0}
+
+    keys = [r["s3_key"] for r in rows]
+    # A content-addressed key (content_final_key) can be written again after it was tombstoned
+    live = _referenced(db, keys)
+    doomed = [k for k in keys if k not in live]
+
+    try:
+        failed = storage.delete_objects(doomed) if doomed else {}
+    except Exception as e:
+        failed = {k: f"{type(e).__name__}: {e}" for k in doomed}
+
+    done_ids = [r["id"] for r in rows if r["s3_key"] not in failed]
+    if done_ids:
+        db.execute(text("DELETE FROM public.storage_tombstones WHERE id = ANY(:ids)"), {"ids": done_ids})
+    for key, err in failed.items():
+        db.execute(
+            text(
+                """
+                UPDATE public.storage_tombstones
+                SET attempts = attempts + 1,
+                    last_error = :err,
+                    delete_after = now() + make_interval(secs => 60 * power(2, LEAST(attempts, 8)))
+                WHERE s3_key = :key
+                """
+            ),
+            {"key": key, "err": err[:2000]},
+        )
+    db.commit()
+
+    return {"claimed": len(rows), "deleted": len(doomed) - len(failed), "kept": len(live), "failed": len(failed)}
+
+
+def reap(db, storage=None, *, batch_size: int = BATCH_SIZE, max_batches: int = 100) -> Dict[str, int]:
+    total = {"claimed": 0, "deleted": 0, "kept": 0, "failed": 0}
+    for _ in range(max_batches):
+        res = reap_once(db, storage, batch_size=batch_size)
+        for k, v in res.items():
+            total[k] += v
+        if res["claimed"] < batch_size:
+            break
+    return total
+
+
+def sweep_orphans(
+    db,
+    storage=None,
+    *,
+    prefixes: Iterable[str] = SWEEP_PREFIXES,
+    min_age_seconds: int = SWEEP_MIN_AGE_SECONDS,
+) -> int:
+    """
+    Tombstone objects under `prefixes` that are older than `min_age_seconds`
+    and referenced by no document row. Takes a Postgres advisory lock for the
+    transaction; returns -1 if another process is already sweeping.
+    """
+    storage = storage or get_storage()
+    # Transaction-scoped, so it is released by the commit below
+    got = db.execute(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": _SWEEP_LOCK_ID}).scalar()
+    if not got:
+        db.rollback()
+        return -1
+
+    try:
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=min_age_seconds)
+        found = 0
+        for prefix in prefixes:
+            candidates: List[str] = []
+            for key, modified in storage.list_objects(prefix):
+                if modified <= cutoff:
+                    candidates.append(key)
+                if len(candidates) >= BATCH_SIZE:
+                    found += _tombstone_unreferenced(db, candidates)
+                    candidates = []
+            found += _tombstone_unreferenced(db, candidates)
+        db.commit()
+        return found
+    except Exception:
+        db.rollback()
+        raise
+
+
+def _tombstone_unreferenced(db, keys: List[str]) -> int:
+    live = _referenced(db, keys)
+    orphans = [k for k in keys if k not in live]
+    for key in orphans:
+        tombstone(db, key, "orphan", grace_seconds=0)
+    return len(orphans)
+
+
+def run_forever(stop: Optional[threading.Event] = None) -> None:
+    """
+    Reap every OBJECT_GC_INTERVAL_SECONDS (default 60); sweep every
+    OBJECT_GC_SWEEP_INTERVAL_SECONDS (default 6 h, 0 = never).
+    """
+    stop = stop or threading.Event()
+    interval = max(5, _env_int("OBJECT_GC_INTERVAL_SECONDS", 60))
+    sweep_every = _env_int("OBJECT_GC_SWEEP_INTERVAL_SECONDS", 6 * 3600)
+    next_sweep = time.monotonic() + min(sweep_every, 600) if sweep_every > 0 else None
+
+    while not stop.is_set():
+        try:
+            with SessionLocal() as db:
+                res = reap(db)
+                if res["claimed"]:
+                    print(f"[object-gc] reaped {res}")
+
+                if next_sweep is not None and time.monotonic() >= next_sweep:
+                    n = sweep_orphans(db)
+                    if n:
+                        print(f"[object-gc] sweep tombstoned {n} orphans" if n > 0 else "[object-gc] sweep already running elsewhere")
+                    next_sweep = time.monotonic() + sweep_every
+        except Exception as e:
+            print(f"[object-gc] pass failed: {type(e).__name__}: {e}")
+        stop.wait(interval)
+
+
+def start_in_background() -> None:
+    """
+    Run run_forever() on a daemon thread (OBJECT_GC=0 to skip, e.g. when a
+    separate `python -m app.services.object_gc --forever` process does it).
+    """
+    if os.getenv("OBJECT_GC", "1").strip().lower() in {"0", "false", "no", "off"}:
+        return
+    threading.Thread(target=run_forever, name="object-gc", daemon=True).start()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Reap storage tombstones and sweep for orphans")
+    ap.add_argument("--sweep", action="store_true", help="also run the orphan sweep")
+    ap.add_argument("--min-age-hours", type=float, default=SWEEP_MIN_AGE_SECONDS / 3600)
+    ap.add_argument("--forever", action="store_true", help="keep running (same loop as the API thread)")
+    args = ap.parse_args()
+
+    if args.forever:
+        run_forever()
+        return 0
+
+    with SessionLocal() as db:
+        if args.sweep:
+            n = sweep_orphans(db, min_age_seconds=int(args.min_age_hours * 3600))
+            print(f"[object-gc] sweep tombstoned {n} orphans")
+        print(f"[object-gc] reaped {reap(db)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
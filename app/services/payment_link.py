@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import os
 import requests
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 
 
@@ -55,4 +56,73 @@ def get_invoice_payment_link(buildops_invoice_id: str) -> str:
 
         raise RuntimeError("Payment API returned token but no URL. Set PAYMENT_LINK_BASE_URL or return url from API.")
 
-    raise RuntimeError(f"Payment API response missing url/token. Got keys={list(data.keys())}")
\ No newline at end of file
+    raise RuntimeError(f"Payment API response missing url/token. Got keys={list(data.keys())}")
+
+# ---------------- Cached link on the invoice document ----------------
+# Stored in the document JSON as:
+#   payment_url, payment_url_created_at (ISO), payment_url_expires_at (ISO or null)
+PAYMENT_LINK_KEYS = ("payment_url", "payment_url_created_at", "payment_url_expires_at")
+
+
+def _env_seconds(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+def _parse_iso(value: Any) -> Optional[datetime]:
+    if not isinstance(value, str) or not value.strip():
+        return None
+    try:
+        dt = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def payment_link_fields(payment_url: str, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Fields to persist for a freshly issued link.
+
+    Env:
+      PAYMENT_LINK_TTL_SECONDS  hard expiry of a link (default 0 = links don't expire)
+    """
+    now = now or datetime.now(timezone.utc)
+    ttl = _env_seconds("PAYMENT_LINK_TTL_SECONDS", 0)
+    return {
+        "payment_url": payment_url,
+        "payment_url_created_at": now.isoformat(),
+        "payment_url_expires_at": (now + timedelta(seconds=ttl)).isoformat() if ttl > 0 else None,
+    }
+
+
+def cached_payment_link_state(fields: Dict[str, Any], now: Optional[datetime] = None) -> str:
+    """
+    "missing" | "expired" -> must fetch before use
+    "stale"               -> usable, refresh in the background
+    "fresh"               -> usable as-is
+
+    Env:
+      PAYMENT_LINK_REFRESH_AFTER_SECONDS  age at which a link counts as stale (default 7 days)
+    """
+    url = fields.get("payment_url")
+    if not isinstance(url, str) or not url.strip():
+        return "missing"
+
+    now = now or datetime.now(timezone.utc)
+
+    expires_at = _parse_iso(fields.get("payment_url_expires_at"))
+    if expires_at and expires_at <= now:
+        return "expired"
+
+    created_at = _parse_iso(fields.get("payment_url_created_at"))
+    if not created_at:
+        # Links saved before we tracked timestamps
+        return "stale"
+
+    refresh_after = _env_seconds("PAYMENT_LINK_REFRESH_AFTER_SECONDS", 7 * 24 * 3600)
+    if refresh_after > 0 and (now - created_at).total_seconds() >= refresh_after:
+        return "stale"
+
+    return "fresh"
@@ -0,0 +1,275 @@
+# app/services/pdf_optimize.py
+from __future__ import annotations
+
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+# Per doc type, in MB. Override with PDF_SIZE_BUDGET_<DOC_TYPE>_MB (0 = no budget).
+DEFAULT_SIZE_BUDGETS_MB: Dict[str, float] = {
+    "PROJECT_QUOTE": 12,
+    "SERVICE_QUOTE": 4,
+    "INVOICE": 4,
+}
+
+# Linearized ("fast web view") finals, per doc type. Override with PDF_LINEARIZE_<DOC_TYPE>=0/1.
+# Drafts are stored as rendered, so an unchanged draft is promoted by
+# linearizing its bytes rather than by a server-side copy (promote_draft).
+DEFAULT_LINEARIZE: Dict[str, bool] = {
+    "PROJECT_QUOTE": True,
+    "SERVICE_QUOTE": False,
+    "INVOICE": False,
+}
+
+# Budget escalation never goes below this
+MIN_IMAGE_DPI = 72
+JPEG_QUALITY = 85
+
+
+class PdfSizeBudgetExceeded(Exception):
+    def __init__(self, doc_type: str, size: int, budget: int):
+        super().__init__(
+            f"{doc_type} PDF is {size / 1e6:.1f} MB after optimization; budget is {budget / 1e6:.1f} MB"
+        )
+        self.doc_type = doc_type
+        self.size = size
+        self.budget = budget
+
+
+@dataclass
+class OptimizeResult:
+    pdf_bytes: bytes
+    bytes_before: int
+    bytes_after: int
+    images_downsampled: int
+    max_image_dpi: int
+
+    @property
+    def saved_pct(self) -> float:
+        return 100.0 * (1 - self.bytes_after / self.bytes_before) if self.bytes_before else 0.0
+
+
+def optimize_enabled() -> bool:
+    return os.getenv("PDF_OPTIMIZE", "0").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def max_image_dpi() -> int:
+    try:
+        return max(MIN_IMAGE_DPI, int(os.getenv("PDF_OPTIMIZE_MAX_IMAGE_DPI", "150") or 150))
+    except ValueError:
+        return 150
+
+
+def _type_key(doc_type: str) -> str:
+    dt = (doc_type or "").upper()
+    if "INVOICE" in dt:
+        return "INVOICE"
+    if "PROJECT" in dt:
+        return "PROJECT_QUOTE"
+    return "SERVICE_QUOTE"
+
+
+def size_budget(doc_type: str) -> Optional[int]:
+    """
+    Size budget in bytes for this doc type, or None for no budget.
+    """
+    key = _type_key(doc_type)
+    raw = os.getenv(f"PDF_SIZE_BUDGET_{key}_MB")
+    try:
+        mb = float(raw) if raw not in (None, "") else DEFAULT_SIZE_BUDGETS_MB.get(key, 0)
+    except ValueError:
+        mb = DEFAULT_SIZE_BUDGETS_MB.get(key, 0)
+    return int(mb * 1024 * 1024) if mb > 0 else None
+
+
+def _downsample_images(doc, max_dpi: int) -> int:
+    import fitz  # PyMuPDF
+
+    # xref -> (pixel width, widest placement in inches); an image shared by
+    # several pages is judged by its largest placement
+    placements: Dict[int, tuple] = {}
+    for page in doc:
+        for img in page.get_images(full=True):
+            xref, smask, px_w = img[0], img[1], img[2]
+            if smask:
+                # Soft-masked images would need the mask resampled too; leave them
+                continue
+            for rect in page.get_image_rects(xref):
+                inches = rect.width / 72.0
+                if inches <= 0:
+                    continue
+                prev = placements.get(xref)
+                if prev is None or inches > prev[1]:
+                    placements[xref] = (px_w, inches)
+
+    done = 0
+    for xref, (px_w, inches) in placements.items():
+        dpi = px_w / inches
+        # Pixmap.shrink halves per step; stop before dropping under max_dpi
+        steps = int(math.floor(math.log2(dpi / max_dpi))) if dpi > max_dpi else 0
+        if steps < 1:
+            continue
+        try:
+            pix = fitz.Pixmap(doc, xref)
+            if pix.colorspace and pix.colorspace.n not in (1, 3):
+                pix = fitz.Pixmap(fitz.csRGB, pix)
+            pix.shrink(steps)
+
+            # Photos stay JPEG; everything else goes back in losslessly
+            is_jpeg = "DCTDecode" in (doc.xref_get_key(xref, "Filter")[1] or "")
+            data = pix.tobytes("jpeg", jpg_quality=JPEG_QUALITY) if is_jpeg else pix.tobytes("png")
+            if len(data) >= len(doc.xref_stream_raw(xref) or b""):
+                continue
+
+            # replace_image rewrites the shared xref, so any page works
+            doc[0].replace_image(xref, stream=data)
+            done += 1
+        except Exception as e:
+            print(f"[pdf_optimize] skip image xref={xref}: {type(e).__name__}: {e}")
+    return done
+
+
+def optimize_pdf(pdf_bytes: bytes, *, max_dpi: Optional[int] = None, linear: bool = False) -> OptimizeResult:
+    """
+    Downsample images placed above `max_dpi`, then save with duplicate
+    objects merged (templates merged into one deck repeat fonts and images)
+    and every stream deflated. `linear` writes the result linearized in
+    the same save.
+    """
+    import fitz  # PyMuPDF
+
+    dpi = max_dpi or max_image_dpi()
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        downsampled = _downsample_images(doc, dpi)
+        out = doc.tobytes(
+            garbage=4,  # drop unused objects and merge identical ones
+            deflate=True,
+            deflate_images=True,
+            deflate_fonts=True,
+            linear=linear,
+            no_new_id=True,  # same input, same bytes: finals are keyed by content hash
+        )
+    finally:
+        doc.close()
+
+    # Already-lean files can come out slightly larger; keep the original then
+    # (unless linearized output was asked for)
+    if len(out) >= len(pdf_bytes) and not linear:
+        out = pdf_bytes
+
+    return OptimizeResult(
+        pdf_bytes=out,
+        bytes_before=len(pdf_bytes),
+        bytes_after=len(out),
+        images_downsampled=downsampled,
+        max_image_dpi=dpi,
+    )
+
+
+def linearize_enabled(doc_type: str) -> bool:
+    key = _type_key(doc_type)
+    raw = os.getenv(f"PDF_LINEARIZE_{key}")
+    if raw is None or raw.strip() == "":
+        return DEFAULT_LINEARIZE.get(key, False)
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def linearize_pdf(pdf_bytes: bytes) -> bytes:
+    """
+    Rewrite as a linearized PDF: the linearization dictionary, first-page
+    objects and hint stream come first, so a viewer reading byte ranges can
+    show page one before the rest of the file arrives.
+    """
+    import fitz  # PyMuPDF
+
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        return doc.tobytes(garbage=1, deflate=True, linear=True, no_new_id=True)
+    finally:
+        doc.close()
+
+
+_LIN_RE = re.compile(rb"<<\s*/Linearized\s.*?>>", re.S)
+_LIN_KEY_RE = re.compile(rb"/([LHOENT])\s*(\[[^\]]*\]|\d+)")
+
+
+def linearization_params(prefix: bytes) -> Optional[Dict[str, object]]:
+    """
+    Parse the linearization dictionary from the first ~1 KB of a PDF.
+    Returns e.g. {"L": file_len, "E": end_of_first_page, "N": pages, ...},
+    or None if the file isn't linearized.
+    """
+    m = _LIN_RE.search(prefix[:2048])
+    if not m:
+        return None
+    params: Dict[str, object] = {}
+    for key, val in _LIN_KEY_RE.findall(m.group(0)):
+        k = key.decode()
+        if val.startswith(b"["):
+            params[k] = [int(x) for x in val.strip(b"[]").split()]
+        else:
+            params[k] = int(val)
+    return params
+
+
+def final_processing_enabled(doc_type: str) -> bool:
+    """
+    True when prepare_final() would change the bytes, i.e. a stored draft
+    is not interchangeable with a freshly prepared final.
+    """
+    return optimize_enabled() or linearize_enabled(doc_type)
+
+
+def optimize_final(pdf_bytes: bytes, doc_type: str, *, label: str = "", linear: bool = False) -> bytes:
+    """
+    Optional stage before a final is uploaded (PDF_OPTIMIZE=1).
+
+    Logs bytes before/after. If the result is over the doc type's size
+    budget, image DPI is halved (down to MIN_IMAGE_DPI) and the original is
+    re-optimized; still over budget raises PdfSizeBudgetExceeded.
+    """
+    if not optimize_enabled():
+        return pdf_bytes
+
+    budget = size_budget(doc_type)
+    dpi = max_image_dpi()
+    while True:
+        res = optimize_pdf(pdf_bytes, max_dpi=dpi, linear=linear)
+        print(
+            f"[pdf_optimize] {doc_type} {label}: {res.bytes_before:,} -> {res.bytes_after:,} bytes "
+            f"({res.saved_pct:.1f}% saved, {res.images_downsampled} images > {dpi} dpi downsampled)"
+        )
+        if budget is None or res.bytes_after <= budget:
+            return res.pdf_bytes
+        if dpi <= MIN_IMAGE_DPI:
+            raise PdfSizeBudgetExceeded(doc_type, res.bytes_after, budget)
+        dpi = max(MIN_IMAGE_DPI, dpi // 2)
+
+
+def prepare_final(pdf_bytes: bytes, doc_type: str, *, label: str = "") -> bytes:
+    """
+    Everything a final goes through before upload: the optional optimizer,
+    then linearization where enabled for the doc type (one save when both).
+    """
+    linear = linearize_enabled(doc_type)
+    if optimize_enabled():
+        out = optimize_final(pdf_bytes, doc_type, label=label, linear=linear)
+    elif linear:
+        out = linearize_pdf(pdf_bytes)
+    else:
+        return pdf_bytes
+    if linear:
+        _check_linearized(out, doc_type, label)
+    return out
+
+
+def _check_linearized(pdf_bytes: bytes, doc_type: str, label: str) -> None:
+    # A save that silently fell back to a regular layout still opens fine, so say so here
+    params = linearization_params(pdf_bytes[:2048])
+    if params is None:
+        print(f"[pdf_optimize] {doc_type} {label}: linearization requested but output has no /Linearized dictionary")
+    elif params.get("L") != len(pdf_bytes):
+        print(f"[pdf_optimize] {doc_type} {label}: linearization /L {params.get('L')} != file size {len(pdf_bytes)}")
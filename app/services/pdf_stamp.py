@@ -1,46 +1,122 @@
 # app/services/pdf_stamp.py
 from __future__ import annotations
 
-import io
-from pypdf import PdfReader, PdfWriter
-from reportlab.pdfgen import canvas
+import os
+from typing import Callable, Dict, List, Optional, Tuple
 
+from app.styling.common.post_process import Mark, post_process_pdf
 
-def stamp_pdf(pdf_bytes: bytes, text_to_stamp: str) -> bytes:
+StampEngine = Callable[[bytes, str], bytes]
+
+DIAGONAL_FS = 42
+DIAGONAL_ANGLE = 25
+LABEL_FS = 14
+LABEL_INSET = 24
+
+
+# ---------------- pypdf + reportlab ----------------
+def _stamp_marks(text_to_stamp: str, size: Tuple[float, float]) -> List[Mark]:
+    w, h = size
+    return [
+        # Big diagonal watermark
+        Mark(
+            text_to_stamp,
+            w / 2,
+            h / 2,
+            font="Helvetica-Bold",
+            size=DIAGONAL_FS,
+            align="center",
+            rotate=DIAGONAL_ANGLE,
+        ),
+        # Small top-right label
+        Mark(
+            text_to_stamp,
+            w - LABEL_INSET,
+            h - LABEL_INSET,
+            font="Helvetica-Bold",
+            size=LABEL_FS,
+            align="right",
+        ),
+    ]
+
+
+def _stamp_pypdf(pdf_bytes: bytes, text_to_stamp: str) -> bytes:
+    # One cached overlay per page size, merged with pypdf
+    return post_process_pdf(pdf_bytes, lambda index, page_count, size: _stamp_marks(text_to_stamp, size))
+
+
+# ---------------- PyMuPDF ----------------
+def _stamp_pymupdf(pdf_bytes: bytes, text_to_stamp: str) -> bytes:
     """
-    Overlay a visible stamp on every page (MVP watermark).
+    Draws the text straight into each page's content stream: no overlay
+    document, no re-parse, one save at the end.
     """
-    reader = PdfReader(io.BytesIO(pdf_bytes))
-    writer = PdfWriter()
+    import fitz  # PyMuPDF
 
-    for page in reader.pages:
-        w = float(page.mediabox.width)
-        h = float(page.mediabox.height)
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        diag_w = fitz.get_text_length(text_to_stamp, fontname="hebo", fontsize=DIAGONAL_FS)
+        label_w = fitz.get_text_length(text_to_stamp, fontname="hebo", fontsize=LABEL_FS)
+        # morph applies the matrix in PDF orientation, so this is the same
+        # counter-clockwise tilt as the pypdf engine's rotate=DIAGONAL_ANGLE
+        tilt = fitz.Matrix(DIAGONAL_ANGLE)
 
-        overlay_buf = io.BytesIO()
-        c = canvas.Canvas(overlay_buf, pagesize=(w, h))
+        for page in doc:
+            r = page.rect
+            center = fitz.Point(r.x0 + r.width / 2, r.y0 + r.height / 2)
 
-        # Big diagonal watermark
-        c.saveState()
-        c.setFont("Helvetica-Bold", 42)
-        c.translate(w / 2, h / 2)
-        c.rotate(25)
-        c.drawCentredString(0, 0, text_to_stamp)
-        c.restoreState()
+            # Big diagonal watermark, centered on the page
+            page.insert_text(
+                fitz.Point(center.x - diag_w / 2, center.y),
+                text_to_stamp,
+                fontname="hebo",
+                fontsize=DIAGONAL_FS,
+                morph=(center, tilt),
+            )
+
+            # Small top-right label
+            page.insert_text(
+                fitz.Point(r.x1 - LABEL_INSET - label_w, r.y0 + LABEL_INSET),
+                text_to_stamp,
+                fontname="hebo",
+                fontsize=LABEL_FS,
+            )
+
+        # no_new_id: keep output byte-identical for identical input (content-addressed finals)
+        return doc.tobytes(deflate=True, no_new_id=True)
+    finally:
+        doc.close()
+
+
+STAMP_ENGINES: Dict[str, StampEngine] = {
+    "pymupdf": _stamp_pymupdf,
+    "pypdf": _stamp_pypdf,
+}
+
+DEFAULT_ENGINE = "pymupdf"
 
-        # Small top-right label
-        c.setFont("Helvetica-Bold", 14)
-        c.drawRightString(w - 24, h - 24, text_to_stamp)
 
-        c.save()
-        overlay_buf.seek(0)
+def default_engine() -> str:
+    return (os.getenv("PDF_STAMP_ENGINE") or DEFAULT_ENGINE).strip().lower()
 
-        overlay_reader = PdfReader(overlay_buf)
-        overlay_page = overlay_reader.pages[0]
 
-        page.merge_page(overlay_page)
-        writer.add_page(page)
+def stamp_pdf(pdf_bytes: bytes, text_to_stamp: str, engine: Optional[str] = None) -> bytes:
+    """
+    Overlay a visible stamp on every page (MVP watermark).
+
+    engine: "pymupdf" | "pypdf"; defaults to PDF_STAMP_ENGINE (pymupdf).
+    If PyMuPDF is unavailable or fails on a file, pypdf is used instead.
+    """
+    name = (engine or default_engine()).strip().lower()
+    fn = STAMP_ENGINES.get(name)
+    if fn is None:
+        raise ValueError(f"Unknown stamp engine: {name} (expected one of {sorted(STAMP_ENGINES)})")
+
+    if fn is _stamp_pypdf:
+        return fn(pdf_bytes, text_to_stamp)
 
-    out = io.BytesIO()
-    writer.write(out)
-    return out.getvalue()
\ No newline at end of file
+    try:
+        return fn(pdf_bytes, text_to_stamp)
+    except Exception as e:
+        print(f"[pdf_stamp] {name} failed ({type(e).__name__}: {e}); falling back to pypdf")
+        return _stamp_pypdf(pdf_bytes, text_to_stamp)
@@ -1,10 +1,38 @@
 # app/services/proposal_service.py
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
-from app.styling.proposal.renderer import render_proposal_pdf
+from app.services.fingerprint import file_version, render_hash
+from app.services.pdf_optimize import prepare_final
+from app.styling.proposal.assembler import RENDERER_VERSION
+from app.styling.proposal.renderer import render_proposal_pdf, render_proposal_pdf_to
+from app.styling.proposal.template_picker import TEMPLATE_DIR
 
 
 def build_proposal_document(fields: Dict[str, Any]) -> bytes:
-    return render_proposal_pdf(fields)
\ No newline at end of file
+    return render_proposal_pdf(fields)
+
+
+def upload_proposal_document(fields: Dict[str, Any], storage, key: str) -> Tuple[int, str]:
+    """
+    Render the proposal straight into a streaming S3 upload (no full-document
+    bytes copy). Returns (bytes written, sha256 of the bytes). Used for
+    drafts; finals go through build_proposal_final().
+    """
+    with storage.open_upload_stream(key) as out:
+        render_proposal_pdf_to(fields, out)
+    return out.bytes_written, out.sha256
+
+
+def build_proposal_final(fields: Dict[str, Any], *, label: str = "") -> bytes:
+    """
+    Final bytes: rendered, then optimized/linearized where enabled. Finals
+    are keyed by content hash, so they're built in memory, not streamed.
+    """
+    return prepare_final(render_proposal_pdf(fields), "PROJECT_QUOTE", label=label)
+
+
+def proposal_render_hash(fields: Dict[str, Any]) -> str:
+    templates = sorted(TEMPLATE_DIR.rglob("*.*"))
+    return render_hash(fields, template=file_version(*templates), renderer_version=RENDERER_VERSION)
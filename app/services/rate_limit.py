@@ -0,0 +1,346 @@
+# app/services/rate_limit.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional
+
+import requests
+from urllib3.exceptions import ConnectTimeoutError
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = {500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# How often an asyncio caller re-checks a full endpoint slot
+ASYNC_SLOT_POLL_SECONDS = 0.01
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+def _parse_endpoint_caps(raw: str) -> Dict[str, int]:
+    """
+    "invoices=8,customers=4" -> {"invoices": 8, "customers": 4}
+    """
+    caps: Dict[str, int] = {}
+    for part in (raw or "").split(","):
+        name, _, value = part.partition("=")
+        name = name.strip().strip("/").lower()
+        if not name or not value.strip():
+            continue
+        try:
+            caps[name] = max(1, int(value.strip()))
+        except ValueError:
+            continue
+    return caps
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-After is either delta-seconds or an HTTP date.
+    Returns seconds to wait, or None when missing/unparseable.
+    """
+    v = (value or "").strip()
+    if not v:
+        return None
+
+    try:
+        return max(0.0, float(v))
+    except ValueError:
+        pass
+
+    try:
+        dt = parsedate_to_datetime(v)
+    except (TypeError, ValueError):
+        return None
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return max(0.0, (dt - datetime.now(timezone.utc)).total_seconds())
+
+
+def endpoint_key(path: str) -> str:
+    """
+    "/invoices/abc-123" -> "invoices"
+    """
+    parts = [p for p in (path or "").split("?")[0].split("/") if p]
+    return parts[0].lower() if parts else ""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. `reserve()` claims one token and returns how
+    long the caller must wait before using it, so both blocking and asyncio
+    callers can share one bucket.
+
+    The refill rate adapts (AIMD): `throttle()` halves it and pauses the
+    bucket, `recover()` creeps it back towards the configured ceiling.
+    """
+
+    def __init__(self, rate_per_sec: float, capacity: float, min_rate_per_sec: float = 0.5):
+        self.max_rate = max(0.01, float(rate_per_sec))
+        self.min_rate = max(0.01, min(float(min_rate_per_sec), self.max_rate))
+        self.rate = self.max_rate
+        self.capacity = max(1.0, float(capacity))
+
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._last = now
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1.0
+
+            wait = 0.0
+            if self._tokens < 0:
+                wait = -self._tokens / self.rate
+            if self._paused_until > now:
+                wait = max(wait, self._paused_until - now)
+            return wait
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def throttle(self, pause_seconds: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate / 2.0)
+            # Drop banked burst so the next requests don't stampede the API again.
+            self._tokens = min(self._tokens, 0.0)
+            self._paused_until = max(self._paused_until, now + max(0.0, pause_seconds))
+
+    def recover(self) -> None:
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class RequestScheduler:
+    """
+    Process-wide gate in front of an HTTP API:
+      - token bucket for the shared request quota
+      - per-endpoint concurrency caps
+      - retries with jittered exponential backoff on 429 / 5xx / network errors,
+        honouring Retry-After when the server sends one
+    """
+
+    def __init__(
+        self,
+        *,
+        rate_per_sec: float,
+        burst: float,
+        endpoint_concurrency: int = 4,
+        endpoint_caps: Optional[Dict[str, int]] = None,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        name: str = "api",
+    ):
+        self.name = name
+        self.bucket = TokenBucket(rate_per_sec, burst)
+        self.endpoint_concurrency = max(1, int(endpoint_concurrency))
+        self.endpoint_caps = dict(endpoint_caps or {})
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = max(0.0, float(backoff_base))
+        self.backoff_max = max(self.backoff_base, float(backoff_max))
+
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._sem_lock = threading.Lock()
+
+    # ---------------- Policy (shared with async callers) ----------------
+    def concurrency_for(self, endpoint: str) -> int:
+        return self.endpoint_caps.get(endpoint, self.endpoint_concurrency)
+
+    def backoff_delay(self, attempt: int) -> float:
+        # "Full jitter": uniform(0, min(cap, base * 2^attempt))
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def should_retry(self, method: str, status_code: int) -> bool:
+        if status_code == 429:
+            return True
+        return status_code in RETRYABLE_STATUSES and method.upper() in IDEMPOTENT_METHODS
+
+    def should_retry_error(self, method: str, exc: requests.RequestException) -> bool:
+        """
+        Network errors are retried for idempotent methods. Anything else is
+        only retried when the request never reached the server (connect
+        timeout, refused or unresolvable host): after a read timeout or a
+        dropped response, a POST may already have been applied.
+        """
+        if method.upper() in IDEMPOTENT_METHODS:
+            return True
+        if isinstance(exc, requests.ConnectTimeout):
+            return True
+        if isinstance(exc, requests.ConnectionError) and exc.args:
+            # urllib3's NewConnectionError (refused, DNS) subclasses ConnectTimeoutError
+            return isinstance(getattr(exc.args[0], "reason", exc.args[0]), ConnectTimeoutError)
+        return False
+
+    def on_response(self, status_code: int, retry_after: Optional[str], attempt: int) -> float:
+        """
+        Feed a response back into the limiter. Returns the delay to sleep
+        before retrying (only meaningful when should_retry() is True).
+        """
+        if status_code == 429:
+            pause = parse_retry_after(retry_after)
+            if pause is None:
+                pause = self.backoff_delay(attempt)
+            pause = min(pause, self.backoff_max)
+            self.bucket.throttle(pause)
+            logger.warning(
+                "%s 429; pausing %.2fs, rate now %.2f req/s",
+                self.name,
+                pause,
+                self.bucket.rate,
+            )
+            return pause
+
+        if status_code in RETRYABLE_STATUSES:
+            return self.backoff_delay(attempt)
+
+        self.bucket.recover()
+        return 0.0
+
+    # ---------------- Blocking API ----------------
+    def _semaphore(self, endpoint: str) -> threading.BoundedSemaphore:
+        with self._sem_lock:
+            sem = self._semaphores.get(endpoint)
+            if sem is None:
+                sem = threading.BoundedSemaphore(self.concurrency_for(endpoint))
+                self._semaphores[endpoint] = sem
+            return sem
+
+    @contextmanager
+    def slot(self, endpoint: str) -> Iterator[None]:
+        sem = self._semaphore(endpoint)
+        sem.acquire()
+        try:
+            self.bucket.acquire()
+            yield
+        finally:
+            sem.release()
+
+    def send(
+        self,
+        method: str,
+        path: str,
+        do_req: Callable[[], requests.Response],
+    ) -> requests.Response:
+        endpoint = endpoint_key(path)
+        attempt = 0
+
+        while True:
+            try:
+                with self.slot(endpoint):
+                    r = do_req()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries or not self.should_retry_error(method, e):
+                    raise
+                delay = self.backoff_delay(attempt)
+                logger.warning("%s %s %s network error (%s); retrying in %.2fs", self.name, method, path, e, delay)
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            delay = self.on_response(r.status_code, r.headers.get("Retry-After"), attempt)
+            if not self.should_retry(method, r.status_code) or attempt >= self.max_retries:
+                return r
+
+            logger.warning(
+                "%s %s %s -> %s; retry %d/%d in %.2fs",
+                self.name,
+                method,
+                path,
+                r.status_code,
+                attempt + 1,
+                self.max_retries,
+                delay,
+            )
+            time.sleep(delay)
+            attempt += 1
+
+    # ---------------- asyncio API ----------------
+    @asynccontextmanager
+    async def async_slot(self, endpoint: str) -> AsyncIterator[None]:
+        """
+        slot() for coroutines: the same per-endpoint semaphores and token
+        bucket as blocking callers, so both count against one budget. The
+        semaphore is polled rather than waited on, to keep the loop free.
+        """
+        sem = self._semaphore(endpoint)
+        while not sem.acquire(blocking=False):
+            await asyncio.sleep(ASYNC_SLOT_POLL_SECONDS)
+        try:
+            wait = self.bucket.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            yield
+        finally:
+            sem.release()
+
+
+_buildops_scheduler: RequestScheduler | None = None
+_buildops_scheduler_lock = threading.Lock()
+
+
+def get_buildops_scheduler() -> RequestScheduler:
+    """
+    Shared scheduler for every BuildOps call in this process.
+
+    Env:
+      BUILDOPS_RATE_PER_SEC          sustained request quota (default 5)
+      BUILDOPS_RATE_BURST            bucket size (default = rate)
+      BUILDOPS_ENDPOINT_CONCURRENCY  in-flight cap per endpoint (default 4)
+      BUILDOPS_ENDPOINT_CAPS         overrides, e.g. "invoices=8,customers=2"
+      BUILDOPS_MAX_RETRIES           default 4
+      BUILDOPS_BACKOFF_BASE / BUILDOPS_BACKOFF_MAX  seconds (default 0.5 / 30)
+    """
+    global _buildops_scheduler
+    if _buildops_scheduler is None:
+        with _buildops_scheduler_lock:
+            if _buildops_scheduler is None:
+                rate = _env_float("BUILDOPS_RATE_PER_SEC", 5.0)
+                _buildops_scheduler = RequestScheduler(
+                    rate_per_sec=rate,
+                    burst=_env_float("BUILDOPS_RATE_BURST", rate),
+                    endpoint_concurrency=_env_int("BUILDOPS_ENDPOINT_CONCURRENCY", 4),
+                    endpoint_caps=_parse_endpoint_caps(os.getenv("BUILDOPS_ENDPOINT_CAPS", "")),
+                    max_retries=_env_int("BUILDOPS_MAX_RETRIES", 4),
+                    backoff_base=_env_float("BUILDOPS_BACKOFF_BASE", 0.5),
+                    backoff_max=_env_float("BUILDOPS_BACKOFF_MAX", 30.0),
+                    name="BuildOps",
+                )
+    return _buildops_scheduler
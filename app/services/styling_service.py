@@ -1,18 +1,23 @@
 # app/services/styling_service.py
 from __future__ import annotations
 
+import hashlib
 import os
+from dataclasses import asdict
 from pathlib import Path
 from typing import Any, Tuple
 
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.storage.s3_storage import get_storage
+from app.storage.backend import get_storage
 from app.services.keys import styled_draft_key
 from app.styling.service_quote.styler import ServiceQuoteStyler
 from app.services.document_fields import upsert_draft
 from app.services.service_quote_editor import service_quote_to_json
+from app.services.fingerprint import file_version, render_hash
+from app.styling.service_quote.parser import ServiceQuoteData
+from app.styling.service_quote.renderer import RENDERER_VERSION as SERVICE_QUOTE_RENDERER_VERSION
 
 
 def _get_service_quote_template_path() -> Path:
@@ -22,6 +27,18 @@ def _get_service_quote_template_path() -> Path:
     return Path("templates/Mainline-Service-Quote.pdf")
 
 
+def service_quote_render_hash(data: ServiceQuoteData, template_path: Path) -> str:
+    """
+    Hash of exactly what render_service_quote() is given. The draft records
+    it; save-final compares against it to decide whether to re-render.
+    """
+    return render_hash(
+        asdict(data),
+        template=file_version(Path(template_path)),
+        renderer_version=SERVICE_QUOTE_RENDERER_VERSION,
+    )
+
+
 def _pick_styler(doc_type: str) -> Tuple[Any, str]:
     dt = (doc_type or "").upper().strip()
     if dt in {"SERVICE_QUOTE", "QUOTE", "SERVICE"}:
@@ -123,11 +140,15 @@ def ensure_draft(db: Session, doc_id: str, *, force: bool = False) -> dict:
         storage.upload_pdf_bytes(draft_key, draft_bytes)
         upsert_draft(db, target_doc_id, draft_json)
 
+        draft_hash = service_quote_render_hash(extracted_doc, styler.template_pdf)
+
         db.execute(
             text(
                 """
                 UPDATE public.documents
                 SET styled_draft_s3_key = :k,
+                    draft_fields_hash = :h,
+                    draft_sha256 = :sha,
                     status = 'READY_FOR_REVIEW',
                     quote_number = COALESCE(:quote_number, quote_number),
                     customer_name = COALESCE(:customer_name, customer_name),
@@ -141,6 +162,8 @@ def ensure_draft(db: Session, doc_id: str, *, force: bool = False) -> dict:
             {
                 "id": target_doc_id,
                 "k": draft_key,
+                "h": draft_hash,
+                "sha": hashlib.sha256(draft_bytes).hexdigest(),
                 "quote_number": parsed_quote_number,
                 "customer_name": (draft_json.get("client_name") or "").strip() or None,
                 "customer_email": (draft_json.get("client_email") or "").strip() or None,
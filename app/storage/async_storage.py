@@ -0,0 +1,117 @@
+# app/storage/async_storage.py
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable
+
+from app.storage.backend import get_storage
+from app.storage.base import Storage
+
+
+def _workers() -> int:
+    try:
+        return max(1, int(os.getenv("STORAGE_ASYNC_WORKERS", "16") or 16))
+    except ValueError:
+        return 16
+
+
+class AsyncStorage:
+    """
+    Awaitable view of a Storage for async routes. Blocking calls run on a
+    dedicated, bounded thread pool (STORAGE_ASYNC_WORKERS, default 16), so
+    an S3 round trip never stalls the event loop and storage traffic can't
+    take over the loop's default executor. URL building is local work and
+    stays synchronous.
+    """
+
+    def __init__(self, storage: Storage, max_workers: int | None = None):
+        self.storage = storage
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or _workers(), thread_name_prefix="storage-io")
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def upload_pdf_bytes(self, key: str, data: bytes, cache_control: str | None = None) -> None:
+        await self._run(self.storage.upload_pdf_bytes, key, data, cache_control=cache_control)
+
+    async def upload_bytes(
+        self,
+        key: str,
+        data: bytes,
+        content_type: str | None = None,
+        content_disposition: str | None = None,
+    ) -> None:
+        await self._run(
+            self.storage.upload_bytes,
+            key,
+            data,
+            content_type=content_type,
+            content_disposition=content_disposition,
+        )
+
+    async def copy_object(self, src_key: str, dst_key: str, cache_control: str | None = None) -> None:
+        await self._run(self.storage.copy_object, src_key, dst_key, cache_control=cache_control)
+
+    async def download_bytes(self, key: str) -> bytes:
+        return await self._run(self.storage.download_bytes, key)
+
+    async def download_pdf_bytes(self, key: str) -> bytes:
+        return await self._run(self.storage.download_pdf_bytes, key)
+
+    async def delete_object(self, key: str) -> None:
+        await self._run(self.storage.delete_object, key)
+
+    async def delete_objects(self, keys: Iterable[str]) -> Dict[str, str]:
+        return await self._run(self.storage.delete_objects, list(keys))
+
+    async def head_object(self, key: str) -> dict:
+        return await self._run(self.storage.head_object, key)
+
+    async def exists(self, key: str) -> bool:
+        return await self._run(self.storage.exists, key)
+
+    def presign_get_url(
+        self,
+        key: str,
+        expires_seconds: int = 3600,
+        download_filename: str | None = None,
+        inline: bool = True,
+    ) -> str:
+        return self.storage.presign_get_url(
+            key,
+            expires_seconds=expires_seconds,
+            download_filename=download_filename,
+            inline=inline,
+        )
+
+    def public_url(self, key: str) -> str:
+        return self.storage.public_url(key)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+_async_singleton: AsyncStorage | None = None
+_async_lock = threading.Lock()
+
+
+def get_async_storage() -> AsyncStorage:
+    global _async_singleton
+    if _async_singleton is None:
+        with _async_lock:
+            if _async_singleton is None:
+                _async_singleton = AsyncStorage(get_storage())
+    return _async_singleton
+
+
+def shutdown_async_storage() -> None:
+    global _async_singleton
+    with _async_lock:
+        if _async_singleton is not None:
+            _async_singleton.shutdown()
+            _async_singleton = None
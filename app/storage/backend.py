@@ -0,0 +1,64 @@
+# app/storage/backend.py
+from __future__ import annotations
+
+import os
+import threading
+
+from dotenv import load_dotenv
+
+from app.storage.base import Storage
+
+load_dotenv(".env")
+
+BACKENDS = ("s3", "local")
+
+_storage_singleton: Storage | None = None
+_storage_lock = threading.Lock()
+
+
+def storage_backend() -> str:
+    """
+    STORAGE_BACKEND: "s3" (default) or "local" (LocalStorage under LOCAL_STORAGE_DIR).
+    """
+    name = (os.getenv("STORAGE_BACKEND") or "s3").strip().lower()
+    if name not in BACKENDS:
+        raise RuntimeError(f"Unknown STORAGE_BACKEND {name!r}; expected one of {', '.join(BACKENDS)}")
+    return name
+
+
+def make_storage(backend: str | None = None) -> Storage:
+    backend = backend or storage_backend()
+    if backend == "local":
+        from app.storage.local_storage import LocalStorage
+
+        return LocalStorage()
+
+    # boto3 is only needed for the S3 backend
+    from app.storage.s3_storage import S3Storage
+
+    return S3Storage()
+
+
+def get_storage() -> Storage:
+    global _storage_singleton
+    if _storage_singleton is None:
+        with _storage_lock:
+            if _storage_singleton is None:
+                _storage_singleton = make_storage()
+                print(f"[storage] backend={storage_backend()} bucket={_storage_singleton.bucket}")
+    return _storage_singleton
+
+
+def s3_cache_stats() -> dict | None:
+    """
+    Disk cache metrics of the shared storage, without creating it.
+    """
+    return _storage_singleton.cache_stats() if _storage_singleton is not None else None
+
+
+def presign_get_url(key: str, expires_seconds: int = 3600) -> str:
+    return get_storage().presign_get_url(key=key, expires_seconds=expires_seconds)
+
+
+def public_url(key: str) -> str:
+    return get_storage().public_url(key)
@@ -0,0 +1,66 @@
+# app/storage/base.py
+from __future__ import annotations
+
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterable, Iterator, Protocol, Tuple, runtime_checkable
+
+
+def _safe_filename(name: str) -> str:
+    name = (name or "document.pdf").strip().replace("\n", " ").replace("\r", " ")
+    if not name.lower().endswith(".pdf"):
+        name += ".pdf"
+    return name
+
+
+@runtime_checkable
+class Storage(Protocol):
+    """
+    What the API and worker need from an object store. Keys are S3-style
+    ("original/...", "styled_draft/...", "final/..."); S3Storage and LocalStorage
+    both implement it, and get_storage() picks one from STORAGE_BACKEND.
+    """
+
+    bucket: str
+
+    def upload_pdf_bytes(self, key: str, data: bytes, cache_control: str | None = None) -> None: ...
+
+    def upload_bytes(
+        self,
+        key: str,
+        data: bytes,
+        content_type: str | None = None,
+        content_disposition: str | None = None,
+    ) -> None: ...
+
+    # The stream also exposes bytes_written and sha256 (hex digest of what was written)
+    def open_upload_stream(self, key: str, content_type: str = "application/pdf") -> BinaryIO: ...
+
+    def copy_object(self, src_key: str, dst_key: str, cache_control: str | None = None) -> None: ...
+
+    def copy_pdf(self, src_key: str, dst_key: str) -> None: ...
+
+    def download_bytes(self, key: str) -> bytes: ...
+
+    def download_pdf_bytes(self, key: str) -> bytes: ...
+
+    def delete_object(self, key: str) -> None: ...
+
+    def delete_objects(self, keys: Iterable[str]) -> Dict[str, str]: ...
+
+    def list_objects(self, prefix: str) -> Iterator[Tuple[str, datetime]]: ...
+
+    def head_object(self, key: str) -> dict: ...
+
+    def exists(self, key: str) -> bool: ...
+
+    def presign_get_url(
+        self,
+        key: str,
+        expires_seconds: int = 3600,
+        download_filename: str | None = None,
+        inline: bool = True,
+    ) -> str: ...
+
+    def public_url(self, key: str) -> str: ...
+
+    def cache_stats(self) -> dict | None: ...
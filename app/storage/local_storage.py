@@ -0,0 +1,317 @@
+# app/storage/local_storage.py
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Tuple
+from urllib.parse import quote, urlencode
+
+from app.storage.base import _safe_filename
+
+# Served by app/api_local_storage.py
+URL_PREFIX = "/local-storage"
+
+
+def _base_url() -> str:
+    return (os.getenv("LOCAL_STORAGE_BASE_URL") or "http://127.0.0.1:8000").rstrip("/")
+
+
+def _secret() -> bytes:
+    return (os.getenv("LOCAL_STORAGE_SECRET") or "pdf-polish-local").encode("utf-8")
+
+
+def _disposition(download_filename: str | None, inline: bool) -> str:
+    if not download_filename:
+        return ""
+    fname = _safe_filename(download_filename)
+    return f"{'inline' if inline else 'attachment'}; filename*=UTF-8''{quote(fname)}"
+
+
+def sign_url_params(key: str, expires_at: int, disposition: str = "") -> str:
+    msg = f"{key}\n{expires_at}\n{disposition}".encode("utf-8")
+    return hmac.new(_secret(), msg, hashlib.sha256).hexdigest()
+
+
+def verify_url_params(key: str, expires_at: int, disposition: str, signature: str) -> bool:
+    if expires_at < int(time.time()):
+        return False
+    return hmac.compare_digest(sign_url_params(key, expires_at, disposition), signature or "")
+
+
+class LocalUploadStream:
+    """
+    Write-only file object with the same surface as S3UploadStream: written
+    to a temp file next to the target and renamed into place on close, so
+    readers never see a partial object. An exception inside the `with`
+    block discards it.
+    """
+
+    def __init__(
+        self,
+        storage: "LocalStorage",
+        key: str,
+        content_type: str = "application/pdf",
+        content_disposition: str | None = None,
+        cache_control: str | None = None,
+    ):
+        self.storage = storage
+        self.key = key
+        self.content_type = content_type
+        self.content_disposition = content_disposition
+        self.cache_control = cache_control
+
+        self.mode = "wb"
+        self._path = storage._path(key)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = self._path.with_name(f".{self._path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        self._f = open(self._tmp, "wb")
+        self._md5 = hashlib.md5()
+        self._sha256 = hashlib.sha256()
+        self._pos = 0
+        self.closed = False
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise ValueError("write to closed LocalUploadStream")
+        n = self._f.write(data)
+        self._md5.update(data)
+        self._sha256.update(data)
+        self._pos += n
+        return n
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._f.close()
+        os.replace(self._tmp, self._path)
+        self.storage._write_meta(
+            self.key,
+            self.content_type,
+            self.content_disposition,
+            f'"{self._md5.hexdigest()}"',
+            self.cache_control,
+        )
+
+    def abort(self) -> None:
+        self.closed = True
+        self._f.close()
+        try:
+            self._tmp.unlink()
+        except OSError:
+            pass
+
+    @property
+    def bytes_written(self) -> int:
+        return self._pos
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+    def __enter__(self) -> "LocalUploadStream":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+class LocalStorage:
+    """
+    Filesystem stand-in for S3Storage (STORAGE_BACKEND=local), so whole
+    pipelines run and can be timed without AWS.
+
+    Objects live at <root>/<key>, with content type, disposition and ETag
+    in a <key>.meta.json sidecar. Presigned and public URLs point at the
+    /local-storage route on this API (LOCAL_STORAGE_BASE_URL): presigned
+    ones carry an HMAC signature and expiry, public ones keep S3Storage's
+    final/-only rule.
+    """
+
+    META_SUFFIX = ".meta.json"
+
+    def __init__(self, root: str | Path | None = None):
+        self.root = Path(root or os.getenv("LOCAL_STORAGE_DIR") or ".local-storage").resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.bucket = f"local:{self.root}"
+
+    # ---------------- Paths ----------------
+    def _path(self, key: str) -> Path:
+        clean = (key or "").lstrip("/")
+        if not clean or clean.endswith(self.META_SUFFIX):
+            raise ValueError(f"Invalid storage key: {key!r}")
+        p = (self.root / clean).resolve()
+        if self.root not in p.parents:
+            raise ValueError(f"Storage key escapes the storage root: {key!r}")
+        return p
+
+    def _meta_path(self, key: str) -> Path:
+        p = self._path(key)
+        return p.with_name(p.name + self.META_SUFFIX)
+
+    def _write_meta(
+        self,
+        key: str,
+        content_type: str,
+        content_disposition: str | None,
+        etag: str,
+        cache_control: str | None = None,
+    ) -> None:
+        meta = {"ContentType": content_type, "ETag": etag}
+        if content_disposition:
+            meta["ContentDisposition"] = content_disposition
+        if cache_control:
+            meta["CacheControl"] = cache_control
+        self._meta_path(key).write_text(json.dumps(meta), encoding="utf-8")
+
+    def _read_meta(self, key: str) -> dict:
+        try:
+            return json.loads(self._meta_path(key).read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def object_path(self, key: str) -> Path:
+        """
+        Path of an existing object; FileNotFoundError if there is none.
+        """
+        p = self._path(key)
+        if not p.is_file():
+            raise FileNotFoundError(f"No such key: {key}")
+        return p
+
+    # ---------------- Upload ----------------
+    def _put(
+        self,
+        key: str,
+        data: bytes,
+        content_type: str,
+        content_disposition: str | None = None,
+        cache_control: str | None = None,
+    ) -> None:
+        with LocalUploadStream(self, key, content_type, content_disposition, cache_control) as out:
+            out.write(data)
+
+    def upload_pdf_bytes(self, key: str, data: bytes, cache_control: str | None = None) -> None:
+        self._put(key, data, "application/pdf", cache_control=cache_control)
+
+    def upload_bytes(
+        self,
+        key: str,
+        data: bytes,
+        content_type: str | None = None,
+        content_disposition: str | None = None,
+    ) -> None:
+        self._put(key, data, content_type or "application/octet-stream", content_disposition)
+
+    def open_upload_stream(self, key: str, content_type: str = "application/pdf") -> LocalUploadStream:
+        return LocalUploadStream(self, key, content_type=content_type)
+
+    def copy_object(self, src_key: str, dst_key: str, cache_control: str | None = None) -> None:
+        src = self.object_path(src_key)
+        dst = self._path(dst_key)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dst.with_name(f".{dst.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+        # Same as S3Storage: the copy is re-typed as a PDF
+        self._write_meta(dst_key, "application/pdf", None, self._read_meta(src_key).get("ETag", ""), cache_control)
+
+    # Worker-side name
+    copy_pdf = copy_object
+
+    # ---------------- Download ----------------
+    def download_bytes(self, key: str) -> bytes:
+        return self.object_path(key).read_bytes()
+
+    def download_pdf_bytes(self, key: str) -> bytes:
+        return self.download_bytes(key)
+
+    def cache_stats(self) -> dict | None:
+        return None
+
+    def delete_object(self, key: str) -> None:
+        if not key:
+            return
+        for p in (self._path(key), self._meta_path(key)):
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                pass
+
+    def delete_objects(self, keys: Iterable[str]) -> Dict[str, str]:
+        failed: Dict[str, str] = {}
+        for key in keys:
+            try:
+                self.delete_object(key)
+            except (OSError, ValueError) as e:
+                failed[key] = f"{type(e).__name__}: {e}"
+        return failed
+
+    def list_objects(self, prefix: str) -> Iterator[Tuple[str, datetime]]:
+        for p in sorted(self.root.rglob("*")):
+            if not p.is_file() or p.name.startswith(".") or p.name.endswith(self.META_SUFFIX):
+                continue
+            key = p.relative_to(self.root).as_posix()
+            if key.startswith(prefix):
+                yield key, datetime.fromtimestamp(p.stat().st_mtime, tz=timezone.utc)
+
+    def exists(self, key: str) -> bool:
+        try:
+            return self._path(key).is_file()
+        except ValueError:
+            return False
+
+    def head_object(self, key: str) -> dict:
+        st = self.object_path(key).stat()
+        meta = self._read_meta(key)
+        return {
+            "ContentLength": st.st_size,
+            "ContentType": meta.get("ContentType", "application/octet-stream"),
+            "ContentDisposition": meta.get("ContentDisposition"),
+            "CacheControl": meta.get("CacheControl"),
+            "ETag": meta.get("ETag", ""),
+            "LastModified": datetime.fromtimestamp(st.st_mtime, tz=timezone.utc),
+        }
+
+    # ---------------- URLs ----------------
+    def presign_get_url(
+        self,
+        key: str,
+        expires_seconds: int = 3600,
+        download_filename: str | None = None,
+        inline: bool = True,
+    ) -> str:
+        clean_key = (key or "").lstrip("/")
+        expires_at = int(time.time()) + int(expires_seconds)
+        disposition = _disposition(download_filename, inline)
+
+        params = {"expires": expires_at}
+        if disposition:
+            params["disposition"] = disposition
+        params["signature"] = sign_url_params(clean_key, expires_at, disposition)
+        return f"{_base_url()}{URL_PREFIX}/{quote(clean_key)}?{urlencode(params)}"
+
+    def public_url(self, key: str) -> str:
+        clean_key = (key or "").lstrip("/")
+        if not clean_key.startswith("final/"):
+            raise RuntimeError(f"CloudFront is only configured for final/ keys, got: {key}")
+        return f"{_base_url()}{URL_PREFIX}/{quote(clean_key)}"
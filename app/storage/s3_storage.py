@@ -1,82 +1,638 @@
 # app/storage/s3_storage.py
 from __future__ import annotations
 
+import hashlib
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timezone
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Tuple
 from urllib.parse import quote
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
+from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 
+from app.storage.base import _safe_filename
+
+try:
+    import fcntl
+except ImportError:  # not on POSIX: thread-safe only
+    fcntl = None
+
+load_dotenv(".env")
+
 
 def _utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
-def _safe_filename(name: str) -> str:
-    name = (name or "document.pdf").strip().replace("\n", " ").replace("\r", " ")
-    if not name.lower().endswith(".pdf"):
-        name += ".pdf"
-    return name
+def _part_size() -> int:
+    try:
+        mb = int(os.getenv("S3_MULTIPART_PART_MB", "8") or 8)
+    except ValueError:
+        mb = 8
+    # S3 rejects non-final parts under 5 MiB
+    return max(5, mb) * 1024 * 1024
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)) or default)
+    except ValueError:
+        return default
+
+
+def transfer_config() -> TransferConfig:
+    """
+    Objects at or above S3_TRANSFER_THRESHOLD_MB (default 16) move as
+    S3_MULTIPART_PART_MB parts over S3_TRANSFER_CONCURRENCY (default 8)
+    connections: multipart upload going up, parallel ranged GETs coming down.
+    """
+    return TransferConfig(
+        multipart_threshold=max(5, _env_int("S3_TRANSFER_THRESHOLD_MB", 16)) * 1024 * 1024,
+        multipart_chunksize=_part_size(),
+        max_concurrency=max(1, _env_int("S3_TRANSFER_CONCURRENCY", 8)),
+        use_threads=True,
+    )
+
+
+class S3UploadStream:
+    """
+    Write-only file object that streams into an S3 multipart upload.
+
+    Bytes are buffered until a part is full, then sent with upload_part, so
+    at most ~one part is held in memory. Small objects (under one part)
+    fall back to a single put_object on close. tell() is supported because
+    pypdf's writer records xref offsets with it.
+
+    Use as a context manager: an exception inside the block aborts the upload.
+    """
+
+    def __init__(self, client, bucket: str, key: str, content_type: str = "application/pdf", part_size: int | None = None):
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.content_type = content_type
+        self.part_size = part_size or _part_size()
+
+        self.mode = "wb"
+        self._buf = bytearray()
+        self._pos = 0
+        self._sha256 = hashlib.sha256()
+        self._upload_id: str | None = None
+        self._parts: list[dict] = []
+        self.closed = False
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise ValueError("write to closed S3UploadStream")
+        n = len(data)
+        self._buf += data
+        self._sha256.update(data)
+        self._pos += n
+        if len(self._buf) >= self.part_size:
+            self._flush_part()
+        return n
+
+    def flush(self) -> None:
+        pass
+
+    def _flush_part(self) -> None:
+        if not self._buf:
+            return
+        if self._upload_id is None:
+            resp = self.client.create_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                ContentType=self.content_type,
+            )
+            self._upload_id = resp["UploadId"]
+
+        part_number = len(self._parts) + 1
+        resp = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=bytes(self._buf),
+        )
+        self._parts.append({"ETag": resp["ETag"], "PartNumber": part_number})
+        self._buf = bytearray()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+
+        if self._upload_id is None:
+            self.client.put_object(
+                Bucket=self.bucket,
+                Key=self.key,
+                Body=bytes(self._buf),
+                ContentType=self.content_type,
+            )
+            self._buf = bytearray()
+            return
+
+        self._flush_part()
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            MultipartUpload={"Parts": self._parts},
+        )
+
+    def abort(self) -> None:
+        self.closed = True
+        self._buf = bytearray()
+        if self._upload_id is not None:
+            try:
+                self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id)
+            except Exception as e:
+                # Parts of an unaborted upload are billed until a lifecycle rule removes them
+                print(f"[s3] abort of multipart upload {self._upload_id} for {self.key} failed: {type(e).__name__}: {e}")
+
+    @property
+    def bytes_written(self) -> int:
+        return self._pos
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+    def __enter__(self) -> "S3UploadStream":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+# S3's limit per DeleteObjects request
+DELETE_BATCH = 1000
+
+_ETAG_SAFE = re.compile(r"[^A-Za-z0-9-]")
+
+
+class DiskObjectCache:
+    """
+    Read-through cache of S3 object bodies on local disk, keyed by key + ETag.
+
+    Layout: <root>/<sha256(key)[:40]>/<etag>.bin. Files are written to a temp
+    name and os.replace()d into place, so readers in any thread or process
+    only ever see complete bodies. A hit touches the file's mtime; eviction
+    (least recently used first, down to max_bytes) runs under an flock on
+    <root>/.lock so concurrent workers don't evict against each other.
+    Hit/miss counters are per process.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        self._stats_lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_from_cache = 0
+        self.evictions = 0
+
+    # ---------------- Paths ----------------
+    def _key_dir(self, key: str) -> Path:
+        return self.root / hashlib.sha256(key.encode("utf-8")).hexdigest()[:40]
+
+    @staticmethod
+    def _etag_name(etag: str) -> str:
+        return _ETAG_SAFE.sub("", etag or "")
+
+    # ---------------- Read / write ----------------
+    def lookup(self, key: str) -> Tuple[str, Path] | None:
+        """
+        (etag, path) of the cached body for `key`, if any.
+        """
+        d = self._key_dir(key)
+        try:
+            names = [n for n in os.listdir(d) if n.endswith(".bin")]
+        except FileNotFoundError:
+            return None
+        if not names:
+            return None
+        name = max(names, key=lambda n: _mtime(d / n))
+        return f'"{name[:-4]}"', d / name
+
+    def read(self, path: Path) -> bytes | None:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            # Evicted by another worker between lookup and open
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def store(self, key: str, etag: str, data: bytes) -> None:
+        name = self._etag_name(etag)
+        if not name or len(data) > self.max_bytes:
+            return
+
+        d = self._key_dir(key)
+        d.mkdir(parents=True, exist_ok=True)
+        final = d / f"{name}.bin"
+        tmp = d / f".{name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, final)
+        except OSError as e:
+            print(f"[s3-cache] store failed for {key}: {e}")
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return
+
+        # Older versions of the same key can't be hit again
+        for other in d.glob("*.bin"):
+            if other != final:
+                try:
+                    other.unlink()
+                except OSError:
+                    pass
+
+        self.evict()
+
+    # ---------------- Eviction ----------------
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        with self._evict_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.root / ".lock", "a") as lf:
+                fcntl.flock(lf, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lf, fcntl.LOCK_UN)
+
+    def _entries(self):
+        for d in self.root.iterdir():
+            if not d.is_dir():
+                continue
+            for f in d.glob("*.bin"):
+                try:
+                    st = f.stat()
+                except FileNotFoundError:
+                    continue
+                yield st.st_mtime, st.st_size, f
+
+    def evict(self) -> int:
+        with self._exclusive():
+            entries = sorted(self._entries(), key=lambda e: e[0])
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, f in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    f.unlink()
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+                total -= size
+                try:
+                    f.parent.rmdir()  # only succeeds once the key dir is empty
+                except OSError:
+                    pass
+        if removed:
+            with self._stats_lock:
+                self.evictions += removed
+        return removed
+
+    # ---------------- Metrics ----------------
+    def record(self, hit: bool, nbytes: int = 0) -> None:
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+                self.bytes_from_cache += nbytes
+            else:
+                self.misses += 1
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "bytes_from_cache": self.bytes_from_cache,
+                "evictions": self.evictions,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def _mtime(p: Path) -> float:
+    try:
+        return p.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+def _total_size(content_range: str | None, default: int) -> int:
+    # "bytes 0-1023/5000" -> 5000; a plain 200 has no Content-Range
+    if content_range and "/" in content_range:
+        try:
+            return int(content_range.rsplit("/", 1)[1])
+        except ValueError:
+            pass
+    return default
+
+
+def _not_modified(e: ClientError) -> bool:
+    status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return status == 304 or e.response.get("Error", {}).get("Code") in {"304", "NotModified"}
+
+
+def _disk_cache_from_env() -> DiskObjectCache | None:
+    """
+    S3_CACHE_DIR turns the cache on; S3_CACHE_MAX_MB is its byte budget (default 512).
+    """
+    root = (os.getenv("S3_CACHE_DIR") or "").strip()
+    if not root:
+        return None
+    try:
+        mb = int(os.getenv("S3_CACHE_MAX_MB", "512") or 512)
+    except ValueError:
+        mb = 512
+    if mb <= 0:
+        return None
+    try:
+        return DiskObjectCache(Path(root), mb * 1024 * 1024)
+    except OSError as e:
+        print(f"[s3-cache] disabled, cannot use {root}: {e}")
+        return None
+
+
+_clients: dict = {}
+_clients_lock = threading.Lock()
+
+
+def client_config() -> Config:
+    """
+    One pool for every thread in the process: S3_MAX_POOL_CONNECTIONS
+    (default 50; botocore's default of 10 queues parallel uploads) and
+    adaptive retries, which back off client-side when S3 throttles.
+    """
+    pool = max(1, _env_int("S3_MAX_POOL_CONNECTIONS", 50))
+    # The transfer manager opens up to max_concurrency connections per transfer
+    pool = max(pool, _env_int("S3_TRANSFER_CONCURRENCY", 8))
+    return Config(
+        signature_version="s3v4",
+        max_pool_connections=pool,
+        retries={"mode": "adaptive", "max_attempts": max(1, _env_int("S3_MAX_ATTEMPTS", 5))},
+        tcp_keepalive=True,
+    )
+
+
+def shared_s3_client(region: str | None = None, profile: str | None = None):
+    """
+    boto3 S3 client shared across the process, one per (region, profile).
+    Clients are thread-safe; sessions are not, so each is built under a lock.
+    """
+    region = region or os.getenv("AWS_REGION") or "us-east-1"
+    profile = profile if profile is not None else os.getenv("AWS_PROFILE")
+    key = (region, profile or "")
+
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                session = boto3.Session(profile_name=profile) if profile else boto3.Session()
+                client = session.client("s3", region_name=region, config=client_config())
+                _clients[key] = client
+    return client
 
 
 class S3Storage:
-    def __init__(self):
-        load_dotenv(".env")
+    """
+    The one S3 wrapper, used by the API (get_storage()) and the worker.
+    """
 
-        self.bucket = os.getenv("S3_BUCKET")
+    def __init__(self, bucket: str | None = None):
+        self.bucket = bucket or os.getenv("S3_BUCKET")
         if not self.bucket:
             raise RuntimeError("S3_BUCKET not set in .env")
 
-        region = os.getenv("AWS_REGION") or "us-east-1"
-        profile = os.getenv("AWS_PROFILE")
+        self.s3 = shared_s3_client()
 
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
+        self.transfer = transfer_config()
+        self.cache = _disk_cache_from_env()
 
-        self.s3 = session.client(
-            "s3",
-            region_name=region,
-            config=Config(signature_version="s3v4"),
-        )
+    def _put(
+        self,
+        key: str,
+        data: bytes,
+        content_type: str,
+        content_disposition: str | None = None,
+        cache_control: str | None = None,
+    ) -> None:
+        extra = {"ContentType": content_type}
+        if content_disposition:
+            extra["ContentDisposition"] = content_disposition
+        if cache_control:
+            extra["CacheControl"] = cache_control
+
+        if len(data) < self.transfer.multipart_threshold:
+            self.s3.put_object(Bucket=self.bucket, Key=key, Body=data, **extra)
+            return
 
-    def upload_pdf_bytes(self, key: str, data: bytes) -> None:
-        self.s3.put_object(
-            Bucket=self.bucket,
-            Key=key,
-            Body=data,
-            ContentType="application/pdf",
+        # Large: parallel multipart upload through boto3's transfer manager
+        self.s3.upload_fileobj(
+            BytesIO(data),
+            self.bucket,
+            key,
+            ExtraArgs=extra,
+            Config=self.transfer,
         )
 
-    def upload_bytes(self, key: str, data: bytes, content_type: str | None = None) -> None:
-        self.s3.put_object(
-            Bucket=self.bucket,
-            Key=key,
-            Body=data,
-            ContentType=content_type or "application/octet-stream",
-        )
+    def upload_pdf_bytes(self, key: str, data: bytes, cache_control: str | None = None) -> None:
+        self._put(key, data, "application/pdf", cache_control=cache_control)
 
-    def copy_object(self, src_key: str, dst_key: str) -> None:
+    def upload_bytes(
+        self,
+        key: str,
+        data: bytes,
+        content_type: str | None = None,
+        content_disposition: str | None = None,
+    ) -> None:
+        self._put(key, data, content_type or "application/octet-stream", content_disposition)
+
+    def open_upload_stream(self, key: str, content_type: str = "application/pdf") -> S3UploadStream:
+        return S3UploadStream(self.s3, self.bucket, key, content_type=content_type)
+
+    def copy_object(self, src_key: str, dst_key: str, cache_control: str | None = None) -> None:
+        extra = {"CacheControl": cache_control} if cache_control else {}
         self.s3.copy_object(
             Bucket=self.bucket,
             Key=dst_key,
             CopySource={"Bucket": self.bucket, "Key": src_key},
             ContentType="application/pdf",
             MetadataDirective="REPLACE",
+            **extra,
         )
 
+    # Worker-side name
+    copy_pdf = copy_object
+
+    def _get_first(self, key: str, **kwargs) -> dict:
+        """
+        GET of the first multipart_threshold bytes. Objects below that arrive
+        whole in this one request; for larger ones Content-Range carries the
+        total size, so _read_body() can fetch the rest without a HEAD.
+        """
+        try:
+            return self.s3.get_object(
+                Bucket=self.bucket,
+                Key=key,
+                Range=f"bytes=0-{self.transfer.multipart_threshold - 1}",
+                **kwargs,
+            )
+        except ClientError as e:
+            # S3 refuses any range on an empty object
+            if e.response.get("Error", {}).get("Code") != "InvalidRange":
+                raise
+            return self.s3.get_object(Bucket=self.bucket, Key=key, **kwargs)
+
+    def _read_body(self, key: str, resp: dict) -> bytes:
+        """
+        Full object from a _get_first() response: its body, plus the
+        remaining parts as parallel ranged GETs pinned to the same ETag
+        (a concurrent overwrite fails with 412 instead of mixing versions).
+        """
+        first = resp["Body"].read()
+        total = _total_size(resp.get("ContentRange"), len(first))
+        if len(first) >= total:
+            return first
+
+        # Not download_fileobj(): s3transfer 0.10 rejects IfMatch in ExtraArgs
+        # (only VersionId can pin a version, and that needs bucket versioning), and
+        # it would HEAD and re-GET the first range we already hold. Same
+        # TransferConfig part size and concurrency, though.
+        etag = resp["ETag"]
+        part = self.transfer.multipart_chunksize
+        ranges = [(start, min(start + part, total) - 1) for start in range(len(first), total, part)]
+
+        def fetch(r: Tuple[int, int]) -> bytes:
+            return self.s3.get_object(
+                Bucket=self.bucket,
+                Key=key,
+                Range=f"bytes={r[0]}-{r[1]}",
+                IfMatch=etag,
+            )["Body"].read()
+
+        with ThreadPoolExecutor(max_workers=min(self.transfer.max_concurrency, len(ranges))) as pool:
+            return b"".join([first, *pool.map(fetch, ranges)])
+
     def download_bytes(self, key: str) -> bytes:
-        resp = self.s3.get_object(Bucket=self.bucket, Key=key)
-        return resp["Body"].read()
+        if self.cache is None:
+            return self._read_body(key, self._get_first(key))
+        return self._download_cached(key)
+
+    def _download_cached(self, key: str) -> bytes:
+        """
+        Conditional GET against the cached ETag: a 304 serves the local copy,
+        anything else refreshes it. One request either way (plus the ranged
+        GETs for the rest of a large object).
+        """
+        cache = self.cache
+        cached = cache.lookup(key)
+        if cached is not None:
+            etag, path = cached
+            try:
+                resp = self._get_first(key, IfNoneMatch=etag)
+            except ClientError as e:
+                if not _not_modified(e):
+                    raise
+                data = cache.read(path)
+                if data is not None:
+                    cache.record(hit=True, nbytes=len(data))
+                    return data
+                resp = self._get_first(key)
+        else:
+            resp = self._get_first(key)
+
+        data = self._read_body(key, resp)
+        cache.record(hit=False)
+        if resp.get("ETag"):
+            cache.store(key, resp["ETag"], data)
+        return data
+
+    def download_pdf_bytes(self, key: str) -> bytes:
+        return self.download_bytes(key)
+
+    def cache_stats(self) -> dict | None:
+        return self.cache.stats() if self.cache is not None else None
 
     def delete_object(self, key: str) -> None:
         if not key:
             return
         self.s3.delete_object(Bucket=self.bucket, Key=key)
 
+    def delete_objects(self, keys: Iterable[str]) -> Dict[str, str]:
+        """
+        Batched DeleteObjects, up to DELETE_BATCH keys per request. Returns
+        {key: error} for keys S3 refused; missing keys count as deleted.
+        """
+        keys = [k for k in keys if k]
+        failed: Dict[str, str] = {}
+        for i in range(0, len(keys), DELETE_BATCH):
+            chunk = keys[i : i + DELETE_BATCH]
+            resp = self.s3.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": k} for k in chunk], "Quiet": True},
+            )
+            for err in resp.get("Errors") or []:
+                failed[err.get("Key", "")] = f"{err.get('Code')}: {err.get('Message')}"
+        return failed
+
+    def list_objects(self, prefix: str) -> Iterator[Tuple[str, datetime]]:
+        paginator = self.s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for obj in page.get("Contents") or []:
+                yield obj["Key"], obj["LastModified"]
+
     def head_object(self, key: str) -> dict:
         return self.s3.head_object(Bucket=self.bucket, Key=key)
 
+    def exists(self, key: str) -> bool:
+        try:
+            self.s3.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in {"404", "NoSuchKey", "NotFound"}:
+                return False
+            raise
+
     def presign_get_url(
         self,
         key: str,
@@ -109,21 +665,3 @@ class S3Storage:
 
         clean_key = clean_key[len("final/"):]
         return f"{base}/{clean_key}"
-
-
-_storage_singleton: S3Storage | None = None
-
-
-def get_storage() -> S3Storage:
-    global _storage_singleton
-    if _storage_singleton is None:
-        _storage_singleton = S3Storage()
-    return _storage_singleton
-
-
-def presign_get_url(key: str, expires_seconds: int = 3600) -> str:
-    return get_storage().presign_get_url(key=key, expires_seconds=expires_seconds)
-
-
-def public_url(key: str) -> str:
-    return get_storage().public_url(key)
\ No newline at end of file
@@ -1,4 +1,4 @@
 # app/styling/common/__init__.py
 from __future__ import annotations
 
-__all__ = ["template_stamp_renderer"]
\ No newline at end of file
+__all__ = ["page_chrome", "post_process", "template_stamp_renderer"]
@@ -0,0 +1,22 @@
+# app/styling/common/page_chrome.py
+from __future__ import annotations
+
+from typing import Callable
+
+from reportlab.pdfgen import canvas
+
+DrawFn = Callable[[canvas.Canvas], None]
+
+
+def define_form(c: canvas.Canvas, name: str, draw: DrawFn) -> None:
+    """
+    Record `draw(c)` once as a named form XObject on this canvas.
+
+    Call it before anything is drawn on the first page. Each page then
+    places the form with `c.doForm(name)`, so the logo, address block,
+    rules and static footer text are written to the PDF once per document
+    and referenced by every page. They are no longer redrawn on each page.
+    """
+    c.beginForm(name)
+    draw(c)
+    c.endForm()
@@ -0,0 +1,181 @@
+# app/styling/common/post_process.py
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Any, Callable, Optional, Sequence, Tuple
+
+from pypdf import PdfReader, PdfWriter
+from pypdf._page import PageObject
+from reportlab.lib import colors
+from reportlab.pdfgen import canvas
+
+
+@dataclass(frozen=True)
+class Mark:
+    """
+    One piece of text stamped onto a finished page (footer, page number,
+    watermark). Coordinates are page points from the bottom-left.
+
+    align: "left" | "right" | "center", relative to x.
+    rotate: degrees around (x, y); the text is then drawn at (0, dy).
+    knockout: optional (x, y, w, h) filled white before the text, to cover
+    whatever the page already has there (e.g. an estimated page number).
+    """
+
+    text: str
+    x: float
+    y: float
+    font: str = "Helvetica"
+    size: float = 8
+    color: Any = colors.black
+    align: str = "left"
+    rotate: float = 0.0
+    dy: float = 0.0
+    alpha: float = 1.0
+    knockout: Optional[Tuple[float, float, float, float]] = None
+
+    def key(self) -> tuple:
+        return (
+            self.text,
+            round(self.x, 2),
+            round(self.y, 2),
+            self.font,
+            self.size,
+            _color_key(self.color),
+            self.align,
+            self.rotate,
+            self.dy,
+            self.alpha,
+            self.knockout,
+        )
+
+
+# (page index, page count, (width, height)) -> marks for that page
+MarksFor = Callable[[int, int, Tuple[float, float]], Sequence[Mark]]
+
+
+def _color_key(color: Any) -> tuple:
+    try:
+        return tuple(round(v, 4) for v in color.rgba())
+    except AttributeError:
+        return (str(color),)
+
+
+def _draw_mark(c: canvas.Canvas, m: Mark) -> None:
+    if m.knockout:
+        kx, ky, kw, kh = m.knockout
+        c.setFillColor(colors.white)
+        c.rect(kx, ky, kw, kh, stroke=0, fill=1)
+
+    c.saveState()
+    c.setFillColor(m.color)
+    if m.alpha < 1.0:
+        try:
+            c.setFillAlpha(m.alpha)
+        except Exception:
+            # Some reportlab builds lack alpha; the mark still renders, just opaque
+            pass
+    c.setFont(m.font, m.size)
+
+    if m.rotate:
+        c.translate(m.x, m.y)
+        c.rotate(m.rotate)
+        x, y = 0.0, m.dy
+    else:
+        x, y = m.x, m.y + m.dy
+
+    if m.align == "right":
+        c.drawRightString(x, y, m.text)
+    elif m.align == "center":
+        c.drawCentredString(x, y, m.text)
+    else:
+        c.drawString(x, y, m.text)
+    c.restoreState()
+
+
+@dataclass
+class _Overlay:
+    reader: PdfReader
+    # Same reasoning as DeckFragment: merges from one reader are serialized
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @property
+    def page(self) -> PageObject:
+        return self.reader.pages[0]
+
+
+OVERLAY_CACHE_SIZE = 512
+
+_overlays: "OrderedDict[tuple, _Overlay]" = OrderedDict()
+_overlays_lock = threading.Lock()
+
+
+def _build_overlay(size: Tuple[float, float], marks: Sequence[Mark]) -> _Overlay:
+    buf = BytesIO()
+    c = canvas.Canvas(buf, pagesize=size, invariant=1)
+    for m in marks:
+        _draw_mark(c, m)
+    c.save()
+    return _Overlay(reader=PdfReader(BytesIO(buf.getvalue())))
+
+
+def get_overlay(size: Tuple[float, float], marks: Sequence[Mark]) -> _Overlay:
+    """
+    One single-page overlay holding all of `marks`, cached by
+    (page size, marks). "Page 1 of 2" in the same font and colour is the
+    same overlay for every document in the process.
+    """
+    key = (round(size[0], 2), round(size[1], 2), tuple(m.key() for m in marks))
+    with _overlays_lock:
+        ov = _overlays.get(key)
+        if ov is not None:
+            _overlays.move_to_end(key)
+            return ov
+
+    ov = _build_overlay(size, marks)
+    with _overlays_lock:
+        _overlays[key] = ov
+        while len(_overlays) > OVERLAY_CACHE_SIZE:
+            _overlays.popitem(last=False)
+    return ov
+
+
+def stamp_pages(writer: PdfWriter, marks_for: MarksFor) -> int:
+    """
+    Stamp the pages already in `writer`, in place. `marks_for(index, page_count, size)`
+    returns everything that goes on that page (footer, number, watermark);
+    they are merged as one overlay, so each page is touched once.
+    Returns the number of pages stamped.
+    """
+    pages = writer.pages
+    total = len(pages)
+    stamped = 0
+    for index, page in enumerate(pages):
+        size = (float(page.mediabox.width), float(page.mediabox.height))
+        marks = marks_for(index, total, size)
+        if not marks:
+            continue
+        ov = get_overlay(size, marks)
+        with ov.lock:
+            page.merge_page(ov.page)
+        stamped += 1
+    return stamped
+
+
+def post_process_pdf(pdf_bytes: bytes, marks_for: MarksFor) -> bytes:
+    """
+    Bytes in, bytes out: parse once, stamp every page in one pass, write once.
+    """
+    reader = PdfReader(BytesIO(pdf_bytes))
+    writer = PdfWriter()
+    for page in reader.pages:
+        writer.add_page(page)
+
+    stamp_pages(writer, marks_for)
+
+    out = BytesIO()
+    writer.write(out)
+    return out.getvalue()
@@ -1,8 +1,11 @@
 # app/styling/common/template_stamp_renderer.py
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass
+from io import BytesIO
 from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
 
 from pypdf import PdfReader, PdfWriter
 from pypdf._page import PageObject
@@ -37,82 +40,108 @@ class TemplateStampRenderer:
       - for each input page, combine with corresponding template page
       - repeats the last template page if template has fewer pages
       - allows crude transform of the original content (scale/translate)
+
+    The template is parsed once per instance, and each template page is
+    pre-composed onto a blank page of the output size once per size; every
+    render after that only clones that base into its writer and merges the
+    input page onto it.
     """
 
-    def __init__(self, template_pdf: Path, options: StampOptions | None = None):
+    def __init__(self, template_pdf: Path | bytes, options: StampOptions | None = None):
         self.template_pdf = template_pdf
         self.options = options or StampOptions()
 
+        self._lock = threading.Lock()
+        self._tpl_reader: PdfReader | None = None
+        self._tpl_mtime: float | None = None
+        # (template page index, out_w, out_h) -> template already on a blank page of that size
+        self._bases: Dict[Tuple[int, float, float], PageObject] = {}
+
+    # ---------------- Template cache ----------------
+    def _template_pages(self) -> List[PageObject]:
+        """
+        Must be called with self._lock held.
+        """
+        if isinstance(self.template_pdf, (bytes, bytearray)):
+            if self._tpl_reader is None:
+                self._tpl_reader = PdfReader(BytesIO(self.template_pdf))
+            return list(self._tpl_reader.pages)
+
+        # Re-read if the template file was replaced on disk
+        mtime = Path(self.template_pdf).stat().st_mtime
+        if self._tpl_reader is None or mtime != self._tpl_mtime:
+            self._tpl_reader = PdfReader(str(self.template_pdf))
+            self._tpl_mtime = mtime
+            self._bases.clear()
+        return list(self._tpl_reader.pages)
+
+    def _base_for(self, tpl_pages: List[PageObject], index: int, out_w: float, out_h: float) -> PageObject:
+        key = (index, round(out_w, 2), round(out_h, 2))
+        base = self._bases.get(key)
+        if base is None:
+            base = PageObject.create_blank_page(width=out_w, height=out_h)
+            base.merge_page(tpl_pages[index])
+            self._bases[key] = base
+        return base
+
+    # ---------------- Render ----------------
     def render(self, input_pdf: Path, output_pdf: Path) -> None:
-        src = PdfReader(str(input_pdf))
-        tpl = PdfReader(str(self.template_pdf))
+        with open(input_pdf, "rb") as f:
+            out = self.render_bytes(f.read())
+        with open(output_pdf, "wb") as f:
+            f.write(out)
+
+    def render_bytes(self, input_pdf: bytes) -> bytes:
+        return self.render_many([input_pdf])[0]
+
+    def render_many(self, inputs: Sequence[bytes]) -> List[bytes]:
+        """
+        Restyle each input PDF (bytes) and return the outputs in order.
+        The parsed template and composed template pages are shared by all.
+        """
+        results: List[bytes] = []
+        with self._lock:
+            tpl_pages = self._template_pages()
+            for pdf_bytes in inputs:
+                results.append(self._render_one(tpl_pages, pdf_bytes))
+        return results
+
+    def _render_one(self, tpl_pages: List[PageObject], pdf_bytes: bytes) -> bytes:
+        src = PdfReader(BytesIO(pdf_bytes))
         out = PdfWriter()
-
-        tpl_pages = tpl.pages
         tpl_len = len(tpl_pages)
 
         for i, src_page in enumerate(src.pages):
-            tpl_page = tpl_pages[min(i, tpl_len - 1)]  # repeat last template page if needed
-            composed = self._compose_page(tpl_page, src_page)
-            out.add_page(composed)
+            ti = min(i, tpl_len - 1)  # repeat last template page if needed
+            self._compose_into(out, tpl_pages, ti, src_page)
 
-        with open(output_pdf, "wb") as f:
-            out.write(f)
+        buf = BytesIO()
+        out.write(buf)
+        return buf.getvalue()
 
-    def _compose_page(self, tpl_page: PageObject, src_page: PageObject) -> PageObject:
-        # Decide output size
+    def _out_size(self, tpl_page: PageObject, src_page: PageObject) -> Tuple[float, float]:
         if self.options.use_template_page_size:
-            out_w = float(tpl_page.mediabox.width)
-            out_h = float(tpl_page.mediabox.height)
-        else:
-            out_w = float(src_page.mediabox.width)
-            out_h = float(src_page.mediabox.height)
-
-        # Create blank output base page
-        base = PageObject.create_blank_page(width=out_w, height=out_h)
-
-        # Copy template and original into temporary pages (avoid mutating reader pages)
-        tpl_copy = PageObject.create_blank_page(
-            width=float(tpl_page.mediabox.width),
-            height=float(tpl_page.mediabox.height),
-        )
-        tpl_copy.merge_page(tpl_page)
-
-        src_copy = PageObject.create_blank_page(
-            width=float(src_page.mediabox.width),
-            height=float(src_page.mediabox.height),
-        )
-        src_copy.merge_page(src_page)
-
-        # Apply transform to original content if requested
-        if (
-            self.options.stamp_scale != 1.0
-            or self.options.stamp_dx != 0.0
-            or self.options.stamp_dy != 0.0
-        ):
-            # affine transform matrix: (a,b,c,d,e,f)
-            # [a c e]
-            # [b d f]
-            # [0 0 1]
-            src_copy.add_transformation(
-                (
-                    self.options.stamp_scale,
-                    0,
-                    0,
-                    self.options.stamp_scale,
-                    self.options.stamp_dx,
-                    self.options.stamp_dy,
-                )
-            )
-
-        # Compose in the chosen order
+            return float(tpl_page.mediabox.width), float(tpl_page.mediabox.height)
+        return float(src_page.mediabox.width), float(src_page.mediabox.height)
+
+    def _src_ctm(self) -> Tuple[float, float, float, float, float, float]:
+        # affine transform matrix: (a,b,c,d,e,f)
+        # [a c e]
+        # [b d f]
+        # [0 0 1]
+        o = self.options
+        return (o.stamp_scale, 0, 0, o.stamp_scale, o.stamp_dx, o.stamp_dy)
+
+    def _compose_into(self, out: PdfWriter, tpl_pages: List[PageObject], ti: int, src_page: PageObject) -> None:
+        tpl_page = tpl_pages[ti]
+        out_w, out_h = self._out_size(tpl_page, src_page)
+
         if self.options.template_as_background:
-            # base <- template <- original
-            base.merge_page(tpl_copy)
-            base.merge_page(src_copy)
+            # base <- template <- original; the template base is cloned, never mutated
+            page = out.add_page(self._base_for(tpl_pages, ti, out_w, out_h))
+            page.merge_transformed_page(src_page, self._src_ctm())
         else:
             # base <- original <- template
-            base.merge_page(src_copy)
-            base.merge_page(tpl_copy)
-
-        return base
\ No newline at end of file
+            page = out.add_blank_page(width=out_w, height=out_h)
+            page.merge_transformed_page(src_page, self._src_ctm())
+            page.merge_page(tpl_page)
@@ -1,15 +1,82 @@
 # app/styling/invoice/build_data.py
 from __future__ import annotations
 
-from typing import Any, Dict
+import asyncio
+from typing import Any, Dict, Optional
 
 from app.invoice_lookup import get_invoice_id_by_number
 from app.services.snowflake import get_property_details_for_customer
 from app.styling.invoice.mapper import map_buildops_invoice_to_pdf_data
 
 
+def _lookup_snowflake_property(billing_customer_id: Any, prop_id: Any) -> Optional[Dict[str, Any]]:
+    if not (billing_customer_id and prop_id):
+        return None
+
+    try:
+        return get_property_details_for_customer(
+            customer_id=str(billing_customer_id).strip(),
+            property_id=str(prop_id).strip(),
+        )
+    except Exception as e:
+        print(
+            f"[invoice build] Snowflake property lookup failed "
+            f"for customer_id={billing_customer_id}, property_id={prop_id}: {e}"
+        )
+        return None
+
+
+def _normalize(
+    invoice_id: str,
+    invoice_number: str,
+    invoice: Dict[str, Any],
+    customer: Optional[Dict[str, Any]],
+    property_obj: Optional[Dict[str, Any]],
+    snowflake_property: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    normalized = map_buildops_invoice_to_pdf_data(
+        invoice,
+        customer=customer,
+        property_obj=property_obj,
+        snowflake_property=snowflake_property,
+    )
+
+    # Make ids available downstream for recipient resolution
+    normalized["customerPropertyId"] = invoice.get("customerPropertyId")
+    normalized["billingCustomerId"] = invoice.get("billingCustomerId")
+
+    # Existing BuildOps invoice metadata
+    normalized["buildops_invoice_id"] = invoice_id
+    normalized["buildops_invoice_number"] = str(invoice_number).strip()
+
+    return normalized
+
+
+def _with_mirror(bo):
+    """
+    Route reads through the local Postgres mirror (BUILDOPS_MIRROR, on by default).
+    If the mirror can't be set up we just use the live client.
+    """
+    from app.services.buildops_mirror import MirroredBuildOpsClient, mirror_enabled
+
+    if isinstance(bo, MirroredBuildOpsClient) or not mirror_enabled():
+        return bo
+
+    try:
+        return MirroredBuildOpsClient(bo)
+    except Exception as e:
+        print(f"[invoice build] BuildOps mirror unavailable, using live API: {e}")
+        return bo
+
+
 def build_invoice_pdf_data_from_number(bo, invoice_number: str) -> Dict[str, Any]:
-    invoice_id = get_invoice_id_by_number(invoice_number)
+    bo = _with_mirror(bo)
+
+    invoice_id = None
+    if hasattr(bo, "find_invoice_id_by_number"):
+        invoice_id = bo.find_invoice_id_by_number(invoice_number)
+    if not invoice_id:
+        invoice_id = get_invoice_id_by_number(invoice_number)
 
     invoice = bo.get_invoice_by_id(invoice_id)
 
@@ -23,32 +90,50 @@ def build_invoice_pdf_data_from_number(bo, invoice_number: str) -> Dict[str, Any
     if prop_id and hasattr(bo, "get_property_by_id"):
         property_obj = bo.get_property_by_id(prop_id)
 
-    snowflake_property = None
-    if billing_customer_id and prop_id:
-        try:
-            snowflake_property = get_property_details_for_customer(
-                customer_id=str(billing_customer_id).strip(),
-                property_id=str(prop_id).strip(),
-            )
-        except Exception as e:
-            print(
-                f"[invoice build] Snowflake property lookup failed "
-                f"for customer_id={billing_customer_id}, property_id={prop_id}: {e}"
-            )
+    snowflake_property = _lookup_snowflake_property(billing_customer_id, prop_id)
 
-    normalized = map_buildops_invoice_to_pdf_data(
-        invoice,
-        customer=customer,
-        property_obj=property_obj,
-        snowflake_property=snowflake_property,
-    )
+    return _normalize(invoice_id, invoice_number, invoice, customer, property_obj, snowflake_property)
 
-    # Make ids available downstream for recipient resolution
-    normalized["customerPropertyId"] = prop_id
-    normalized["billingCustomerId"] = billing_customer_id
 
-    # Existing BuildOps invoice metadata
-    normalized["buildops_invoice_id"] = invoice_id
-    normalized["buildops_invoice_number"] = str(invoice_number).strip()
+def _with_async_mirror(bo):
+    from app.services.buildops_mirror import AsyncMirroredBuildOpsClient, mirror_enabled
+
+    if isinstance(bo, AsyncMirroredBuildOpsClient) or not mirror_enabled():
+        return bo
+
+    try:
+        return AsyncMirroredBuildOpsClient(bo)
+    except Exception as e:
+        print(f"[invoice build] BuildOps mirror unavailable, using live API: {e}")
+        return bo
+
+
+async def build_invoice_pdf_data_from_number_async(bo, invoice_number: str) -> Dict[str, Any]:
+    """
+    Same result as build_invoice_pdf_data_from_number, for an AsyncBuildOpsClient
+    (mirrored the same way). Customer, property and Snowflake lookups run
+    concurrently once the invoice is known.
+    """
+    bo = _with_async_mirror(bo)
+
+    invoice_id = None
+    if hasattr(bo, "find_invoice_id_by_number"):
+        invoice_id = await bo.find_invoice_id_by_number(invoice_number)
+    if not invoice_id:
+        invoice_id = await asyncio.to_thread(get_invoice_id_by_number, invoice_number)
+
+    invoice = await bo.get_invoice_by_id(invoice_id)
+
+    billing_customer_id = invoice.get("billingCustomerId")
+    prop_id = invoice.get("customerPropertyId")
+
+    async def none() -> None:
+        return None
+
+    customer, property_obj, snowflake_property = await asyncio.gather(
+        bo.get_customer_by_id(billing_customer_id) if billing_customer_id else none(),
+        bo.get_property_by_id(prop_id) if prop_id else none(),
+        asyncio.to_thread(_lookup_snowflake_property, billing_customer_id, prop_id),
+    )
 
-    return normalized
\ No newline at end of file
+    return _normalize(invoice_id, invoice_number, invoice, customer, property_obj, snowflake_property)
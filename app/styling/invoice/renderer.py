@@ -13,15 +13,19 @@ from reportlab.pdfgen import canvas
 from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.lib.utils import ImageReader
 
-# Footer stamping
-from pypdf import PdfReader, PdfWriter
-from pypdf._page import PageObject
-
 from pathlib import Path
 import logging
 
+from app.styling.common.page_chrome import define_form
+from app.styling.common.post_process import Mark, post_process_pdf
+from app.styling.invoice.table_layout import Column, LineItemTable
+
 logger = logging.getLogger(__name__)
 
+# Bump whenever a change here alters the PDF produced for the same invoice
+# data; it's part of the fingerprint that lets a rebuild hand back the draft.
+RENDERER_VERSION = "1"
+
 DEFAULT_LOGO = (
     Path(__file__).resolve().parents[3]
     / "templates"
@@ -284,11 +288,6 @@ def _vcenter_baseline(row_top: float, row_h: float, font_size: float) -> float:
     return row_top - (row_h / 2.0) - (font_size * 0.35)
 
 
-def _compute_row_h(line_count: int) -> float:
-    core = max(1, line_count) * ROW_LINE_H
-    return max(ROW_LINE_H + ROW_PAD_Y, core + ROW_PAD_Y)
-
-
 def _normalize_property_address(lines: List[str]) -> List[str]:
     raw = [str(x).strip() for x in (lines or []) if str(x).strip()]
     has_ca = any(ln.upper() == "CA" for ln in raw)
@@ -352,20 +351,6 @@ def _draw_wrapped_cell_left(
         yy -= ROW_LINE_H
 
 
-def _draw_wrapped_cell_top(
-    c: canvas.Canvas,
-    x_left: float,
-    row_top: float,
-    lines: List[str],
-    fs: int = FS_XS,
-    top_pad: float = 11,
-):
-    yy = row_top - top_pad
-    for ln in (lines or [""]):
-        _draw_text(c, x_left + 4, yy, ln, fs=fs)
-        yy -= ROW_LINE_H
-
-
 def _draw_summary_block(
     c: canvas.Canvas,
     x0: float,
@@ -406,7 +391,29 @@ def _draw_summary_block(
     return y
 
 
+HEADER_FORM = "invoice_header"
+
+
+def _header_bottom_y() -> float:
+    y_top = PAGE_H - M_T
+    header_block_h = max(3 * HEADER_LINE_H, HEADER_LOGO_H)
+    y_rule = y_top - header_block_h - HEADER_RULE_GAP
+    return y_rule - HEADER_BOTTOM_GAP
+
+
 def _draw_header_v2_invoice(c: canvas.Canvas, logo_path: str | None) -> float:
+    """
+    Places the header form defined once per document by _draw_header_art_invoice.
+    """
+    c.doForm(HEADER_FORM)
+    # Leave the canvas state as the inline header did
+    c.setFont("Helvetica", HEADER_TEXT_FS)
+    c.setLineWidth(HEADER_RULE_W)
+    c.setStrokeColor(BLACK)
+    return _header_bottom_y()
+
+
+def _draw_header_art_invoice(c: canvas.Canvas, logo_path: str | None) -> None:
     x0 = M_L
     x1 = PAGE_W - M_R
     w = x1 - x0
@@ -457,98 +464,56 @@ def _draw_header_v2_invoice(c: canvas.Canvas, logo_path: str | None) -> float:
     c.line(x0, y_rule, x1, y_rule)
     c.setStrokeColor(BLACK)
 
-    return y_rule - HEADER_BOTTOM_GAP
-
 
-# ---------------- Footer stamping ----------------
-def _make_footer_overlay(page_num: int, page_count: int) -> bytes:
-    buf = io.BytesIO()
-    c = canvas.Canvas(buf, pagesize=letter)
+# ---------------- Footer / PAID stamping ----------------
+def _footer_marks(page_num: int, page_count: int) -> List[Mark]:
     footer_y = M_B * 0.55
-    _draw_text(
-        c,
-        M_L,
-        footer_y,
-        "Thank you for choosing Mainline Fire Protection!",
-        fs=FS_XS,
-        color=FOOTER_GREY,
-    )
-    _draw_right(
-        c,
-        PAGE_W - M_R,
-        footer_y,
-        f"Page {page_num} of {page_count}",
-        fs=FS_XS,
-        color=FOOTER_GREY,
-    )
-    c.save()
-    return buf.getvalue()
-
-
-def _stamp_footer(pdf_bytes: bytes) -> bytes:
-    r = PdfReader(io.BytesIO(pdf_bytes))
-    w = PdfWriter()
-    n = len(r.pages)
-
-    for i, page in enumerate(r.pages, start=1):
-        overlay_pdf = PdfReader(io.BytesIO(_make_footer_overlay(i, n)))
-        overlay_page: PageObject = overlay_pdf.pages[0]
-        page.merge_page(overlay_page)
-        w.add_page(page)
-
-    out = io.BytesIO()
-    w.write(out)
-    return out.getvalue()
-
-# ------------------- Make PAID stamp --------------------
-def _make_paid_overlay() -> bytes:
-    buf = io.BytesIO()
-    c = canvas.Canvas(buf, pagesize=letter)
-
-    # Center of page
-    cx = PAGE_W / 2
-    cy = PAGE_H / 2
-
-    c.saveState()
-
-    # Move to center and rotate
-    c.translate(cx, cy)
-    c.rotate(35)
-
-    # Use the same orange as Total
-    c.setFillColor(ORANGE)
-
-    # Make it watermark-like
-    try:
-        c.setFillAlpha(0.30)
-    except Exception:
-        # Some environments/reportlab builds may not support alpha.
-        # If so, it will still render in orange, just without transparency.
-        pass
-
-    # Slightly smaller and better centered visually
-    c.setFont("Helvetica-Bold", 96)
-    c.drawCentredString(0, -10, "PAID")
+    return [
+        Mark(
+            "Thank you for choosing Mainline Fire Protection!",
+            M_L,
+            footer_y,
+            size=FS_XS,
+            color=FOOTER_GREY,
+        ),
+        Mark(
+            f"Page {page_num} of {page_count}",
+            PAGE_W - M_R,
+            footer_y,
+            size=FS_XS,
+            color=FOOTER_GREY,
+            align="right",
+        ),
+    ]
 
-    c.restoreState()
-    c.save()
-    return buf.getvalue()
 
+# Centered, rotated, translucent; same orange as Total
+PAID_MARK = Mark(
+    "PAID",
+    PAGE_W / 2,
+    PAGE_H / 2,
+    font="Helvetica-Bold",
+    size=96,
+    color=ORANGE,
+    align="center",
+    rotate=35,
+    dy=-10,
+    alpha=0.30,
+)
 
-def _stamp_paid(pdf_bytes: bytes) -> bytes:
-    r = PdfReader(io.BytesIO(pdf_bytes))
-    w = PdfWriter()
 
-    overlay_pdf = PdfReader(io.BytesIO(_make_paid_overlay()))
-    overlay_page: PageObject = overlay_pdf.pages[0]
+def _stamp_footer(pdf_bytes: bytes, *, paid: bool = False) -> bytes:
+    """
+    Footer on every page, plus the PAID watermark when `paid`, in one pass.
+    """
+    def marks_for(index: int, page_count: int, size: Tuple[float, float]) -> List[Mark]:
+        marks = _footer_marks(index + 1, page_count)
+        if paid:
+            marks.append(PAID_MARK)
+        return marks
 
-    for page in r.pages:
-        page.merge_page(overlay_page)
-        w.add_page(page)
+    return post_process_pdf(pdf_bytes, marks_for)
 
-    out = io.BytesIO()
-    w.write(out)
-    return out.getvalue()
 
 # ---------------- Renderer ----------------
 def render_invoice_styled_draft(normalized: Dict[str, Any], logo_path: str | None = None) -> bytes:
@@ -556,7 +521,8 @@ def render_invoice_styled_draft(normalized: Dict[str, Any], logo_path: str | Non
         logo_path = str(DEFAULT_LOGO)
 
     buf = io.BytesIO()
-    c = canvas.Canvas(buf, pagesize=letter)
+    c = canvas.Canvas(buf, pagesize=letter, invariant=1)
+    define_form(c, HEADER_FORM, lambda fc: _draw_header_art_invoice(fc, logo_path))
 
     x0 = M_L
     x1 = PAGE_W - M_R
@@ -783,73 +749,52 @@ def render_invoice_styled_draft(normalized: Dict[str, Any], logo_path: str | Non
     PARTS_TAIL_LABELS = {"Taxable", "Qty", "Unit Price", "Price"}
     NUMERIC_HEADER_LABELS = {"Hours", "Rate", "Qty", "Unit Price", "Price"}
 
-    def draw_table_header(cols: List[Tuple[str, float]], y_top: float, tail_labels: set[str]):
-        _rect_fill(c, x0, y_top - TABLE_HDR_H, content_w, TABLE_HDR_H, BLACK)
-        x = x0
-        for label, w in cols:
-            if label == "":
-                x += w
-                continue
-
+    def line_item_table(cols: List[Tuple[str, float]], tail_labels: set[str], n_wrapped: int) -> LineItemTable:
+        columns: List[Column] = []
+        for i, (label, w) in enumerate(cols):
             if label in NUMERIC_HEADER_LABELS:
-                _draw_right(c, x + w - 4, y_top - 12, label, fs=FS_XS, bold=True, color=WHITE)
-                x += w
-                continue
+                header_align = "right"
+            elif label in tail_labels:
+                header_align = "center"
+            else:
+                header_align = "left"
 
-            if label in tail_labels:
-                _set_font(c, FS_XS, bold=True)
-                c.setFillColor(WHITE)
-                tw = stringWidth(label, c._fontname, FS_XS)
-                c.drawString(x + (w - tw) / 2.0, y_top - 12, label)
-                c.setFillColor(BLACK)
+            if i < n_wrapped:
+                align = "wrap"
+            elif label == "Taxable":
+                align = "center"
             else:
-                _draw_text(c, x + 4, y_top - 12, label, fs=FS_XS, bold=True, color=WHITE)
+                align = "right"
+            columns.append(Column(label, w, align=align, header_align=header_align))
+
+        return LineItemTable(
+            x0,
+            columns,
+            wrap=_wrap_lines,
+            fs=FS_XS,
+            line_h=ROW_LINE_H,
+            pad_y=ROW_PAD_Y,
+            header_h=TABLE_HDR_H,
+            rule_color=LIGHT_RULE,
+        )
+
+    def next_page_y() -> float:
+        new_page()
+        return y
 
-            x += w
+    table_bottom = M_B + 0.35 * inch
 
     # ===== Labor =====
     labor_rows = [] if hide_labor else (normalized.get("labor_rows") or [])
     if labor_rows:
         _draw_text(c, x0, y, "Labor", fs=FS_SM, bold=True)
         y -= 12
-        ensure_space(TABLE_HDR_H + 10)
-        draw_table_header(labor_cols, y, LABOR_TAIL_LABELS)
-        y -= TABLE_HDR_H
 
         labor_total_hours = 0.0
         labor_total_amt = 0.0
+        labor_values: List[List[str]] = []
 
         for r in labor_rows:
-            date_lines = _wrap_lines(_display_row_date(r.get("date")), "Helvetica", FS_XS, labor_cols[0][1] - 8)
-            name_lines = _wrap_lines(_s(r.get("name")), "Helvetica", FS_XS, labor_cols[1][1] - 8)
-            desc_lines = _wrap_lines(_s(r.get("description")), "Helvetica", FS_XS, labor_cols[2][1] - 8)
-
-            row_line_count = max(
-                len(date_lines),
-                len(name_lines),
-                len(desc_lines),
-                1,
-            )
-            row_h = _compute_row_h(row_line_count)
-            ensure_space(row_h + 8)
-
-            row_top = y
-            y_base = row_top - 11
-
-            x = x0
-            _draw_wrapped_cell_top(c, x, row_top=row_top, lines=date_lines)
-            x += labor_cols[0][1]
-
-            _draw_wrapped_cell_top(c, x, row_top=row_top, lines=name_lines)
-            x += labor_cols[1][1]
-
-            _draw_wrapped_cell_top(c, x, row_top=row_top, lines=desc_lines)
-            x += labor_cols[2][1]
-
-            taxable = "Yes" if bool(r.get("taxable")) else "No"
-            _draw_center(c, x, labor_cols[3][1], y_base, taxable, fs=FS_XS)
-            x += labor_cols[3][1]
-
             hours = float(r.get("hours") or 0)
             rate = float(r.get("rate") or 0)
             amount = float(r.get("price") or 0)
@@ -857,16 +802,18 @@ def render_invoice_styled_draft(normalized: Dict[str, Any], logo_path: str | Non
             labor_total_hours += hours
             labor_total_amt += amount
 
-            _draw_right(c, x + labor_cols[4][1] - 4, y_base, f"{hours:g}", fs=FS_XS)
-            x += labor_cols[4][1]
-
-            _draw_right(c, x + labor_cols[5][1] - 4, y_base, _money(rate), fs=FS_XS)
-            x += labor_cols[5][1]
+            labor_values.append([
+                _display_row_date(r.get("date")),
+                _s(r.get("name")),
+                _s(r.get("description")),
+                "Yes" if bool(r.get("taxable")) else "No",
+                f"{hours:g}",
+                _money(rate),
+                _money(amount),
+            ])
 
-            _draw_right(c, x + labor_cols[6][1] - 4, y_base, _money(amount), fs=FS_XS)
-
-            _hr(c, x0, x1, y - row_h, lw=0.6, col=LIGHT_RULE)
-            y -= row_h
+        labor_table = line_item_table(labor_cols, LABOR_TAIL_LABELS, n_wrapped=3)
+        y = labor_table.render(c, labor_table.measure(labor_values), y, bottom=table_bottom, new_page=next_page_y)
 
         ensure_space(24)
         _rect_fill(c, x0, y - 16, content_w, 16, GREY_TOTAL)
@@ -888,49 +835,12 @@ def render_invoice_styled_draft(normalized: Dict[str, Any], logo_path: str | Non
     if parts_rows:
         _draw_text(c, x0, y, "Parts & Materials", fs=FS_SM, bold=True)
         y -= 12
-        ensure_space(TABLE_HDR_H + 10)
-        draw_table_header(parts_cols, y, PARTS_TAIL_LABELS)
-        y -= TABLE_HDR_H
 
         parts_total_qty = 0.0
         parts_total_amt = 0.0
+        parts_values: List[List[str]] = []
 
         for r in parts_rows:
-            date_lines = _wrap_lines(_display_row_date(r.get("date")), "Helvetica", FS_XS, parts_cols[0][1] - 8)
-            name_lines = _wrap_lines(_s(r.get("name")), "Helvetica", FS_XS, parts_cols[1][1] - 8)
-            code_lines = _wrap_lines(_s(r.get("code")), "Helvetica", FS_XS, parts_cols[2][1] - 8)
-            desc_lines = _wrap_lines(_s(r.get("description")), "Helvetica", FS_XS, parts_cols[3][1] - 8)
-
-            row_line_count = max(
-                len(date_lines),
-                len(name_lines),
-                len(code_lines),
-                len(desc_lines),
-                1,
-            )
-            row_h = _compute_row_h(row_line_count)
-            ensure_space(row_h + 8)
-
-            row_top = y
-            y_base = row_top - 11
-
-            x = x0
-            _draw_wrapped_cell_top(c, x, row_top=row_top, lines=date_lines)
-            x += parts_cols[0][1]
-
-            _draw_wrapped_cell_top(c, x, row_top=row_top, lines=name_lines)
-            x += parts_cols[1][1]
-
-            _draw_wrapped_cell_top(c, x, row_top=row_top, lines=code_lines)
-            x += parts_cols[2][1]
-
-            _draw_wrapped_cell_top(c, x, row_top=row_top, lines=desc_lines)
-            x += parts_cols[3][1]
-
-            taxable = "Yes" if bool(r.get("taxable")) else "No"
-            _draw_center(c, x, parts_cols[4][1], y_base, taxable, fs=FS_XS)
-            x += parts_cols[4][1]
-
             qty = float(r.get("qty") or 0)
             unit_price = float(r.get("unit_price") or 0)
             amount = float(r.get("price") or 0)
@@ -938,16 +848,19 @@ def render_invoice_styled_draft(normalized: Dict[str, Any], logo_path: str | Non
             parts_total_qty += qty
             parts_total_amt += amount
 
-            _draw_right(c, x + parts_cols[5][1] - 4, y_base, f"{qty:g}", fs=FS_XS)
-            x += parts_cols[5][1]
-
-            _draw_right(c, x + parts_cols[6][1] - 4, y_base, _money(unit_price), fs=FS_XS)
-            x += parts_cols[6][1]
+            parts_values.append([
+                _display_row_date(r.get("date")),
+                _s(r.get("name")),
+                _s(r.get("code")),
+                _s(r.get("description")),
+                "Yes" if bool(r.get("taxable")) else "No",
+                f"{qty:g}",
+                _money(unit_price),
+                _money(amount),
+            ])
 
-            _draw_right(c, x + parts_cols[7][1] - 4, y_base, _money(amount), fs=FS_XS)
-
-            _hr(c, x0, x1, y - row_h, lw=0.6, col=LIGHT_RULE)
-            y -= row_h
+        parts_table = line_item_table(parts_cols, PARTS_TAIL_LABELS, n_wrapped=4)
+        y = parts_table.render(c, parts_table.measure(parts_values), y, bottom=table_bottom, new_page=next_page_y)
 
         ensure_space(24)
         _rect_fill(c, x0, y - 16, content_w, 16, GREY_TOTAL)
@@ -1118,12 +1031,8 @@ def render_invoice_styled_draft(normalized: Dict[str, Any], logo_path: str | Non
 
     c.save()
     pdf_no_footer = buf.getvalue()
-    pdf_with_footer = _stamp_footer(pdf_no_footer)
 
     balance = _to_float(normalized.get("balance"))
 
     # Apply PAID stamp ONLY when fully paid
-    if abs(balance) < 0.01:
-        return _stamp_paid(pdf_with_footer)
-
-    return pdf_with_footer
\ No newline at end of file
+    return _stamp_footer(pdf_no_footer, paid=abs(balance) < 0.01)
\ No newline at end of file
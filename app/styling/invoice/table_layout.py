@@ -0,0 +1,214 @@
+# app/styling/invoice/table_layout.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from reportlab.lib import colors
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+WrapFn = Callable[[str, str, int, float], List[str]]
+
+BLACK = colors.black
+WHITE = colors.white
+
+
+@dataclass(frozen=True)
+class Column:
+    label: str
+    width: float
+    # body cell: "wrap" (top-aligned, wrapped), "center" or "right" (single line)
+    align: str = "wrap"
+    # header label: "left" | "center" | "right"
+    header_align: str = "left"
+
+
+@dataclass
+class MeasuredRow:
+    cells: List[List[str]]
+    height: float
+
+
+class LineItemTable:
+    """
+    Labor / parts table for the invoice renderer.
+
+    measure() wraps every cell and computes every row height up front;
+    render() then walks the measured rows, breaks pages where the next row
+    won't fit (repeating the column header on the new page) and draws each
+    page's rows in bulk: one text object for all cell text and one
+    lines() call for the row rules.
+    """
+
+    def __init__(
+        self,
+        x0: float,
+        columns: Sequence[Column],
+        *,
+        wrap: WrapFn,
+        fs: int,
+        line_h: float,
+        pad_y: float,
+        header_h: float,
+        rule_color,
+        font: str = "Helvetica",
+        header_font: str = "Helvetica-Bold",
+        text_top_pad: float = 11,
+    ):
+        self.x0 = x0
+        self.columns = list(columns)
+        self.wrap = wrap
+        self.fs = fs
+        self.line_h = line_h
+        self.pad_y = pad_y
+        self.header_h = header_h
+        self.rule_color = rule_color
+        self.font = font
+        self.header_font = header_font
+        self.text_top_pad = text_top_pad
+
+        self.width = sum(col.width for col in self.columns)
+        self.col_x: List[float] = []
+        x = x0
+        for col in self.columns:
+            self.col_x.append(x)
+            x += col.width
+
+        # (text, max_w) -> wrapped lines; invoices repeat dates/names/codes a lot
+        self._wrap_cache: Dict[Tuple[str, float], List[str]] = {}
+
+    # ---------------- Measure ----------------
+    def _wrap_cell(self, text: str, max_w: float) -> List[str]:
+        key = (text, max_w)
+        lines = self._wrap_cache.get(key)
+        if lines is None:
+            stripped = text.strip()
+            if not stripped:
+                lines = [""]
+            elif stringWidth(stripped, self.font, self.fs) <= max_w:
+                # Fits on one line: same result as wrap(), without tokenizing
+                lines = [stripped]
+            else:
+                lines = self.wrap(stripped, self.font, self.fs, max_w)
+            self._wrap_cache[key] = lines
+        return lines
+
+    def row_height(self, line_count: int) -> float:
+        core = max(1, line_count) * self.line_h
+        return max(self.line_h + self.pad_y, core + self.pad_y)
+
+    def measure(self, rows: Sequence[Sequence[str]]) -> List[MeasuredRow]:
+        measured: List[MeasuredRow] = []
+        for values in rows:
+            cells: List[List[str]] = []
+            line_count = 1
+            for col, value in zip(self.columns, values):
+                if col.align == "wrap":
+                    lines = self._wrap_cell(value or "", col.width - 8)
+                    line_count = max(line_count, len(lines))
+                else:
+                    lines = [value or ""]
+                cells.append(lines)
+            measured.append(MeasuredRow(cells=cells, height=self.row_height(line_count)))
+        return measured
+
+    # ---------------- Draw ----------------
+    def draw_header(self, c: canvas.Canvas, y_top: float) -> None:
+        c.setFillColor(BLACK)
+        c.rect(self.x0, y_top - self.header_h, self.width, self.header_h, stroke=0, fill=1)
+
+        c.setFont(self.header_font, self.fs)
+        c.setFillColor(WHITE)
+        y = y_top - 12
+        for x, col in zip(self.col_x, self.columns):
+            if not col.label:
+                continue
+            if col.header_align == "right":
+                c.drawString(x + col.width - 4 - stringWidth(col.label, self.header_font, self.fs), y, col.label)
+            elif col.header_align == "center":
+                c.drawString(x + (col.width - stringWidth(col.label, self.header_font, self.fs)) / 2.0, y, col.label)
+            else:
+                c.drawString(x + 4, y, col.label)
+        c.setFillColor(BLACK)
+
+    def draw_rows(self, c: canvas.Canvas, rows: Sequence[MeasuredRow], y_top: float) -> float:
+        if not rows:
+            return y_top
+
+        font, fs, line_h = self.font, self.fs, self.line_h
+        t = c.beginText()
+        t.setFont(font, fs)
+        t.setFillColor(BLACK)
+
+        rules: List[Tuple[float, float, float, float]] = []
+        x_end = self.x0 + self.width
+        y = y_top
+
+        for row in rows:
+            y_base = y - self.text_top_pad
+            for x, col, lines in zip(self.col_x, self.columns, row.cells):
+                if col.align == "wrap":
+                    yy = y_base
+                    for ln in lines:
+                        if ln:
+                            t.setTextOrigin(x + 4, yy)
+                            t.textOut(ln)
+                        yy -= line_h
+                    continue
+
+                s = lines[0]
+                if not s:
+                    continue
+                tw = stringWidth(s, font, fs)
+                if col.align == "right":
+                    t.setTextOrigin(x + col.width - 4 - tw, y_base)
+                else:
+                    t.setTextOrigin(x + (col.width - tw) / 2.0, y_base)
+                t.textOut(s)
+
+            y -= row.height
+            rules.append((self.x0, y, x_end, y))
+
+        c.drawText(t)
+
+        c.setLineWidth(0.6)
+        c.setStrokeColor(self.rule_color)
+        c.lines(rules)
+        c.setStrokeColor(BLACK)
+        return y
+
+    def render(
+        self,
+        c: canvas.Canvas,
+        rows: Sequence[MeasuredRow],
+        y: float,
+        *,
+        bottom: float,
+        new_page: Callable[[], float],
+        row_gap: float = 8,
+    ) -> float:
+        """
+        Draw header + rows starting at y, continuing onto new pages as needed.
+        `new_page()` must start a page and return the y to continue from.
+        Returns the y below the last row.
+        """
+        # Don't strand a header at the bottom of a page without its first row
+        first_h = rows[0].height + row_gap if rows else 10
+        if y - (self.header_h + first_h) < bottom:
+            y = new_page()
+        self.draw_header(c, y)
+        y -= self.header_h
+
+        start = 0
+        cur = y
+        for i, row in enumerate(rows):
+            if cur - (row.height + row_gap) < bottom and i > start:
+                self.draw_rows(c, rows[start:i], y)
+                y = new_page()
+                self.draw_header(c, y)
+                y -= self.header_h
+                start, cur = i, y
+            cur -= row.height
+
+        return self.draw_rows(c, rows[start:], y)
@@ -26,4 +26,7 @@ class JobStyler:
         )
 
     def style(self, input_pdf: Path, output_pdf: Path) -> None:
-        self.renderer.render(input_pdf, output_pdf)
\ No newline at end of file
+        self.renderer.render(input_pdf, output_pdf)
+
+    def style_bytes(self, pdf_bytes: bytes) -> bytes:
+        return self.renderer.render_bytes(pdf_bytes)
@@ -2,20 +2,25 @@
 from __future__ import annotations
 
 from io import BytesIO
-from typing import Any, Dict
+from pathlib import Path
+from typing import Any, BinaryIO, Dict
 
 from pypdf import PdfReader, PdfWriter
 
 from app.styling.proposal.content_pages import render_content_pages
-from app.styling.proposal.overlay_cover import create_cover_overlay
-from app.styling.proposal.page_number import add_page_numbers
-from app.styling.proposal.template_picker import (
-    get_closing_template,
-    get_cover_template,
-    get_intro_template,
-    get_process_template,
-    get_testimonials_template,
+from app.styling.proposal.fragment_cache import (
+    append_fragment,
+    cover_fragment,
+    intro_process_fragment,
+    testimonials_closing_fragment,
 )
+from app.styling.proposal.overlay_cover import create_cover_overlay
+from app.styling.proposal.page_number import number_pages
+from app.styling.proposal.template_picker import get_cover_template
+
+# Bump whenever the proposal output changes for the same fields
+# (assembler, content pages, cover overlay); part of the draft hash.
+RENDERER_VERSION = "5"
 
 
 def _read_pdf(path_or_bytes: Any) -> PdfReader:
@@ -32,16 +37,20 @@ def _append_all_pages(writer: PdfWriter, reader: PdfReader) -> int:
     return count
 
 
-def _merge_cover_with_overlay(cover_path: str, overlay_bytes: bytes):
-    cover_reader = _read_pdf(cover_path)
-    overlay_reader = _read_pdf(overlay_bytes)
-
-    page = cover_reader.pages[0]
-    page.merge_page(overlay_reader.pages[0])
-    return page
+def _add_cover_with_overlay(writer: PdfWriter, cover_path: Path, overlay_bytes: bytes) -> None:
+    frag = cover_fragment(cover_path)
+    with frag.lock:
+        # add_page() clones into the writer, so the overlay lands on our copy,
+        # not on the cached template page
+        page = writer.add_page(frag.reader.pages[0])
+    page.merge_page(_read_pdf(overlay_bytes).pages[0])
 
 
-def build_proposal_pdf(fields: Dict[str, Any]) -> bytes:
+def assemble_proposal(fields: Dict[str, Any]) -> PdfWriter:
+    """
+    Merge the full deck into a PdfWriter with page numbers already stamped,
+    so callers can write it once, to wherever it's going.
+    """
     proposal_version = str(fields.get("proposal_version") or "Fancy").strip().lower()
 
     cover_path = get_cover_template(str(fields.get("proposal_type", "")))
@@ -50,8 +59,7 @@ def build_proposal_pdf(fields: Dict[str, Any]) -> bytes:
 
     # Page 1 - cover + overlay fields
     cover_overlay = create_cover_overlay(fields)
-    cover_page = _merge_cover_with_overlay(str(cover_path), cover_overlay)
-    writer.add_page(cover_page)
+    _add_cover_with_overlay(writer, cover_path, cover_overlay)
 
     black_page_indexes: list[int] = []
     white_page_indexes: list[int] = []
@@ -66,25 +74,19 @@ def build_proposal_pdf(fields: Dict[str, Any]) -> bytes:
             range(content_start_index, content_start_index + content_page_count)
         )
 
-        out = BytesIO()
-        writer.write(out)
-        merged_bytes = out.getvalue()
-
-        return add_page_numbers(
-            merged_bytes,
+        number_pages(
+            writer,
             start_at=2,
             black_page_indexes=black_page_indexes,
             white_page_indexes=white_page_indexes,
         )
+        return writer
 
     # Fancy version: current full proposal
-    intro_path = get_intro_template(str(fields.get("prepared_by", "")))
-    process_path = get_process_template(str(fields.get("proposal_type", "")))
-    testimonials_path = get_testimonials_template()
-    closing_path = get_closing_template(str(fields.get("prepared_by", "")))
+    prepared_by = str(fields.get("prepared_by", ""))
 
-    _append_all_pages(writer, _read_pdf(intro_path))
-    _append_all_pages(writer, _read_pdf(process_path))
+    # Static runs come pre-merged from the process-wide fragment cache
+    append_fragment(writer, intro_process_fragment(prepared_by, str(fields.get("proposal_type", ""))))
 
     content_start_index = len(writer.pages)
     content_pdf_bytes = render_content_pages(fields, start_page_number=4)
@@ -95,22 +97,28 @@ def build_proposal_pdf(fields: Dict[str, Any]) -> bytes:
     )
 
     testimonial_start_index = len(writer.pages)
-    testimonial_page_count = _append_all_pages(writer, _read_pdf(testimonials_path))
+    closing_frag = testimonials_closing_fragment(prepared_by)
+    append_fragment(writer, closing_frag)
+    testimonial_page_count = closing_frag.part_page_counts[0]
 
     white_page_indexes.extend(
         range(testimonial_start_index, testimonial_start_index + testimonial_page_count)
     )
 
-    _append_all_pages(writer, _read_pdf(closing_path))
-
-    out = BytesIO()
-    writer.write(out)
-    merged_bytes = out.getvalue()
-
-    return add_page_numbers(
-        merged_bytes,
+    number_pages(
+        writer,
         start_at=4,
         black_page_indexes=black_page_indexes,
         white_page_indexes=white_page_indexes,
     )
-   
\ No newline at end of file
+    return writer
+
+
+def write_proposal_pdf(fields: Dict[str, Any], out: BinaryIO) -> None:
+    assemble_proposal(fields).write(out)
+
+
+def build_proposal_pdf(fields: Dict[str, Any]) -> bytes:
+    out = BytesIO()
+    write_proposal_pdf(fields, out)
+    return out.getvalue()
@@ -1,15 +1,21 @@
 # app/styling/proposal/content_pages.py
 from __future__ import annotations
 
+import hashlib
 import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from io import BytesIO
 from typing import Any, Dict, List, Tuple
 
+from PIL import Image
 from reportlab.lib.colors import Color, black, white
 from reportlab.lib.utils import ImageReader
 from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.pdfgen import canvas
 
+from app.styling.common.page_chrome import define_form
 from app.styling.proposal.utils import money, safe_text, service_label_for_proposal_type
 
 
@@ -43,6 +49,14 @@ ICON_CANDIDATES = [
 ]
 
 
+# The icon master is 4584x8334 RGBA (~150 MB decoded, twice that with the
+# alpha mask) but is drawn 20pt tall; this is still well over 300ppi there.
+ICON_MAX_PX = 512
+
+_icon_png: Dict[str, bytes] = {}
+_icon_lock = threading.Lock()
+
+
 def _resolve_icon_path() -> str | None:
     for candidate in ICON_CANDIDATES:
         if candidate and os.path.isfile(candidate):
@@ -50,6 +64,21 @@ def _resolve_icon_path() -> str | None:
     return None
 
 
+def _footer_icon(icon_path: str) -> ImageReader:
+    """
+    Downscaled footer icon, decoded once per process instead of on every render.
+    """
+    with _icon_lock:
+        png = _icon_png.get(icon_path)
+        if png is None:
+            with Image.open(icon_path) as im:
+                im.thumbnail((ICON_MAX_PX, ICON_MAX_PX), Image.LANCZOS)
+                buf = BytesIO()
+                im.save(buf, format="PNG")
+            png = _icon_png[icon_path] = buf.getvalue()
+    return ImageReader(BytesIO(png))
+
+
 # ---------------------------------------------------------------------------
 # Text helpers
 # ---------------------------------------------------------------------------
@@ -156,6 +185,19 @@ def _draw_bulleted_line(
     keeping the bullet aligned to the first line only.
     """
     wrapped = _wrap_text(text, font_name, font_size, max_width)
+    return _draw_wrapped_bullet(c, bullet_x, text_x, y, wrapped, font_name, font_size, leading)
+
+
+def _draw_wrapped_bullet(
+    c: canvas.Canvas,
+    bullet_x: float,
+    text_x: float,
+    y: float,
+    wrapped: Tuple[str, ...] | List[str],
+    font_name: str = "Helvetica",
+    font_size: int = 10,
+    leading: int = 13,
+) -> float:
     if not wrapped:
         return y
 
@@ -177,11 +219,36 @@ def _draw_bulleted_line(
 # ---------------------------------------------------------------------------
 # Page chrome
 # ---------------------------------------------------------------------------
-def _draw_page_header(
+HEADER_FORM = "proposal_header"
+FOOTER_FORM = "proposal_footer"
+# Baseline of the last header line; the form itself is fixed per document
+HEADER_BOTTOM_Y = TOP - 26 - 26
+
+
+def _define_chrome_forms(c: canvas.Canvas, property_name: str, proposal_type: str) -> None:
+    define_form(c, HEADER_FORM, lambda fc: _draw_page_header_art(fc, property_name, proposal_type))
+    define_form(c, FOOTER_FORM, _draw_page_footer_art)
+
+
+def _draw_page_header(c: canvas.Canvas) -> float:
+    c.doForm(HEADER_FORM)
+    # Leave the canvas state as the inline header did
+    c.setFont("Helvetica-Bold", 22)
+    c.setFillColor(ORANGE)
+    return HEADER_BOTTOM_Y
+
+
+def _draw_page_footer(c: canvas.Canvas) -> None:
+    c.doForm(FOOTER_FORM)
+    c.setFillColor(black)
+    c.setFont("Helvetica", 9)
+
+
+def _draw_page_header_art(
     c: canvas.Canvas,
     property_name: str,
     proposal_type: str,
-) -> float:
+) -> None:
     """
     Header matching the reference:
       small orange "OUR SOLUTIONS" label,
@@ -209,11 +276,8 @@ def _draw_page_header(
     c.setFillColor(ORANGE)
     c.drawString(LEFT + prefix_w, y, title_property)
 
-    y -= 26
-    return y
-
 
-def _draw_page_footer(c: canvas.Canvas) -> None:
+def _draw_page_footer_art(c: canvas.Canvas) -> None:
     """
     Footer matching the baked-in template pages (e.g. page 3 of the master
     proposal). Positions measured directly from the reference PDF:
@@ -243,7 +307,7 @@ def _draw_page_footer(c: canvas.Canvas) -> None:
     icon_path = _resolve_icon_path()
     if icon_path:
         try:
-            icon = ImageReader(icon_path)
+            icon = _footer_icon(icon_path)
             c.drawImage(
                 icon,
                 icon_x,
@@ -271,38 +335,134 @@ def _draw_page_footer(c: canvas.Canvas) -> None:
 # ---------------------------------------------------------------------------
 # Item block (boxed row with title bar + bullets + bottom divider)
 # ---------------------------------------------------------------------------
-def _draw_item_block(
-    c: canvas.Canvas,
-    item: Dict[str, Any],
-    y: float,
-) -> float:
+TITLE_FONT = "Helvetica-Bold"
+TITLE_SIZE = 11
+BULLET_FONT = "Helvetica"
+BULLET_SIZE = 10
+BULLET_TEXT_X = LEFT + 14
+
+
+@dataclass(frozen=True)
+class ItemLayout:
+    """
+    Everything measured for one item block: wrapped title and bullet lines
+    and the estimated block height used for page-break planning.
+    """
+
+    title_lines: Tuple[str, ...]
+    price: str
+    # One tuple of wrapped lines per bullet
+    bullets: Tuple[Tuple[str, ...], ...]
+    height: float
+
+
+ITEM_LAYOUT_CACHE_SIZE = 4096
+
+_item_layouts: "OrderedDict[str, ItemLayout]" = OrderedDict()
+_item_layouts_lock = threading.Lock()
+_item_layout_stats = {"hits": 0, "misses": 0}
+
+
+def _item_layout_key(item: Dict[str, Any]) -> str:
+    # Content + every setting that affects wrapping; editing one item only
+    # changes that item's key
+    raw = "\x1f".join(
+        [
+            safe_text(item.get("item")),
+            safe_text(item.get("description")),
+            safe_text(item.get("price")),
+            f"{TITLE_FONT}:{TITLE_SIZE}:{BULLET_FONT}:{BULLET_SIZE}:{LEFT}:{RIGHT}",
+        ]
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _measure_item(item: Dict[str, Any]) -> ItemLayout:
     item_name = safe_text(item.get("item")) or "Item"
-    description = safe_text(item.get("description"))
     price = _format_item_price(item.get("price"))
 
-    title_font = "Helvetica-Bold"
-    title_size = 11
-    price_size = 11
-
     # Reserve space on the right for the price so the title can wrap.
-    price_w = stringWidth(price, "Helvetica-Bold", price_size)
+    price_w = stringWidth(price, TITLE_FONT, TITLE_SIZE)
     title_max_width = (RIGHT - LEFT) - price_w - 16
+    title_lines = _wrap_text(item_name, TITLE_FONT, TITLE_SIZE, title_max_width) or [item_name]
 
-    # Title (wrap to multiple lines if needed) + price on first line, right-aligned.
-    # Per reference, there is NO top divider — only a single divider under the title.
-    title_lines = _wrap_text(item_name, title_font, title_size, title_max_width) or [item_name]
+    desc = safe_text(item.get("description"))
+    # A description without bullet lines is treated as one bullet
+    bullets = [_clean_bullet(b) for b in _split_bullets(desc)] or ([desc] if desc else [])
+    wrapped = tuple(
+        tuple(_wrap_text(text, BULLET_FONT, BULLET_SIZE, RIGHT - BULLET_TEXT_X)) for text in bullets
+    )
+    bullet_line_count = sum(max(1, len(lines)) for lines in wrapped)
+
+    # title first line + extra title lines*14 + gap(10)
+    # + single divider + gap(12) + bullets*13 + trailing(10)
+    height = (
+        12  # first title line
+        + (len(title_lines) - 1) * 14
+        + 10
+        + 12
+        + (bullet_line_count * 13)
+        + 10
+    )
+    return ItemLayout(title_lines=tuple(title_lines), price=price, bullets=wrapped, height=height)
 
+
+def item_layout(item: Dict[str, Any]) -> ItemLayout:
+    """
+    Cached _measure_item(): rebuilding a proposal after editing one or two
+    items only re-wraps those items.
+    """
+    key = _item_layout_key(item)
+    with _item_layouts_lock:
+        layout = _item_layouts.get(key)
+        if layout is not None:
+            _item_layouts.move_to_end(key)
+            _item_layout_stats["hits"] += 1
+            return layout
+        _item_layout_stats["misses"] += 1
+
+    layout = _measure_item(item)
+    with _item_layouts_lock:
+        _item_layouts[key] = layout
+        while len(_item_layouts) > ITEM_LAYOUT_CACHE_SIZE:
+            _item_layouts.popitem(last=False)
+    return layout
+
+
+def item_layout_cache_info() -> Dict[str, int]:
+    with _item_layouts_lock:
+        return {**_item_layout_stats, "size": len(_item_layouts)}
+
+
+def clear_item_layout_cache() -> None:
+    with _item_layouts_lock:
+        _item_layouts.clear()
+        _item_layout_stats.update(hits=0, misses=0)
+
+
+def _draw_item_block(
+    c: canvas.Canvas,
+    item: Dict[str, Any],
+    y: float,
+    layout: ItemLayout | None = None,
+) -> float:
+    layout = layout or item_layout(item)
+    title_lines = layout.title_lines
+    price = layout.price
+
+    # Title (wrapped to multiple lines if needed) + price on first line, right-aligned.
+    # Per reference, there is NO top divider — only a single divider under the title.
     c.setFillColor(DARK)
-    c.setFont(title_font, title_size)
+    c.setFont(TITLE_FONT, TITLE_SIZE)
     c.drawString(LEFT, y, title_lines[0])
 
-    c.setFont("Helvetica-Bold", price_size)
+    c.setFont(TITLE_FONT, TITLE_SIZE)
     c.drawRightString(RIGHT, y, price)
 
     # Additional wrapped title lines
     for extra in title_lines[1:]:
         y -= 14
-        c.setFont(title_font, title_size)
+        c.setFont(TITLE_FONT, TITLE_SIZE)
         c.drawString(LEFT, y, extra)
 
     y -= 10
@@ -314,27 +474,15 @@ def _draw_item_block(
     y -= 16
 
     # Description bullets
-    bullet_lines = _split_bullets(description)
-    if bullet_lines:
-        for bullet in bullet_lines:
-            text = _clean_bullet(bullet)
-            y = _draw_bulleted_line(
-                c,
-                bullet_x=LEFT + 4,
-                text_x=LEFT + 14,
-                y=y,
-                text=text,
-                max_width=RIGHT - (LEFT + 14),
-            )
-    elif description:
-        # Treat single blob as one bullet
-        y = _draw_bulleted_line(
+    for wrapped in layout.bullets:
+        y = _draw_wrapped_bullet(
             c,
             bullet_x=LEFT + 4,
-            text_x=LEFT + 14,
+            text_x=BULLET_TEXT_X,
             y=y,
-            text=description,
-            max_width=RIGHT - (LEFT + 14),
+            wrapped=wrapped,
+            font_name=BULLET_FONT,
+            font_size=BULLET_SIZE,
         )
 
     y -= 20
@@ -470,31 +618,7 @@ def _draw_exclusions(c: canvas.Canvas, exclusions: str, y: float) -> float:
 # Height estimation (for page-break planning)
 # ---------------------------------------------------------------------------
 def _estimate_item_height(item: Dict[str, Any]) -> float:
-    item_name = safe_text(item.get("item")) or "Item"
-    price = _format_item_price(item.get("price"))
-    price_w = stringWidth(price, "Helvetica-Bold", 11)
-    title_max_width = (RIGHT - LEFT) - price_w - 16
-    title_lines = _wrap_text(item_name, "Helvetica-Bold", 11, title_max_width) or [item_name]
-
-    desc = safe_text(item.get("description"))
-    bullets = _split_bullets(desc) or ([desc] if desc else [])
-
-    bullet_line_count = 0
-    for bullet in bullets:
-        text = _clean_bullet(bullet)
-        wrapped = _wrap_text(text, "Helvetica", 10, RIGHT - (LEFT + 14))
-        bullet_line_count += max(1, len(wrapped))
-
-    # title first line + extra title lines*14 + gap(10)
-    # + single divider + gap(12) + bullets*13 + trailing(10)
-    return (
-        12  # first title line
-        + (len(title_lines) - 1) * 14
-        + 10
-        + 12
-        + (bullet_line_count * 13)
-        + 10
-    )
+    return item_layout(item).height
 
 
 def _estimate_totals_height() -> float:
@@ -546,7 +670,7 @@ def render_content_pages(fields: Dict[str, Any], start_page_number: int = 4) ->
     Page size matches the other template pages (540 x 720 pt).
     """
     buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=CONTENT_PAGE_SIZE)
+    c = canvas.Canvas(buffer, pagesize=CONTENT_PAGE_SIZE, invariant=1)
 
     property_name = safe_text(fields.get("property_name"))
     proposal_type = safe_text(fields.get("proposal_type"))
@@ -554,12 +678,15 @@ def render_content_pages(fields: Dict[str, Any], start_page_number: int = 4) ->
     exclusions = safe_text(fields.get("exclusions"))
     items = fields.get("items", []) or []
 
+    # Header and footer are identical on every content page: draw them once
+    _define_chrome_forms(c, property_name, proposal_type)
+
     def new_page() -> float:
         _draw_page_footer(c)
         c.showPage()
-        return _draw_page_header(c, property_name, proposal_type)
+        return _draw_page_header(c)
 
-    y = _draw_page_header(c, property_name, proposal_type)
+    y = _draw_page_header(c)
 
     # Scope summary — muted gray per reference (not solid black).
     if scope_summary:
@@ -577,10 +704,10 @@ def render_content_pages(fields: Dict[str, Any], start_page_number: int = 4) ->
 
     # Items
     for item in items:
-        needed = _estimate_item_height(item)
-        if y - needed < BOTTOM + 40:
+        layout = item_layout(item)
+        if y - layout.height < BOTTOM + 40:
             y = new_page()
-        y = _draw_item_block(c, item, y)
+        y = _draw_item_block(c, item, y, layout)
 
     # Totals (keep together with an extra buffer so the orange bar isn't split)
     totals_needed = _estimate_totals_height()
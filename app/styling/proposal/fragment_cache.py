@@ -0,0 +1,149 @@
+# app/styling/proposal/fragment_cache.py
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from pypdf import PdfReader, PdfWriter
+
+from app.styling.proposal.template_picker import (
+    TEMPLATE_DIR,
+    get_closing_template,
+    get_intro_template,
+    get_process_template,
+    get_testimonials_template,
+)
+
+
+@dataclass
+class DeckFragment:
+    """
+    A parsed, ready-to-append run of static template pages.
+
+    pypdf readers share one underlying stream, so appends from the same
+    fragment are serialized with `lock`. The pages themselves are never
+    mutated: PdfWriter.add_page() clones them into the request's writer.
+    """
+
+    reader: PdfReader
+    # Page counts of the source templates, in order (e.g. intro, process)
+    part_page_counts: Tuple[int, ...]
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.reader.pages)
+
+
+_fragments: Dict[Tuple[Tuple[str, float], ...], DeckFragment] = {}
+# Guards the dicts only; each fragment is built under its own key lock, so a
+# cold miss doesn't hold up builds that need other fragments.
+_fragments_lock = threading.Lock()
+_build_locks: Dict[Tuple[Tuple[str, float], ...], threading.Lock] = {}
+
+
+def _key(paths: Tuple[Path, ...]) -> Tuple[Tuple[str, float], ...]:
+    # mtime in the key so a redeployed template is picked up without a restart
+    return tuple((str(p), p.stat().st_mtime) for p in paths)
+
+
+def _build_fragment(paths: Tuple[Path, ...]) -> DeckFragment:
+    if len(paths) == 1:
+        reader = PdfReader(str(paths[0]))
+        return DeckFragment(reader=reader, part_page_counts=(len(reader.pages),))
+
+    # Pre-merge the run once so a build appends a single document
+    writer = PdfWriter()
+    counts: List[int] = []
+    for p in paths:
+        part = PdfReader(str(p))
+        for page in part.pages:
+            writer.add_page(page)
+        counts.append(len(part.pages))
+
+    buf = BytesIO()
+    writer.write(buf)
+    return DeckFragment(reader=PdfReader(BytesIO(buf.getvalue())), part_page_counts=tuple(counts))
+
+
+def get_fragment(*paths: Path) -> DeckFragment:
+    key = _key(tuple(paths))
+    frag = _fragments.get(key)
+    if frag is not None:
+        return frag
+
+    with _fragments_lock:
+        build_lock = _build_locks.setdefault(key, threading.Lock())
+    with build_lock:
+        frag = _fragments.get(key)
+        if frag is None:
+            frag = _build_fragment(tuple(paths))
+            with _fragments_lock:
+                _fragments[key] = frag
+                _build_locks.pop(key, None)
+    return frag
+
+
+def append_fragment(writer: PdfWriter, frag: DeckFragment) -> int:
+    with frag.lock:
+        for page in frag.reader.pages:
+            writer.add_page(page)
+    return frag.page_count
+
+
+def cover_fragment(cover_path: Path) -> DeckFragment:
+    return get_fragment(cover_path)
+
+
+def intro_process_fragment(prepared_by: str, proposal_type: str) -> DeckFragment:
+    return get_fragment(get_intro_template(prepared_by), get_process_template(proposal_type))
+
+
+def testimonials_closing_fragment(prepared_by: str) -> DeckFragment:
+    return get_fragment(get_testimonials_template(), get_closing_template(prepared_by))
+
+
+def _template_keys(folder: str) -> Iterator[str]:
+    for p in sorted((TEMPLATE_DIR / folder).glob("*.pdf")):
+        yield p.stem
+
+
+def preload_proposal_fragments() -> int:
+    """
+    Parse every cover and pre-merge every static run up front, so the first
+    proposal build in a process doesn't pay for it. Returns fragments loaded.
+    """
+    loaded = 0
+    for cover in sorted((TEMPLATE_DIR / "covers").glob("*.pdf")):
+        cover_fragment(cover)
+        loaded += 1
+
+    prepared_by_keys = set(_template_keys("intro")) | set(_template_keys("closing"))
+    for prepared_by in sorted(prepared_by_keys):
+        for proposal_type in _template_keys("process"):
+            intro_process_fragment(prepared_by, proposal_type)
+            loaded += 1
+        testimonials_closing_fragment(prepared_by)
+        loaded += 1
+    return loaded
+
+
+def preload_in_background() -> None:
+    """
+    Kick off preload_proposal_fragments() on a daemon thread (PROPOSAL_PRELOAD=0 to skip).
+    """
+    if os.getenv("PROPOSAL_PRELOAD", "1").strip().lower() in {"0", "false", "no", "off"}:
+        return
+
+    def run():
+        try:
+            n = preload_proposal_fragments()
+            print(f"[proposal] preloaded {n} deck fragments")
+        except Exception as e:
+            print(f"[proposal] fragment preload failed: {e}")
+
+    threading.Thread(target=run, name="proposal-preload", daemon=True).start()
@@ -161,7 +161,7 @@ def _split_address(raw: str) -> List[str]:
 
 def create_cover_overlay(fields: Dict[str, Any]) -> bytes:
     buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=letter)
+    c = canvas.Canvas(buffer, pagesize=letter, invariant=1)
 
     # Column 1 – Prepared For
     _draw_value_group(
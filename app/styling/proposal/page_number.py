@@ -2,19 +2,20 @@
 from __future__ import annotations
 
 from io import BytesIO
-from typing import Iterable
+from typing import Dict, Iterable
 
 from pypdf import PdfReader, PdfWriter
 from reportlab.lib.colors import Color
-from reportlab.pdfgen import canvas
+
+from app.styling.common.post_process import Mark, stamp_pages
 
 
 # Match the baked-in template page size (7.5" x 10" = 540 x 720 pt).
 # The overlay MUST be the same size as the underlying page, otherwise
 # merge_page will misalign the number (this is why it was invisible on
 # the 540x720 testimonial page when the overlay was letter-sized).
+# stamp_pages() sizes each overlay from the page's own mediabox.
 PAGE_WIDTH, PAGE_HEIGHT = 540, 720
-OVERLAY_PAGE_SIZE = (PAGE_WIDTH, PAGE_HEIGHT)
 
 BLACK = Color(0.05, 0.05, 0.05, alpha=1)
 WHITE = Color(1, 1, 1, alpha=1)
@@ -28,50 +29,64 @@ FONT_NAME = "Helvetica"
 FONT_SIZE = 8                  # matches the baked-in number size
 
 
-def _number_overlay(page_number: int, color: Color) -> bytes:
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=OVERLAY_PAGE_SIZE)
-
-    c.setFillColor(color)
-    c.setFont(FONT_NAME, FONT_SIZE)
-    c.drawRightString(PAGE_NUM_X, PAGE_NUM_Y, str(page_number))
-
-    c.save()
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    return pdf_bytes
+def _number_mark(page_number: int, color: Color) -> Mark:
+    return Mark(
+        str(page_number),
+        PAGE_NUM_X,
+        PAGE_NUM_Y,
+        font=FONT_NAME,
+        size=FONT_SIZE,
+        color=color,
+        align="right",
+    )
 
 
-def add_page_numbers(
-    pdf_bytes: bytes,
+def number_pages(
+    writer: PdfWriter,
     start_at: int = 1,
     black_page_indexes: Iterable[int] | None = None,
     white_page_indexes: Iterable[int] | None = None,
-) -> bytes:
-    reader = PdfReader(BytesIO(pdf_bytes))
-    writer = PdfWriter()
-
+) -> None:
+    """
+    Stamp page numbers onto the pages already in `writer`, in place.
+    Only pages listed in black/white_page_indexes get a number.
+    """
     black_set = set(black_page_indexes or [])
     white_set = set(white_page_indexes or [])
 
+    numbered: Dict[int, Mark] = {}
     current_number = start_at
-
-    for index, page in enumerate(reader.pages):
-        color = None
-
+    for index in range(len(writer.pages)):
         if index in black_set:
-            color = BLACK
+            numbered[index] = _number_mark(current_number, BLACK)
         elif index in white_set:
-            color = WHITE
+            numbered[index] = _number_mark(current_number, WHITE)
+        else:
+            continue
+        current_number += 1
 
-        if color is not None:
-            overlay_bytes = _number_overlay(current_number, color)
-            overlay_pdf = PdfReader(BytesIO(overlay_bytes))
-            page.merge_page(overlay_pdf.pages[0])
-            current_number += 1
+    stamp_pages(writer, lambda index, page_count, size: [numbered[index]] if index in numbered else [])
 
+
+def add_page_numbers(
+    pdf_bytes: bytes,
+    start_at: int = 1,
+    black_page_indexes: Iterable[int] | None = None,
+    white_page_indexes: Iterable[int] | None = None,
+) -> bytes:
+    reader = PdfReader(BytesIO(pdf_bytes))
+    writer = PdfWriter()
+
+    for page in reader.pages:
         writer.add_page(page)
 
+    number_pages(
+        writer,
+        start_at=start_at,
+        black_page_indexes=black_page_indexes,
+        white_page_indexes=white_page_indexes,
+    )
+
     out = BytesIO()
     writer.write(out)
     return out.getvalue()
@@ -1,10 +1,14 @@
 # app/styling/proposal/renderer.py
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, BinaryIO, Dict
 
-from app.styling.proposal.assembler import build_proposal_pdf
+from app.styling.proposal.assembler import build_proposal_pdf, write_proposal_pdf
 
 
 def render_proposal_pdf(fields: Dict[str, Any]) -> bytes:
-    return build_proposal_pdf(fields)
\ No newline at end of file
+    return build_proposal_pdf(fields)
+
+
+def render_proposal_pdf_to(fields: Dict[str, Any], out: BinaryIO) -> None:
+    write_proposal_pdf(fields, out)
@@ -6,7 +6,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Tuple
 
-from pypdf import PdfReader, PdfWriter
+from pypdf import PdfReader
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
 from reportlab.pdfbase.pdfmetrics import stringWidth
@@ -16,8 +16,13 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.utils import ImageReader
 
+from app.styling.common.page_chrome import define_form
+from app.styling.common.post_process import Mark, post_process_pdf
 from app.styling.service_quote.parser import ServiceQuoteData
 
+# Bump whenever a change here alters the PDF produced for the same data;
+# it's part of the draft hash that lets save-final reuse a draft.
+RENDERER_VERSION = "4"
 
 # =========================
 # Page + layout constants
@@ -261,6 +266,21 @@ def _content_w(ps: PageSpec) -> float:
 # Header / footer
 # =========================
 
+HEADER_FORM = "sq_header"
+FOOTER_FORM = "sq_footer"
+
+
+def _define_chrome_forms(
+    c: canvas.Canvas,
+    ps: PageSpec,
+    logo_path: Path | None,
+    font_regular: str,
+    font_bold: str,
+) -> None:
+    define_form(c, HEADER_FORM, lambda fc: _draw_header_art(fc, ps, logo_path, font_regular, font_bold))
+    define_form(c, FOOTER_FORM, lambda fc: _draw_footer_art(fc, ps, font_regular))
+
+
 def _draw_header_v2(
     c: canvas.Canvas,
     ps: PageSpec,
@@ -268,6 +288,20 @@ def _draw_header_v2(
     font_regular: str,
     font_bold: str,
 ) -> float:
+    c.doForm(HEADER_FORM)
+    # Leave the canvas state as the inline header did
+    c.setFont(font_regular, HEADER_TEXT_FS)
+    c.setLineWidth(HEADER_RULE_W)
+    return _calc_header_bottom_y(ps)
+
+
+def _draw_header_art(
+    c: canvas.Canvas,
+    ps: PageSpec,
+    logo_path: Path | None,
+    font_regular: str,
+    font_bold: str,
+) -> None:
     x0 = _x0()
     x1 = _x1(ps)
     w = x1 - x0
@@ -324,7 +358,16 @@ def _draw_header_v2(
     c.setLineWidth(HEADER_RULE_W)
     c.line(x0, y_rule, x1, y_rule)
 
-    return y_rule - HEADER_BOTTOM_GAP
+
+def _draw_footer_art(c: canvas.Canvas, ps: PageSpec, font_regular: str) -> None:
+    x0 = _x0()
+    x1 = _x1(ps)
+    xc = (x0 + x1) / 2.0
+
+    c.setFillColor(FOOTER_GRAY)
+    c.setFont(font_regular, FOOTER_FS)
+    c.drawString(x0, FOOTER_Y, "Mainline Fire Protection")
+    c.drawCentredString(xc, FOOTER_Y, "Toronto’s Fire Protection Company")
 
 
 def _draw_footer_v2(
@@ -334,15 +377,12 @@ def _draw_footer_v2(
     total_pages: int,
     font_regular: str,
 ) -> None:
-    x0 = _x0()
-    x1 = _x1(ps)
-    xc = (x0 + x1) / 2.0
+    c.doForm(FOOTER_FORM)
 
+    # The number changes per page, so it stays out of the form
     c.setFillColor(FOOTER_GRAY)
     c.setFont(font_regular, FOOTER_FS)
-    c.drawString(x0, FOOTER_Y, "Mainline Fire Protection")
-    c.drawCentredString(xc, FOOTER_Y, "Toronto’s Fire Protection Company")
-    c.drawRightString(x1, FOOTER_Y, f"Page {page_no} of {total_pages}")
+    c.drawRightString(_x1(ps), FOOTER_Y, f"Page {page_no} of {total_pages}")
     c.setFillColor(colors.black)
 
 
@@ -357,34 +397,23 @@ def _stamp_actual_page_numbers(
     """
     ps = _page_spec_from_template(template_pdf)
     font_regular, _, _ = _register_brand_assets(template_pdf)
+    x1 = _x1(ps)
 
-    reader = PdfReader(io.BytesIO(pdf_bytes))
-    writer = PdfWriter()
-    total_pages = len(reader.pages)
-
-    for idx, page in enumerate(reader.pages, start=1):
-        overlay_buf = io.BytesIO()
-        c = canvas.Canvas(overlay_buf, pagesize=(ps.w, ps.h))
-
-        x0 = _x0()
-        x1 = _x1(ps)
-
-        c.setFillColor(colors.white)
-        c.rect(x1 - 95, FOOTER_Y - 4, 95, 14, stroke=0, fill=1)
-
-        c.setFillColor(FOOTER_GRAY)
-        c.setFont(font_regular, FOOTER_FS)
-        c.drawRightString(x1, FOOTER_Y, f"Page {idx} of {total_pages}")
-        c.save()
-
-        overlay_buf.seek(0)
-        overlay_pdf = PdfReader(overlay_buf)
-        page.merge_page(overlay_pdf.pages[0])
-        writer.add_page(page)
+    def marks_for(index: int, total_pages: int, size: Tuple[float, float]) -> List[Mark]:
+        return [
+            Mark(
+                f"Page {index + 1} of {total_pages}",
+                x1,
+                FOOTER_Y,
+                font=font_regular,
+                size=FOOTER_FS,
+                color=FOOTER_GRAY,
+                align="right",
+                knockout=(x1 - 95, FOOTER_Y - 4, 95, 14),
+            )
+        ]
 
-    out = io.BytesIO()
-    writer.write(out)
-    return out.getvalue()
+    return post_process_pdf(pdf_bytes, marks_for)
 
 
 # =========================
@@ -902,7 +931,8 @@ def render_service_quote(template_pdf: Path, data: ServiceQuoteData) -> bytes:
     )
 
     buf = io.BytesIO()
-    c = canvas.Canvas(buf, pagesize=(ps.w, ps.h))
+    c = canvas.Canvas(buf, pagesize=(ps.w, ps.h), invariant=1)
+    _define_chrome_forms(c, ps, logo_path, font_regular, font_bold)
 
     page_no = 1
 
@@ -10,6 +10,7 @@ from typing import Any, Dict, List, Optional, Set, Tuple
 import google.auth
 import requests
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from google.auth.transport.requests import Request as GoogleAuthRequest
 from google.cloud import pubsub_v1
 from sqlalchemy.exc import IntegrityError
@@ -226,6 +227,11 @@ async def _handle_pubsub_push(request: Request) -> Dict[str, Any]:
     This prevents endpoint mismatch issues forever.
     """
     payload = await request.json()
+    # Gmail API, DB and Cloud Run calls are all blocking; keep them off the event loop
+    return await run_in_threadpool(_process_pubsub_push, payload)
+
+
+def _process_pubsub_push(payload: Dict[str, Any]) -> Dict[str, Any]:
     email_address, pushed_history_id = _decode_pubsub_push(payload)
 
     # If Pub/Sub payload is malformed, still ACK 200 so Pub/Sub doesn't retry forever
@@ -7,7 +7,7 @@ from datetime import datetime, timezone
 from sqlalchemy import text
 
 from app.db import SessionLocal
-from app.s3_client import S3Client
+from app.storage.backend import get_storage
 
 
 def iso_date_utc(dt: datetime | None = None) -> str:
@@ -25,7 +25,7 @@ def derive_day_from_original(original_key: str) -> str:
 
 
 def main(limit: int = 200):
-    s3 = S3Client()
+    s3 = get_storage()
     db = SessionLocal()
 
     try:
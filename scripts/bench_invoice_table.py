@@ -0,0 +1,105 @@
+# scripts/bench_invoice_table.py
+"""
+Times render_invoice_styled_draft for invoices with 10 .. 5,000 line items.
+
+    python scripts/bench_invoice_table.py
+    python scripts/bench_invoice_table.py 10 100 1000 --repeat 5 --out /tmp/bench_invoice.pdf
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from io import BytesIO
+
+from pypdf import PdfReader
+
+from app.styling.invoice.renderer import render_invoice_styled_draft
+
+DEFAULT_SIZES = [10, 50, 100, 500, 1000, 2500, 5000]
+
+PART_NAMES = ["Sprinkler Head", "Pipe Fitting", "Valve", "Gauge", "Hanger", "Escutcheon", "Coupling"]
+DESCRIPTIONS = [
+    "Replace head",
+    "Supply and install 1\" grooved coupling on main riser",
+    "Pendent sprinkler head, 155F, 5.6K, chrome finish, includes escutcheon and wrench-fit installation",
+    "",
+]
+
+
+def _fake_invoice(n_rows: int, seed: int = 7) -> dict:
+    rnd = random.Random(seed)
+    labor_n = max(1, n_rows // 10)
+    parts_n = n_rows - labor_n
+
+    labor_rows = [
+        {
+            "date": f"2026-03-{(i % 28) + 1:02d}",
+            "name": "Technician Regular Hours" if i % 3 else "Apprentice",
+            "description": rnd.choice(DESCRIPTIONS),
+            "taxable": True,
+            "hours": rnd.choice([0.5, 1, 2, 3.5]),
+            "rate": 125,
+            "price": 125 * 2,
+        }
+        for i in range(labor_n)
+    ]
+    parts_rows = [
+        {
+            "date": f"2026-03-{(i % 28) + 1:02d}",
+            "name": rnd.choice(PART_NAMES),
+            "code": f"SKU-{rnd.randint(1000, 9999)}",
+            "description": rnd.choice(DESCRIPTIONS),
+            "taxable": bool(i % 2),
+            "qty": rnd.randint(1, 20),
+            "unit_price": 12.5,
+            "price": 12.5 * 3,
+        }
+        for i in range(parts_n)
+    ]
+
+    return {
+        "invoice_number": "BENCH-1",
+        "issued_date": "Mar 01, 2026",
+        "due_date": "Mar 31, 2026",
+        "billClient_name": "Benchmark Property Management",
+        "billClient_address_lines": ["100 King St W", "Toronto ON"],
+        "customer_name": "Benchmark Customer",
+        "property_name": "Benchmark Tower",
+        "property_address_lines": ["1 Bench Ave", "Toronto ON"],
+        "labor_rows": labor_rows,
+        "parts_rows": parts_rows,
+        "subtotal": 1000,
+        "tax": 130,
+        "total": 1130,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("sizes", nargs="*", type=int, default=DEFAULT_SIZES)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out", default="", help="write the largest render here")
+    args = ap.parse_args()
+
+    print(f"{'rows':>6} {'pages':>6} {'best_ms':>10} {'ms/row':>8} {'kb':>8}")
+    last = b""
+    for n in args.sizes:
+        data = _fake_invoice(n)
+        best = float("inf")
+        for _ in range(max(1, args.repeat)):
+            t0 = time.perf_counter()
+            last = render_invoice_styled_draft(data)
+            best = min(best, time.perf_counter() - t0)
+
+        pages = len(PdfReader(BytesIO(last)).pages)
+        print(f"{n:>6} {pages:>6} {best * 1000:>10.1f} {best * 1000 / n:>8.3f} {len(last) / 1024:>8.1f}")
+
+    if args.out and last:
+        with open(args.out, "wb") as f:
+            f.write(last)
+        print("Wrote", args.out)
+
+
+if __name__ == "__main__":
+    main()
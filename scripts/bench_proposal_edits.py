@@ -0,0 +1,93 @@
+# scripts/bench_proposal_edits.py
+"""
+Simulates an editor session on one proposal: build once, then rebuild
+after changing one or two items at a time. Compares render_content_pages
+with the item layout cache cleared before every build (old behaviour)
+against the cache left warm.
+
+    python scripts/bench_proposal_edits.py
+    python scripts/bench_proposal_edits.py --items 80 --edits 30
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import random
+import time
+
+from app.styling.proposal.content_pages import (
+    clear_item_layout_cache,
+    item_layout_cache_info,
+    render_content_pages,
+)
+from scripts.test_render_proposal import base_payload
+
+BULLETS = [
+    "Inspect and test fire alarm system devices including pull stations, detectors and bells",
+    "Provide written report and deficiency list to property management within five business days",
+    "Replace failed batteries in emergency lighting units and verify 30 minute run time",
+    "Flush and test standpipe system; record static and residual pressures at each hose valve",
+    "Supply and install new escutcheons where missing or damaged",
+]
+
+
+def _items(n: int, rnd: random.Random) -> list:
+    return [
+        {
+            "item": f"Line item {i + 1}: " + rnd.choice(["Fire Alarm Inspection", "Sprinkler Repair", "Extinguisher Service"]),
+            "description": "\n".join("- " + rnd.choice(BULLETS) for _ in range(rnd.randint(2, 6))),
+            "price": f"{rnd.randint(100, 5000)}.00",
+        }
+        for i in range(n)
+    ]
+
+
+def _edit(fields: dict, rnd: random.Random) -> None:
+    items = fields["items"]
+    for idx in rnd.sample(range(len(items)), k=min(len(items), rnd.choice([1, 2]))):
+        items[idx]["description"] += "\n- " + rnd.choice(BULLETS)
+        items[idx]["price"] = f"{rnd.randint(100, 5000)}.00"
+
+
+def _session(fields: dict, edits: int, *, warm: bool, seed: int) -> list:
+    rnd = random.Random(seed)
+    f = copy.deepcopy(fields)
+    clear_item_layout_cache()
+    times = []
+    for step in range(edits + 1):
+        if step:
+            _edit(f, rnd)
+        if not warm:
+            clear_item_layout_cache()
+        t0 = time.perf_counter()
+        render_content_pages(f)
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--items", type=int, default=40)
+    ap.add_argument("--edits", type=int, default=20)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    fields = base_payload()
+    fields["items"] = _items(args.items, random.Random(args.seed))
+
+    cold = _session(fields, args.edits, warm=False, seed=args.seed)
+    warm = _session(fields, args.edits, warm=True, seed=args.seed)
+    info = item_layout_cache_info()
+
+    def avg_ms(ts):
+        return 1000 * sum(ts) / max(1, len(ts))
+
+    print(f"{args.items} items, {args.edits} edits of 1-2 items each")
+    print(f"  first build        : {cold[0] * 1000:8.1f} ms")
+    print(f"  rebuild, no cache  : {avg_ms(cold[1:]):8.1f} ms avg")
+    print(f"  rebuild, warm cache: {avg_ms(warm[1:]):8.1f} ms avg")
+    print(f"  layout cache       : {info['hits']} hits / {info['misses']} misses ({info['size']} entries)")
+
+
+if __name__ == "__main__":
+    main()
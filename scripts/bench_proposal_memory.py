@@ -0,0 +1,111 @@
+# scripts/bench_proposal_memory.py
+"""
+Peak Python memory (tracemalloc) for one proposal build + upload:
+
+  before  merge -> BytesIO -> bytes -> re-parse for page numbers -> bytes -> put_object body
+  after   merge with numbers stamped in place -> streamed into S3UploadStream parts
+
+S3 is replaced by a stand-in client that only records part sizes, so this
+runs without AWS credentials.
+
+    python scripts/bench_proposal_memory.py
+    python scripts/bench_proposal_memory.py --prepared-by "Rob Felstead" --type Project
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import tracemalloc
+from io import BytesIO
+
+from app.storage.s3_storage import S3UploadStream
+from app.styling.proposal.content_pages import _footer_icon, _resolve_icon_path
+from app.styling.proposal.assembler import assemble_proposal
+from app.styling.proposal.fragment_cache import preload_proposal_fragments
+from app.styling.proposal.page_number import add_page_numbers
+from app.services.proposal_service import upload_proposal_document
+from scripts.test_render_proposal import base_payload
+
+
+class StandInS3:
+    def __init__(self):
+        self.parts: list[int] = []
+        self.put_size = 0
+
+    def create_multipart_upload(self, **kw):
+        return {"UploadId": "local"}
+
+    def upload_part(self, Body, PartNumber, **kw):
+        self.parts.append(len(Body))
+        return {"ETag": f'"{PartNumber}"'}
+
+    def complete_multipart_upload(self, **kw):
+        return {}
+
+    def abort_multipart_upload(self, **kw):
+        return {}
+
+    def put_object(self, Body, **kw):
+        self.put_size = len(Body)
+        return {}
+
+
+class StandInStorage:
+    def __init__(self):
+        self.s3 = StandInS3()
+
+    def open_upload_stream(self, key: str, content_type: str = "application/pdf") -> S3UploadStream:
+        return S3UploadStream(self.s3, "local", key, content_type=content_type)
+
+
+def _before(fields: dict) -> int:
+    writer = assemble_proposal(fields)
+    out = BytesIO()
+    writer.write(out)
+    merged = out.getvalue()
+    # the old flow re-parsed and rewrote the whole deck for the numbers
+    final = add_page_numbers(merged, start_at=4)
+    s3 = StandInS3()
+    s3.put_object(Body=final)
+    return s3.put_size
+
+
+def _after(fields: dict) -> int:
+    size, _ = upload_proposal_document(fields, StandInStorage(), "bench/proposal.pdf")
+    return size
+
+
+def _peak(fn, fields: dict) -> tuple[int, int]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        size = fn(fields)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return size, peak
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--prepared-by", default="Nick Janevski")
+    ap.add_argument("--type", default="Service")
+    ap.add_argument("--version", default="Fancy")
+    args = ap.parse_args()
+
+    fields = base_payload()
+    fields.update({"prepared_by": args.prepared_by, "proposal_type": args.type, "proposal_version": args.version})
+
+    # Fragment and icon caches are process-wide and long-lived; keep them out of both numbers
+    preload_proposal_fragments()
+    if _resolve_icon_path():
+        _footer_icon(_resolve_icon_path())
+
+    mb = 1024 * 1024
+    for name, fn in (("before", _before), ("after", _after)):
+        size, peak = _peak(fn, fields)
+        print(f"{name:>6}: pdf {size / mb:6.2f} MB | peak {peak / mb:7.2f} MB | {peak / max(size, 1):4.1f}x pdf size")
+
+
+if __name__ == "__main__":
+    main()
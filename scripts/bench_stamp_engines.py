@@ -0,0 +1,71 @@
+# scripts/bench_stamp_engines.py
+"""
+Compares the stamp_pdf engines (PyMuPDF vs pypdf + reportlab overlays) on
+generated 1-, 20- and 200-page documents.
+
+    python scripts/bench_stamp_engines.py
+    python scripts/bench_stamp_engines.py 1 20 200 1000 --repeat 5 --out /tmp/stamped.pdf
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from io import BytesIO
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from app.services.pdf_stamp import STAMP_ENGINES, stamp_pdf
+
+DEFAULT_SIZES = [1, 20, 200]
+
+
+def _fake_pdf(pages: int) -> bytes:
+    buf = BytesIO()
+    c = canvas.Canvas(buf, pagesize=letter)
+    for i in range(pages):
+        c.setFont("Helvetica", 10)
+        y = 740
+        for line in range(50):
+            c.drawString(50, y, f"Page {i + 1} line {line + 1}: sprinkler inspection notes and findings")
+            y -= 14
+        c.showPage()
+    c.save()
+    return buf.getvalue()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("sizes", nargs="*", type=int, default=DEFAULT_SIZES)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--text", default="This is final")
+    ap.add_argument("--out", default="", help="write the largest pymupdf result here")
+    args = ap.parse_args()
+
+    engines = sorted(STAMP_ENGINES)
+    print(f"{'pages':>6} {'engine':>8} {'best_ms':>10} {'ms/page':>8} {'kb_in':>8} {'kb_out':>8}")
+    last = b""
+    for n in args.sizes:
+        src = _fake_pdf(n)
+        for engine in engines:
+            best = float("inf")
+            out = b""
+            for _ in range(max(1, args.repeat)):
+                t0 = time.perf_counter()
+                out = stamp_pdf(src, args.text, engine=engine)
+                best = min(best, time.perf_counter() - t0)
+            if engine == "pymupdf":
+                last = out
+            print(
+                f"{n:>6} {engine:>8} {best * 1000:>10.1f} {best * 1000 / n:>8.2f} "
+                f"{len(src) / 1024:>8.1f} {len(out) / 1024:>8.1f}"
+            )
+
+    if args.out and last:
+        with open(args.out, "wb") as f:
+            f.write(last)
+        print("Wrote", args.out)
+
+
+if __name__ == "__main__":
+    main()
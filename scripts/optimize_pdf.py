@@ -0,0 +1,45 @@
+# scripts/optimize_pdf.py
+"""
+Runs the final-PDF optimizer on local files and reports the size change.
+
+    python scripts/optimize_pdf.py final.pdf
+    python scripts/optimize_pdf.py deck.pdf --dpi 110 --doc-type PROJECT_QUOTE --out /tmp/deck.min.pdf
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+from app.services.pdf_optimize import max_image_dpi, optimize_pdf, size_budget
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("paths", nargs="+")
+    ap.add_argument("--dpi", type=int, default=0, help="max image DPI (default PDF_OPTIMIZE_MAX_IMAGE_DPI)")
+    ap.add_argument("--doc-type", default="PROJECT_QUOTE", help="for the budget check")
+    ap.add_argument("--out", default="", help="write the (last) optimized file here")
+    args = ap.parse_args()
+
+    dpi = args.dpi or max_image_dpi()
+    budget = size_budget(args.doc_type)
+    res = None
+    for p in args.paths:
+        src = Path(p).read_bytes()
+        t0 = time.perf_counter()
+        res = optimize_pdf(src, max_dpi=dpi)
+        ms = (time.perf_counter() - t0) * 1000
+        over = "" if budget is None or res.bytes_after <= budget else f"  OVER BUDGET ({budget:,})"
+        print(
+            f"{p}: {res.bytes_before:,} -> {res.bytes_after:,} bytes ({res.saved_pct:.1f}% saved), "
+            f"{res.images_downsampled} images downsampled > {dpi} dpi, {ms:.0f} ms{over}"
+        )
+
+    if args.out and res is not None:
+        Path(args.out).write_bytes(res.pdf_bytes)
+        print("Wrote", args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# scripts/test_buildops_sync.py
+"""
+Runs the BuildOps incremental sync against a local stand-in HTTP server.
+
+    python scripts/test_buildops_sync.py            # paging + updated-since only
+    python scripts/test_buildops_sync.py --db       # also upsert into DATABASE_URL's mirror tables
+"""
+from __future__ import annotations
+
+import json
+import sys
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.buildops_client import BuildOpsClient
+from app.buildops_sync import UPDATED_SINCE_PARAM, fetch_updated, sync_entity
+
+BASE_TS = int(datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp())
+
+# 25 invoices, one minute apart
+FAKE = {
+    "invoices": [
+        {"id": f"inv-{i}", "invoiceNumber": str(1000 + i), "updatedDate": BASE_TS + i * 60}
+        for i in range(25)
+    ],
+    "customers": [{"id": f"cust-{i}", "name": f"Customer {i}", "updatedAt": BASE_TS} for i in range(3)],
+    "properties": [],
+}
+REQUESTS = []
+
+
+class StandIn(BaseHTTPRequestHandler):
+    def _json(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.path == "/auth/token":
+            return self._json({"token": "local-test"})
+        return self._json({"error": "not found"}, 404)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        REQUESTS.append((url.path, q))
+
+        entity = url.path.strip("/")
+        if entity not in FAKE:
+            return self._json({"error": "not found"}, 404)
+
+        rows = FAKE[entity]
+        since = q.get(UPDATED_SINCE_PARAM)
+        if since:
+            rows = [r for r in rows if (r.get("updatedDate") or r.get("updatedAt") or 0) >= int(since)]
+
+        page, size = int(q.get("page", 0)), int(q.get("page_size", 10))
+        return self._json({"items": rows[page * size:(page + 1) * size], "totalCount": len(rows)})
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    print("Stand-in BuildOps at", base_url)
+
+    bo = BuildOpsClient(tenant_id="t", client_id="c", client_secret="s", base_url=base_url)
+
+    try:
+        pages = list(fetch_updated(bo, "invoices", None, page_size=10))
+        print("Full pass pages:", [len(p) for p in pages])
+        assert [len(p) for p in pages] == [10, 10, 5]
+
+        since = datetime.fromtimestamp(BASE_TS + 20 * 60, tz=timezone.utc)
+        REQUESTS.clear()
+        pages = list(fetch_updated(bo, "invoices", since, page_size=10))
+        ids = [r["id"] for p in pages for r in p]
+        print("Incremental pass ids:", ids, "| requests:", len(REQUESTS))
+        assert "inv-24" in ids and "inv-0" not in ids
+
+        if "--db" in sys.argv:
+            from app.db import SessionLocal
+
+            db = SessionLocal()
+            try:
+                for entity in FAKE:
+                    count, watermark = sync_entity(bo, db, entity, page_size=10)
+                    print(f"DB sync {entity}: {count} records, watermark={watermark}")
+            finally:
+                db.close()
+
+        print("✅ OK")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# scripts/test_final_determinism.py
+"""
+Finals are stored under the SHA-256 of their bytes, so identical input has
+to give identical bytes. Renders the sample proposal twice through each
+final stage and compares hashes.
+
+    python scripts/test_final_determinism.py
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import sys
+import time
+
+from app.services.pdf_optimize import linearize_pdf, optimize_pdf, prepare_final
+from app.services.pdf_stamp import STAMP_ENGINES, stamp_pdf
+from app.services.proposal_service import build_proposal_final
+from app.styling.proposal.renderer import render_proposal_pdf, render_proposal_pdf_to
+from scripts.test_render_proposal import base_payload
+
+
+def _sha(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def _check(name: str, build) -> bool:
+    first = build()
+    time.sleep(1.1)  # a wall-clock timestamp anywhere in the output would now differ
+    second = build()
+    same = first == second
+    print(f"{name:>22}: {_sha(first)} vs {_sha(second)}  {'OK' if same else 'DIFFERENT'}")
+    return same
+
+
+def main():
+    fields = base_payload()
+    base = render_proposal_pdf(fields)
+
+    checks = [
+        ("proposal render", lambda: render_proposal_pdf(fields)),
+        ("optimize", lambda: optimize_pdf(base).pdf_bytes),
+        ("linearize", lambda: linearize_pdf(base)),
+    ]
+    for engine in STAMP_ENGINES:
+        checks.append((f"stamp ({engine})", lambda e=engine: stamp_pdf(base, "APPROVED", engine=e)))
+
+    ok = all([_check(name, build) for name, build in checks])
+
+    # An unchanged draft is promoted by preparing its stored bytes (promote_draft);
+    # that has to land on the same content-addressed key as a fresh final
+    out = io.BytesIO()
+    render_proposal_pdf_to(fields, out)
+    promoted = prepare_final(out.getvalue(), "PROJECT_QUOTE")
+    built = build_proposal_final(fields)
+    same = promoted == built
+    print(f"{'promoted draft':>22}: {_sha(promoted)} vs {_sha(built)}  {'OK' if same else 'DIFFERENT'}")
+    ok = ok and same
+    if not ok:
+        print("FAIL: some stage is not deterministic")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
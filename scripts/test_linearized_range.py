@@ -0,0 +1,122 @@
+# scripts/test_linearized_range.py
+"""
+Checks that linearized finals can show page one from a small prefix, by
+reading them through byte-range requests against a local HTTP server
+(the same Range requests a browser's PDF viewer makes against CloudFront).
+
+    python scripts/test_linearized_range.py                 # proposal from test_render_proposal's payload
+    python scripts/test_linearized_range.py --pdf final.pdf
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.request import Request, urlopen
+
+from app.services.pdf_optimize import linearization_params, linearize_pdf
+
+FILES: dict = {}
+RANGE_RE = re.compile(r"bytes=(\d+)-(\d*)")
+
+
+class RangeServer(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        body = FILES.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        m = RANGE_RE.fullmatch(self.headers.get("Range") or "")
+        if not m:
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Accept-Ranges", "bytes")
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        start = int(m.group(1))
+        end = min(int(m.group(2)) if m.group(2) else len(body) - 1, len(body) - 1)
+        chunk = body[start : end + 1]
+        self.send_response(206)
+        self.send_header("Content-Range", f"bytes {start}-{end}/{len(body)}")
+        self.send_header("Content-Length", str(len(chunk)))
+        self.end_headers()
+        self.wfile.write(chunk)
+
+
+def _get_range(url: str, start: int, end: int) -> tuple[int, str, bytes]:
+    req = Request(url, headers={"Range": f"bytes={start}-{end}"})
+    with urlopen(req) as resp:
+        return resp.status, resp.headers.get("Content-Range") or "", resp.read()
+
+
+def _check(base: str, name: str) -> bool:
+    url = f"{base}/{name}"
+    total = len(FILES[f"/{name}"])
+
+    status, content_range, head = _get_range(url, 0, 1023)
+    assert status == 206, f"{name}: expected 206, got {status}"
+    assert content_range.endswith(f"/{total}"), f"{name}: bad Content-Range {content_range!r}"
+
+    params = linearization_params(head)
+    if params is None:
+        print(f"{name:>14}: not linearized; a viewer needs all {total:,} bytes before page one")
+        return False
+
+    assert params.get("L") == total, f"{name}: /L {params.get('L')} != file size {total}"
+    first_page_end = int(params["E"])
+
+    # Everything page one needs sits before /E
+    _, _, prefix = _get_range(url, 0, first_page_end - 1)
+    first_obj = params.get("O")
+    assert re.search(rb"(^|\s)%d 0 obj" % first_obj, prefix), f"{name}: first page object {first_obj} not in prefix"
+
+    print(
+        f"{name:>14}: linearized, {params.get('N')} pages; page one ready after "
+        f"{first_page_end:,} of {total:,} bytes ({100.0 * first_page_end / total:.1f}%)"
+    )
+    return True
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pdf", default="", help="PDF to test (default: render a sample proposal)")
+    args = ap.parse_args()
+
+    if args.pdf:
+        original = Path(args.pdf).read_bytes()
+    else:
+        from app.styling.proposal.renderer import render_proposal_pdf
+        from scripts.test_render_proposal import base_payload
+
+        original = render_proposal_pdf(base_payload())
+
+    FILES["/original.pdf"] = original
+    FILES["/linearized.pdf"] = linearize_pdf(original)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeServer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        _check(base, "original.pdf")
+        ok = _check(base, "linearized.pdf")
+    finally:
+        server.shutdown()
+
+    if not ok:
+        print("FAIL: linearized output has no linearization dictionary")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# scripts/test_stamp_direction.py
+"""
+Both stamp engines must draw the diagonal watermark the same way: rising
+left to right (counter-clockwise by DIAGONAL_ANGLE) and in the same spot.
+Stamps a blank page with each engine and reads back the text direction
+and bounding box with PyMuPDF.
+
+    python scripts/test_stamp_direction.py
+"""
+from __future__ import annotations
+
+import math
+import sys
+
+import fitz  # PyMuPDF
+
+from app.services.pdf_stamp import DIAGONAL_ANGLE, DIAGONAL_FS, STAMP_ENGINES, stamp_pdf
+
+TEXT = "APPROVED"
+# Tolerances: direction as a unit vector, bounding boxes in points
+DIR_TOL = 0.01
+BBOX_TOL = 1.0
+
+
+def _blank_pdf() -> bytes:
+    doc = fitz.open()
+    doc.new_page(width=612, height=792)
+    try:
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+def _diagonal_line(pdf_bytes: bytes):
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        page = doc[0]
+        for block in page.get_text("dict")["blocks"]:
+            for line in block.get("lines", []):
+                spans = line.get("spans") or []
+                if spans and round(spans[0]["size"]) == DIAGONAL_FS:
+                    return line
+    finally:
+        doc.close()
+    return None
+
+
+def _check(engine: str, line) -> bool:
+    if line is None:
+        print(f"{engine:>8}: no diagonal watermark found")
+        return False
+
+    # get_text reports directions in screen space (y down): rising text has dy < 0
+    want = (math.cos(math.radians(DIAGONAL_ANGLE)), -math.sin(math.radians(DIAGONAL_ANGLE)))
+    dx, dy = line["dir"]
+    ok = abs(dx - want[0]) <= DIR_TOL and abs(dy - want[1]) <= DIR_TOL
+    bbox = ", ".join(f"{v:.1f}" for v in line["bbox"])
+    print(f"{engine:>8}: dir ({dx:.3f}, {dy:.3f}) want ({want[0]:.3f}, {want[1]:.3f})  bbox ({bbox})  {'OK' if ok else 'WRONG'}")
+    return ok
+
+
+def main():
+    blank = _blank_pdf()
+    lines = {engine: _diagonal_line(stamp_pdf(blank, TEXT, engine=engine)) for engine in STAMP_ENGINES}
+    ok = all([_check(engine, line) for engine, line in lines.items()])
+
+    boxes = [line["bbox"] for line in lines.values() if line is not None]
+    if ok and any(abs(a - b) > BBOX_TOL for box in boxes[1:] for a, b in zip(boxes[0], box)):
+        print("watermark lands in different places per engine")
+        ok = False
+    if not ok:
+        print("FAIL: stamp engines disagree on the watermark")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()